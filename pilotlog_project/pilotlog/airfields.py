@@ -0,0 +1,204 @@
+import heapq
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Max
+
+from pilotlog.models import Airfield
+
+# pilotlog_mcc stores latitude and longitude as whole minutes of arc
+COORDINATE_SCALE = 60.0
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+# Seconds between two checks whether the Airfield table changed under a cached index
+REFRESH_INTERVAL = 60.0
+
+# Users whose index a process keeps; the least recently used one is dropped first
+MAX_CACHED_INDEXES = 256
+
+# Columns kept in memory per airfield
+AirfieldEntry = namedtuple('AirfieldEntry', ['id', 'code', 'icao', 'iata', 'name', 'latitude', 'longitude'])
+
+
+def to_degrees(value):
+    return value / COORDINATE_SCALE
+
+
+def unit_vector(latitude, longitude):
+    """Point on the unit sphere; chord length between two of them is monotonic in great-circle distance."""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(math.pi / 2, km / (2 * EARTH_RADIUS_KM)))
+
+
+class KDTree:
+    """Static 3-d tree over unit vectors for k-nearest-neighbour queries.
+
+    Nodes live in flat lists (point, split axis, left, right) rather than
+    objects, which keeps a 50k-airfield tree a few MB and quick to build.
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self.node_point, self.node_axis, self.left, self.right = [], [], [], []
+        self.root = self._build(list(range(len(points))), 0)
+
+    def _build(self, members, depth):
+        if not members:
+            return -1
+        axis = depth % 3
+        members.sort(key=lambda index: self.points[index][axis])
+        middle = len(members) // 2
+        node = len(self.node_point)
+        self.node_point.append(members[middle])
+        self.node_axis.append(axis)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.left[node] = self._build(members[:middle], depth + 1)
+        self.right[node] = self._build(members[middle + 1:], depth + 1)
+        return node
+
+    def nearest(self, target, k=1, max_chord=None):
+        """``(chord, point index)`` of the ``k`` points closest to ``target``, closest first."""
+        points = self.points
+        bound = max_chord * max_chord if max_chord is not None else math.inf
+        best = []  # max-heap of (-squared distance, index)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            index = self.node_point[node]
+            point = points[index]
+            squared = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            worst = -best[0][0] if len(best) == k else bound
+            if squared <= worst:
+                if len(best) == k:
+                    heapq.heapreplace(best, (-squared, index))
+                else:
+                    heapq.heappush(best, (-squared, index))
+                worst = -best[0][0] if len(best) == k else bound
+            axis = self.node_axis[node]
+            offset = target[axis] - point[axis]
+            near, far = (self.left[node], self.right[node]) if offset < 0 else (self.right[node], self.left[node])
+            # The far side can only hold a closer point if the splitting plane is within reach
+            if offset * offset <= worst:
+                stack.append(far)
+            stack.append(near)
+        return [(math.sqrt(-negative), index) for negative, index in sorted(best, reverse=True)]
+
+
+class AirfieldIndex:
+    """The airfields of one user in memory: O(1) lookup by code and nearest-airfield search.
+
+    ``resolve`` accepts what Flight.from_airport / to_airport hold: the
+    pilotlog_mcc airfield code, or an ICAO or IATA identifier (as in
+    ForeFlight logbooks), case-insensitively. When several of the user's
+    airfields share an identifier, the one stored first wins.
+    """
+
+    def __init__(self, entries, signature=None):
+        self.entries = entries
+        self.signature = signature
+        self.by_code = {}
+        for entry in entries:
+            for key in (entry.code, entry.icao, entry.iata):
+                if key:
+                    self.by_code.setdefault(key.upper(), entry)
+        located = [entry for entry in entries if entry.latitude or entry.longitude]
+        self.located = located
+        self.tree = KDTree([unit_vector(entry.latitude, entry.longitude) for entry in located])
+
+    @classmethod
+    def load(cls, user_id, using=DEFAULT_DB_ALIAS):
+        """Read every airfield of ``user_id`` in one ordered scan."""
+        rows = (
+            Airfield.objects.using(using)
+            .filter(user_id=user_id)
+            .order_by('pk')
+            .values_list('pk', 'af_code', 'af_icao', 'af_iata', 'af_name', 'latitude', 'longitude')
+        )
+        entries = [
+            AirfieldEntry(pk, code, icao, iata, name, to_degrees(latitude), to_degrees(longitude))
+            for pk, code, icao, iata, name, latitude, longitude in rows.iterator(chunk_size=10000)
+        ]
+        return cls(entries, signature=table_signature(user_id, using))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def resolve(self, code):
+        """The airfield a flight's airport code refers to, or None."""
+        if not code:
+            return None
+        return self.by_code.get(code.strip().upper())
+
+    def nearest(self, latitude, longitude, k=1, max_km=None):
+        """``(distance_km, entry)`` of the ``k`` airfields closest to a point, closest first."""
+        if not self.located:
+            return []
+        max_chord = km_to_chord(max_km) if max_km is not None else None
+        found = self.tree.nearest(unit_vector(latitude, longitude), k=k, max_chord=max_chord)
+        return [(chord_to_km(chord), self.located[index]) for chord, index in found]
+
+
+def table_signature(user_id, using=DEFAULT_DB_ALIAS):
+    """Cheap fingerprint of a user's airfields; changes whenever one is added, removed or updated."""
+    summary = (
+        Airfield.objects.using(using)
+        .filter(user_id=user_id)
+        .aggregate(count=Count('pk'), last=Max('pk'), modified=Max('_modified'))
+    )
+    return summary['count'], summary['last'], summary['modified']
+
+
+# (using, user_id) -> (index, last checked), least recently used first
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def airfield_index(user_id, using=DEFAULT_DB_ALIAS):
+    """The process-wide :class:`AirfieldIndex` of ``user_id``, loaded on first use.
+
+    At most every ``REFRESH_INTERVAL`` seconds the user's signature is
+    compared with the one the index was built from, so imports made by
+    other processes are picked up; :func:`invalidate_airfield_index`
+    forces a reload in this process.
+    """
+    key = (using, user_id)
+    with _lock:
+        cached = _cache.get(key)
+        now = time.monotonic()
+        if cached is not None:
+            _cache.move_to_end(key)
+            index, checked = cached
+            if now - checked < REFRESH_INTERVAL:
+                return index
+            if table_signature(user_id, using) == index.signature:
+                _cache[key] = (index, now)
+                return index
+        index = AirfieldIndex.load(user_id, using)
+        _cache[key] = (index, now)
+        if len(_cache) > MAX_CACHED_INDEXES:
+            _cache.popitem(last=False)
+        return index
+
+
+def invalidate_airfield_index(using=DEFAULT_DB_ALIAS):
+    """Drop the cached index of every user of ``using``."""
+    with _lock:
+        for key in [key for key in _cache if key[0] == using]:
+            del _cache[key]
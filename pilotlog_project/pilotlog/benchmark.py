@@ -0,0 +1,210 @@
+import json
+import platform
+import random
+import sys
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import models
+
+from pilotlog.mappings import TABLE_SPECS
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows has no getrusage
+    resource = None
+
+# Table name as it appears in pilotlog_mcc exports
+EXPORT_NAMES = {
+    'aircraft': 'Aircraft',
+    'flight': 'Flight',
+    'imagepic': 'ImagePic',
+    'limitrules': 'LimitRules',
+    'myquery': 'MyQuery',
+    'myquerybuild': 'MyQueryBuild',
+    'pilot': 'Pilot',
+    'qualification': 'Qualification',
+    'settingconfig': 'SettingConfig',
+    'airfield': 'Airfield',
+}
+
+# Share of each table in a generated export, roughly that of a real logbook
+DEFAULT_MIX = {
+    'flight': 0.70,
+    'airfield': 0.08,
+    'pilot': 0.06,
+    'qualification': 0.04,
+    'aircraft': 0.03,
+    'imagepic': 0.03,
+    'limitrules': 0.02,
+    'myquery': 0.015,
+    'myquerybuild': 0.015,
+    'settingconfig': 0.01,
+}
+
+# Rates of the data problems real exports carry
+BAD_DATE_RATE = 0.01
+MISSING_KEY_RATE = 0.05
+STRING_NUMBER_RATE = 0.05
+REVISION_RATE = 0.01
+
+BAD_DATES = ('2024-13-45', '31/12/2023', 'not a date', '0000-00-00')
+FIRST_DATE = date(2015, 1, 1)
+
+# Recent records kept to re-emit as newer revisions of the same guid
+REVISION_POOL_SIZE = 256
+
+
+class RecordGenerator:
+    """Produce reproducible pilotlog_mcc records with a realistic table mix.
+
+    Values are generated from the table mappings, so every table and field
+    the importer knows about is exercised. A share of the records carries
+    the problems real exports have: invalid dates, missing optional meta
+    keys, numbers sent as strings and repeated guids with a newer
+    ``_modified``. SettingConfig uses numeric-string guids.
+    """
+
+    def __init__(self, seed=0, users=1, mix=None):
+        self.random = random.Random(seed)
+        self.users = users
+        mix = mix or DEFAULT_MIX
+        self.tables = list(mix)
+        self.weights = [mix[table] for table in self.tables]
+        self.specs = {spec.table: spec for spec in TABLE_SPECS}
+        self.sequence = Counter()
+        self.aircraft = []
+        self.revisions = []
+        self.plans = {table: self.field_plan(self.specs[table]) for table in self.tables}
+
+    def field_plan(self, spec):
+        """``(source, make_value, droppable)`` for every meta key of ``spec``."""
+        plan = []
+        seen = set()
+        for field in spec.fields:
+            if field.source in seen:
+                continue
+            seen.add(field.source)
+            model_field = spec.model._meta.get_field(field.target)
+            # Only keys the importer can default may go missing
+            droppable = not model_field.unique and (field.default is not None or model_field.null)
+            plan.append((field.source, self.value_maker(spec.table, field, model_field), droppable))
+        return plan
+
+    def value_maker(self, table, field, model_field):
+        rand = self.random
+        if field.source == 'AircraftCode':
+            return lambda: rand.choice(self.aircraft) if self.aircraft else ''
+        if model_field.unique:
+            if isinstance(model_field, models.UUIDField):
+                return lambda: str(uuid.UUID(int=rand.getrandbits(128), version=4))
+            key = f'{table}.{field.target}'
+            if isinstance(model_field, models.IntegerField):
+                return lambda: self.next_number(key)
+            return lambda: f'{field.source[:2].upper()}{self.next_number(key):06d}'
+        if field.converter == 'uuid':
+            return lambda: str(uuid.UUID(int=rand.getrandbits(128), version=4))
+        if field.converter == 'date':
+            def make_date():
+                if rand.random() < BAD_DATE_RATE:
+                    return rand.choice(BAD_DATES)
+                return (FIRST_DATE + timedelta(days=rand.randrange(3650))).isoformat()
+            return make_date
+        if field.converter == 'time':
+            return lambda: rand.randrange(24 * 60)
+        if field.converter == 'bool':
+            return lambda: rand.random() < 0.3
+        if field.converter == 'decimal':
+            limit = min(600, 10 ** (model_field.max_digits - model_field.decimal_places) - 1)
+            return self.number_maker(lambda: rand.randrange(limit))
+        if field.converter == 'int':
+            return self.number_maker(lambda: rand.randrange(100))
+        length = min(getattr(model_field, 'max_length', None) or 40, 12)
+        return lambda: ''.join(rand.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(rand.randint(1, length)))
+
+    def number_maker(self, make):
+        def make_number():
+            value = make()
+            return str(value) if self.random.random() < STRING_NUMBER_RATE else value
+        return make_number
+
+    def next_number(self, key):
+        self.sequence[key] += 1
+        return self.sequence[key]
+
+    def record(self, table, modified):
+        rand = self.random
+        if table == 'settingconfig':
+            guid = str(self.next_number('settingconfig.guid'))
+        else:
+            guid = str(uuid.UUID(int=rand.getrandbits(128), version=4))
+        meta = {}
+        for source, make_value, droppable in self.plans[table]:
+            if droppable and rand.random() < MISSING_KEY_RATE:
+                continue
+            meta[source] = make_value()
+        if table == 'settingconfig':
+            # The numeric guid doubles as the config code
+            meta['ConfigCode'] = int(guid)
+        if table == 'aircraft':
+            self.aircraft.append(guid)
+        return {
+            'table': EXPORT_NAMES[table],
+            'guid': guid,
+            'user_id': rand.randint(1, self.users),
+            'platform': 9,
+            '_modified': modified,
+            'meta': meta,
+        }
+
+    def records(self, count):
+        """Yield ``count`` records."""
+        rand = self.random
+        modified = 1500000000
+        for table in rand.choices(self.tables, self.weights, k=count):
+            modified += rand.randint(1, 60)
+            if self.revisions and rand.random() < REVISION_RATE:
+                revision = dict(rand.choice(self.revisions), _modified=modified)
+                yield revision
+                continue
+            record = self.record(table, modified)
+            if len(self.revisions) < REVISION_POOL_SIZE:
+                self.revisions.append(record)
+            else:
+                self.revisions[rand.randrange(REVISION_POOL_SIZE)] = record
+            yield record
+
+
+def write_export(out, count, seed=0, users=1):
+    """Write a ``count``-record export to the text stream ``out`` one record at a time."""
+    out.write('[\n')
+    for position, record in enumerate(RecordGenerator(seed, users).records(count)):
+        if position:
+            out.write(',\n')
+        out.write(json.dumps(record))
+    out.write('\n]\n')
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def environment():
+    """Versions that make two benchmark results comparable."""
+    import django
+    from django.db import connection
+    from pilotlog.columnar import columnar_available
+
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'numpy': columnar_available(),
+        'machine': platform.machine(),
+    }
@@ -0,0 +1,157 @@
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Rows buffered per model before they are written in one statement
+DEFAULT_BATCH_SIZE = 1000
+
+# Rows fetched per round-trip while scanning existing guids
+DEFAULT_INDEX_CHUNK_SIZE = 10000
+
+# Guids looked up per query when classifying a batch (below SQLite's bound parameter limit)
+LOOKUP_CHUNK_SIZE = 500
+
+
+def load_guid_index(model, using=DEFAULT_DB_ALIAS, chunk_size=DEFAULT_INDEX_CHUNK_SIZE):
+    """Map every stored guid of ``model`` to its ``(pk, _modified)`` in one chunked scan."""
+    rows = model.objects.using(using).values_list('guid', 'pk', '_modified')
+    return {guid: (pk, modified) for guid, pk, modified in rows.iterator(chunk_size=chunk_size)}
+
+
+class BulkUpsertWriter:
+    """Buffer converted rows per model and upsert them in batches.
+
+    Each flush is a single ``bulk_create(update_conflicts=True)`` keyed on
+    ``guid`` and runs in its own transaction, so an import costs
+    O(batches) queries instead of O(records). Whether a row is created or
+    updated is decided against a guid index: either the whole table,
+    loaded once with :meth:`preload`, or by default only the guids of the
+    batches written, looked up a batch at a time. Either way there is
+    never a per-row lookup. Every later version of a guid already queued or
+    written by this writer is counted as superseded instead, so created,
+    updated and superseded always add up to the rows added, however the
+    rows fall into batches.
+    """
+
+    unique_fields = ['guid']
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, using=DEFAULT_DB_ALIAS, on_flush=None, preserve_fields=None,
+                 before_flush=None):
+        self.batch_size = batch_size
+        self.using = using
+        self.on_flush = on_flush
+        # Called with (model, instances, guid index) while the stored rows are still the old ones
+        self.before_flush = before_flush
+        # Fields per model that an upsert must leave untouched on existing rows
+        self.preserve_fields = preserve_fields or {}
+        self.buffers = {}
+        self.indexes = {}
+        # Models whose index holds every stored guid, not just the ones looked up
+        self.complete = set()
+        self.created = Counter()
+        self.updated = Counter()
+        self.superseded = Counter()
+        # Versions replaced within the pending buffer of each model
+        self.replaced = Counter()
+        # Guids written by this writer so far, per model
+        self.written = {}
+        self._update_fields = {}
+
+    def preload(self, models):
+        """Load the complete guid index of each model up front, one scan per model."""
+        for model in models:
+            if model not in self.complete:
+                self.indexes[model] = load_guid_index(model, using=self.using)
+                self.complete.add(model)
+
+    def index(self, model, guids=()):
+        """Return the ``guid -> (pk, _modified)`` index of ``model``, covering at least ``guids``.
+
+        Unless the model was preloaded, the guids not seen yet are looked up
+        in ``LOOKUP_CHUNK_SIZE`` chunks, so the index follows what is being
+        imported rather than the size of the table.
+        """
+        index = self.indexes.setdefault(model, {})
+        if model not in self.complete:
+            missing = [guid for guid in guids if guid not in index]
+            rows = model.objects.using(self.using).values_list('guid', 'pk', '_modified')
+            for start in range(0, len(missing), LOOKUP_CHUNK_SIZE):
+                for guid, pk, modified in rows.filter(guid__in=missing[start:start + LOOKUP_CHUNK_SIZE]):
+                    index[guid] = (pk, modified)
+        return index
+
+    def add(self, model, guid, defaults):
+        """Queue a row for ``model``; mirrors ``update_or_create(guid=..., defaults=...)``."""
+        instance = model(guid=guid, **defaults)
+        buffer = self.buffers.setdefault(model, {})
+        # Keep only the last version of a guid seen within a batch
+        if guid in buffer:
+            self.replaced[model] += 1
+        buffer[guid] = instance
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+        return instance
+
+    def update_fields(self, model):
+        """Concrete, non-key fields overwritten when a row already exists."""
+        if model not in self._update_fields:
+            skipped = set(self.unique_fields) | set(self.preserve_fields.get(model, ()))
+            self._update_fields[model] = [
+                field.name for field in model._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped
+            ]
+        return self._update_fields[model]
+
+    def flush(self, model):
+        """Write the buffered rows of ``model`` in a single transaction."""
+        buffer = self.buffers.pop(model, None)
+        if not buffer:
+            return 0
+        return self.write(model, buffer, self.replaced.pop(model, 0))
+
+    def write(self, model, buffer, superseded=0):
+        """Upsert one batch of ``guid -> instance`` rows and update the guid index and counters.
+
+        ``superseded`` is the number of versions the buffer already replaced.
+        """
+        instances = list(buffer.values())
+        index = self.index(model, [instance.guid for instance in instances])
+        written = self.written.setdefault(model, set())
+        created = updated = 0
+        for instance in instances:
+            if instance.guid in written:
+                superseded += 1
+            elif instance.guid in index:
+                updated += 1
+            else:
+                created += 1
+        if self.before_flush:
+            self.before_flush(model, instances, index)
+
+        with transaction.atomic(using=self.using):
+            model.objects.using(self.using).bulk_create(
+                instances,
+                update_conflicts=True,
+                unique_fields=self.unique_fields,
+                update_fields=self.update_fields(model),
+            )
+
+        # Keep the index current so later batches classify repeated guids correctly
+        for instance in instances:
+            pk = instance.pk if instance.pk is not None else index.get(instance.guid, (None,))[0]
+            index[instance.guid] = (pk, instance._modified)
+            written.add(instance.guid)
+
+        self.created[model] += created
+        self.updated[model] += updated
+        self.superseded[model] += superseded
+        if self.on_flush:
+            self.on_flush(model, created, updated, superseded)
+        return len(instances)
+
+    def flush_all(self):
+        """Flush every model that still has buffered rows."""
+        total = 0
+        for model in list(self.buffers):
+            total += self.flush(model)
+        return total
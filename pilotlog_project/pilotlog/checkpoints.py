@@ -0,0 +1,84 @@
+import hashlib
+import os
+from datetime import date
+
+from django.db import DEFAULT_DB_ALIAS
+
+from pilotlog.models import ImportCheckpoint
+
+# Bytes read per step while hashing the source file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 of the file at ``path``; identifies the export a checkpoint belongs to."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Checkpointer:
+    """Record how far an import got, so a later run can continue from there.
+
+    A checkpoint is only saved once every record read so far has been
+    written, so resuming at its offset never loses a record. Records read
+    after the last checkpoint are simply imported again, which the guid
+    upsert makes harmless. ``source_hash`` saves hashing the file again
+    when the caller already has its :func:`file_digest`.
+    """
+
+    def __init__(self, path, every, using=DEFAULT_DB_ALIAS, source_hash=None):
+        self.source = path
+        self.source_hash = source_hash or file_digest(path)
+        self.source_size = os.path.getsize(path)
+        self.every = every
+        self.using = using
+        self.records = 0
+        self.offset = 0
+        self.counters = {}
+        self.marks = {}
+        self.buckets = set()
+        self.pending = 0
+
+    def load(self):
+        """Restore the last checkpoint of this exact file; returns False if there is none."""
+        checkpoint = ImportCheckpoint.objects.using(self.using).filter(source_hash=self.source_hash).first()
+        if checkpoint is None:
+            return False
+        self.records = checkpoint.records
+        self.offset = checkpoint.offset
+        self.counters = checkpoint.counters
+        self.marks = {(user_id, table): modified for user_id, table, modified in checkpoint.marks}
+        self.buckets = {
+            (user_id, date.fromisoformat(month) if month else None) for user_id, month in checkpoint.buckets
+        }
+        return True
+
+    def due(self):
+        """Count one record read; True once ``every`` records are waiting for a checkpoint."""
+        self.pending += 1
+        return bool(self.every) and self.pending >= self.every
+
+    def save(self, offset, stats, marks, buckets=()):
+        """Store the position after the last record read, which must already be committed."""
+        self.records += self.pending
+        self.pending = 0
+        self.offset = offset
+        ImportCheckpoint.objects.using(self.using).update_or_create(
+            source_hash=self.source_hash,
+            defaults={
+                'source': self.source,
+                'source_size': self.source_size,
+                'records': self.records,
+                'offset': offset,
+                'counters': stats.as_dict(),
+                'marks': [[user_id, table, modified] for (user_id, table), modified in marks.items()],
+                'buckets': [[user_id, month.isoformat() if month else None] for user_id, month in buckets],
+            },
+        )
+
+    def clear(self):
+        """Forget the checkpoint once the import has finished."""
+        ImportCheckpoint.objects.using(self.using).filter(source_hash=self.source_hash).delete()
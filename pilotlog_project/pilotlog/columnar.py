@@ -0,0 +1,121 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the per-row converters are used instead
+    np = None
+
+# Converters handled column-wise instead of cell by cell
+NUMERIC_CONVERTERS = ('decimal', 'int')
+
+# Largest value an IntegerField accepts on every supported backend
+INT_MAX = 2 ** 31 - 1
+
+
+def columnar_available():
+    return np is not None
+
+
+def numeric_fields(spec):
+    """The fields of ``spec`` that can be converted as whole columns."""
+    return [field for field in spec.fields if field.converter in NUMERIC_CONVERTERS]
+
+
+def _object_column(raw):
+    # fromiter keeps nested values (lists, dicts) as single cells
+    return np.fromiter(raw, dtype=object, count=len(raw))
+
+
+def _to_float_array(cells, missing):
+    """Coerce an object column to float64; returns ``(values, unparseable)``."""
+    size = len(cells)
+    cleaned = np.where(missing, 0.0, cells)
+    try:
+        return cleaned.astype(np.float64), np.zeros(size, dtype=bool)
+    except (ValueError, TypeError):
+        pass
+    # At least one bad cell: fall back to a per-cell pass for this column only
+    values = np.empty(size, dtype=np.float64)
+    unparseable = np.zeros(size, dtype=bool)
+    for position, value in enumerate(cleaned):
+        try:
+            values[position] = float(value)
+        except (ValueError, TypeError):
+            values[position] = 0.0
+            unparseable[position] = True
+    return values, unparseable
+
+
+def convert_columns(metas, fields, model):
+    """Convert the numeric ``fields`` of a chunk of ``meta`` dicts column by column.
+
+    Missing cells and cells that fail validation (not a number, not finite,
+    not integral for integer columns, or too large for the column's
+    ``max_digits``) take the field default. Decimal columns are returned as
+    floats rounded to ``decimal_places``; the ``Decimal`` objects are only
+    built by the DecimalField when the row is sent to the database.
+
+    Returns ``(columns, bad)``: ``columns`` maps each target field to a list
+    of values in record order, ``bad`` maps a target field to the raw
+    values that were replaced.
+    """
+    columns, bad = {}, {}
+    for field in fields:
+        raw = [meta.get(field.source) for meta in metas]
+        cells = _object_column(raw)
+        if field.converter == 'decimal':
+            # Mirrors the per-row converter: every falsy cell means "use the default"
+            missing = np.logical_not(cells).astype(bool)
+        else:
+            missing = ((cells == None) | (cells == '')).astype(bool)  # noqa: E711 - element-wise
+        values, invalid = _to_float_array(cells, missing)
+        invalid |= ~np.isfinite(values)
+
+        model_field = model._meta.get_field(field.target)
+        if field.converter == 'decimal':
+            values = np.round(values, model_field.decimal_places)
+            invalid |= np.abs(values) >= 10.0 ** (model_field.max_digits - model_field.decimal_places)
+        else:
+            invalid |= (values != np.floor(values)) | (np.abs(values) > INT_MAX)
+        invalid &= ~missing
+
+        use_default = missing | invalid
+        if field.converter == 'decimal':
+            column = np.where(use_default, float(field.default), values).tolist()
+        else:
+            column = np.where(use_default, 0, values).astype(np.int64).tolist()
+            if field.default != 0:
+                for position in np.flatnonzero(use_default).tolist():
+                    column[position] = field.default
+        columns[field.target] = column
+        if invalid.any():
+            bad[field.target] = [raw[position] for position in np.flatnonzero(invalid).tolist()]
+    return columns, bad
+
+
+class ColumnarBatcher:
+    """Collect converted rows of one table and fill their numeric columns per chunk."""
+
+    def __init__(self, spec, writer, batch_size, on_bad=None):
+        self.spec = spec
+        self.fields = numeric_fields(spec)
+        self.writer = writer
+        self.batch_size = batch_size
+        self.on_bad = on_bad
+        self.pending = []
+
+    def add(self, guid, row, meta):
+        self.pending.append((guid, row, meta))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        columns, bad = convert_columns([meta for _, _, meta in pending], self.fields, self.spec.model)
+        if bad and self.on_bad:
+            self.on_bad(self.spec, bad)
+        targets = list(columns)
+        # Transpose the columns back into one tuple of values per row
+        for (guid, row, _), values in zip(pending, zip(*columns.values())):
+            row.update(zip(targets, values))
+            self.writer.add(self.spec.model, guid, row)
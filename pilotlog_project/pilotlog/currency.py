@@ -0,0 +1,133 @@
+import calendar
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+
+from pilotlog.bulk import DEFAULT_BATCH_SIZE, DEFAULT_INDEX_CHUNK_SIZE
+from pilotlog.models import Flight, Qualification, QualificationStatus
+
+# Qualification columns read by the scan
+COLUMNS = (
+    'pk', 'user_id', 'date_valid', 'date_issued', 'validity', 'notify_days', 'minimum_qty', 'minimum_period',
+)
+
+# QualificationStatus columns written, in the order qualification_status() returns them
+STATUS_COLUMNS = (
+    'qualification_id', 'user_id', 'status', 'expires', 'notify_on', 'recent_flights', 'required_flights', 'scanned_on',
+)
+
+
+def add_months(day, months):
+    """``day`` moved by whole calendar months, clamped to the end of shorter months."""
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def expiry_date(date_valid, date_issued, validity):
+    """Last valid day: ``date_valid`` when set, else ``validity`` months after issue, else None (no expiry)."""
+    if date_valid is not None:
+        return date_valid
+    if date_issued is not None and validity > 0:
+        return add_months(date_issued, validity)
+    return None
+
+
+def recent_flight_counts(periods, as_of, user_ids=None, using=DEFAULT_DB_ALIAS):
+    """``{user_id: {period: flights}}`` for each period (days up to and including ``as_of``).
+
+    One grouped query for all pilots and periods: a conditional count per
+    period over the date range of the longest one, which the
+    flight_date_user index serves without reading the table.
+    """
+    periods = sorted(set(periods))
+    if not periods:
+        return {}
+    cutoffs = {period: as_of - timedelta(days=period) for period in periods}
+    flights = Flight.objects.using(using).filter(date__gt=cutoffs[periods[-1]], date__lte=as_of)
+    if user_ids is not None:
+        flights = flights.filter(user_id__in=list(user_ids))
+    counts = (
+        flights.values('user_id')
+        .annotate(**{f'p{period}': Count('pk', filter=Q(date__gt=cutoff)) for period, cutoff in cutoffs.items()})
+        .order_by()
+    )
+    return {row.pop('user_id'): {int(key[1:]): value for key, value in row.items()} for row in counts}
+
+
+def qualification_status(row, counts, as_of):
+    """The ``STATUS_COLUMNS`` values of one qualification row (``COLUMNS``) as of ``as_of``.
+
+    An expired qualification is reported as such before a lapsed recency
+    requirement, and that before an expiry within the notice period.
+    """
+    pk, user_id, date_valid, date_issued, validity, notify_days, minimum_qty, minimum_period = row
+    expires = expiry_date(date_valid, date_issued, validity)
+    notify_on = expires - timedelta(days=max(notify_days, 0)) if expires is not None else None
+    required = minimum_qty if minimum_qty > 0 and minimum_period > 0 else 0
+    recent = counts.get(user_id, {}).get(minimum_period, 0) if required else 0
+
+    if expires is not None and expires < as_of:
+        status = QualificationStatus.EXPIRED
+    elif recent < required:
+        status = QualificationStatus.LAPSED
+    elif notify_on is not None and notify_on <= as_of:
+        status = QualificationStatus.EXPIRING
+    else:
+        status = QualificationStatus.CURRENT
+    return pk, user_id, status, expires, notify_on, recent, required, as_of
+
+
+def scan_qualifications(user_ids=None, as_of=None, using=DEFAULT_DB_ALIAS, batch_size=DEFAULT_BATCH_SIZE):
+    """Recompute and store the status of every qualification (of ``user_ids``) as of ``as_of``.
+
+    Three set-based steps whatever the number of pilots: the distinct
+    recency periods, one grouped flight count over them, and a streamed
+    pass over the qualifications whose statuses replace the stored ones.
+    Returns a Counter of the statuses written.
+    """
+    as_of = as_of or date.today()
+    qualifications = Qualification.objects.using(using)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        qualifications = qualifications.filter(user_id__in=user_ids)
+
+    periods = (
+        qualifications.filter(minimum_qty__gt=0, minimum_period__gt=0)
+        .values_list('minimum_period', flat=True).distinct().order_by()
+    )
+    counts = recent_flight_counts(list(periods), as_of, user_ids, using)
+    rows = qualifications.order_by().values_list(*COLUMNS).iterator(chunk_size=DEFAULT_INDEX_CHUNK_SIZE)
+
+    # Upserted on the qualification, so a rescan replaces each status in place;
+    # the status of a deleted qualification goes with it (on_delete=CASCADE)
+    upsert = {
+        'update_conflicts': True,
+        'unique_fields': ['qualification'],
+        'update_fields': [name for name in STATUS_COLUMNS if name != 'qualification_id'],
+    }
+    statuses = QualificationStatus.objects.using(using)
+    written = Counter()
+    with transaction.atomic(using=using):
+        batch = []
+        for row in rows:
+            values = qualification_status(row, counts, as_of)
+            batch.append(QualificationStatus(**dict(zip(STATUS_COLUMNS, values))))
+            written[values[2]] += 1
+            if len(batch) >= batch_size:
+                statuses.bulk_create(batch, **upsert)
+                batch = []
+        if batch:
+            statuses.bulk_create(batch, **upsert)
+    return written
+
+
+def due_notifications(using=DEFAULT_DB_ALIAS):
+    """Stored statuses a pilot should be told about (anything but current), grouped by user."""
+    return (
+        QualificationStatus.objects.using(using)
+        .exclude(status=QualificationStatus.CURRENT)
+        .order_by('user_id', 'expires')
+    )
@@ -0,0 +1,149 @@
+import math
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+from pilotlog.airfields import airfield_index
+from pilotlog.bulk import DEFAULT_BATCH_SIZE
+from pilotlog.models import Flight
+from pilotlog.rollups import MONTHS_PER_QUERY, month_filter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the per-flight fallback is used instead
+    np = None
+
+# Mean Earth radius in nautical miles, the unit of Flight.distance (as in ForeFlight logbooks)
+EARTH_RADIUS_NM = 3440.065
+
+# Flights converted together in one vectorised pass
+CHUNK_SIZE = 10000
+
+# Smallest change written back; the column keeps two decimals
+TOLERANCE = 0.005
+
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    """Great-circle distance in nautical miles between points given in degrees, element-wise over arrays."""
+    lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _haversine_nm_scalar(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(math.sqrt(min(1.0, a)))
+
+
+class DistanceCalculator:
+    """Route distances of whole chunks of flights from their airport codes.
+
+    The codes of a chunk are reduced to their distinct values first, so
+    each code is resolved against the airfield index once per chunk and
+    the coordinates are gathered and fed to the haversine formula as
+    arrays. Without NumPy the same work is done flight by flight.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def coordinates(self, code):
+        entry = self.index.resolve(code)
+        if entry is None or not (entry.latitude or entry.longitude):
+            return None
+        return entry.latitude, entry.longitude
+
+    def compute(self, origins, destinations):
+        """Distances (nm) of the flights ``origins[i] -> destinations[i]``; None where an airport is unknown."""
+        if np is None:
+            return self._compute_rows(origins, destinations)
+        codes, inverse = np.unique([code or '' for code in (*origins, *destinations)], return_inverse=True)
+        latitudes = np.full(len(codes), np.nan)
+        longitudes = np.full(len(codes), np.nan)
+        for position, code in enumerate(codes):
+            found = self.coordinates(code)
+            if found is not None:
+                latitudes[position], longitudes[position] = found
+        start, end = inverse[:len(origins)], inverse[len(origins):]
+        distances = haversine_nm(latitudes[start], longitudes[start], latitudes[end], longitudes[end])
+        return [None if math.isnan(value) else value for value in distances.round(2).tolist()]
+
+    def _compute_rows(self, origins, destinations):
+        distances = []
+        for origin, destination in zip(origins, destinations):
+            start, end = self.coordinates(origin), self.coordinates(destination)
+            if start is None or end is None:
+                distances.append(None)
+            else:
+                distances.append(round(_haversine_nm_scalar(*start, *end), 2))
+        return distances
+
+
+def update_distances(flights, using=DEFAULT_DB_ALIAS, batch_size=DEFAULT_BATCH_SIZE, calculator=None):
+    """Recompute ``Flight.distance`` for every flight of the ``flights`` queryset.
+
+    Each flight's airports are resolved against the airfields of its own
+    user, or with ``calculator`` when every flight belongs to the user it
+    was built for. Flights are streamed in chunks of ``CHUNK_SIZE``; only
+    those whose stored distance differs are written. A flight whose airports do not
+    both resolve keeps the distance its source gave it; only one this
+    module computed earlier is reset to 0, the column default, rather than
+    keeping a stale route distance.
+    Returns the number of flights updated.
+    """
+    rows = flights.using(using).values_list(
+        'user_id', 'pk', 'from_airport', 'to_airport', 'distance', 'distance_computed',
+    )
+    updated = 0
+    chunk = []
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            updated += _update_chunk(chunk, calculator, using, batch_size)
+            chunk = []
+    if chunk:
+        updated += _update_chunk(chunk, calculator, using, batch_size)
+    return updated
+
+
+def _update_chunk(chunk, calculator, using, batch_size):
+    by_user = {}
+    for user_id, *row in chunk:
+        by_user.setdefault(user_id, []).append(row)
+    changed = []
+    for user_id, rows in by_user.items():
+        changed.extend(_changed_flights(rows, calculator or DistanceCalculator(airfield_index(user_id, using))))
+    return Flight.objects.using(using).bulk_update(changed, ['distance', 'distance_computed'], batch_size=batch_size)
+
+
+def _changed_flights(rows, calculator):
+    pks, origins, destinations, stored, computed = zip(*rows)
+    changed = []
+    for pk, distance, current, was_computed in zip(pks, calculator.compute(origins, destinations), stored, computed):
+        if distance is not None:
+            is_computed = True
+        elif was_computed:
+            # A route that no longer resolves falls back to the column default
+            distance, is_computed = 0.0, False
+        else:
+            # Keep the distance the imported source gave
+            continue
+        if abs(distance - float(current)) >= TOLERANCE or is_computed != was_computed:
+            changed.append(Flight(pk=pk, distance=Decimal(f'{distance:.2f}'), distance_computed=is_computed))
+    return changed
+
+
+def update_bucket_distances(buckets, using=DEFAULT_DB_ALIAS, batch_size=DEFAULT_BATCH_SIZE):
+    """Import post-stage: recompute the distances of the flights in the ``(user_id, month)`` buckets written."""
+    months_by_user = {}
+    for user_id, month in buckets:
+        months_by_user.setdefault(user_id, []).append(month)
+    updated = 0
+    for user_id, months in sorted(months_by_user.items()):
+        calculator = DistanceCalculator(airfield_index(user_id, using))
+        for start in range(0, len(months), MONTHS_PER_QUERY):
+            flights = Flight.objects.filter(Q(user_id=user_id) & month_filter(months[start:start + MONTHS_PER_QUERY]))
+            updated += update_distances(flights, using, batch_size, calculator)
+    return updated
@@ -0,0 +1,407 @@
+import csv
+import uuid
+from collections import namedtuple
+from datetime import date, datetime, time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.db import models
+
+from pilotlog.columnar import INT_MAX
+from pilotlog.models import Aircraft, Flight
+
+# Layout of the ForeFlight logbook CSV, see required_resource/export - logbook_template.csv
+TITLE = 'ForeFlight Logbook Import'
+AIRCRAFT_SECTION = 'Aircraft Table'
+FLIGHTS_SECTION = 'Flights Table'
+
+# One column of a section: header, ForeFlight type hint and the model field it is read from
+Column = namedtuple('Column', ['header', 'type', 'source'])
+
+AIRCRAFT_COLUMNS = [
+    Column('AircraftID', 'Text', 'reference'),
+    Column('EquipmentType', 'Text', 'fnpt'),
+    Column('TypeCode', 'Text', None),
+    Column('Year', 'YYYY', None),
+    Column('Make', 'Text', 'make'),
+    Column('Model', 'Text', 'model'),
+    Column('Category', 'Text', None),
+    Column('Class', 'Text', None),
+    Column('GearType', 'Text', 'tailwheel'),
+    Column('EngineType', 'Text', None),
+    Column('Complex', 'Boolean', 'complex'),
+    Column('HighPerformance', 'Boolean', 'high_perf'),
+    Column('Pressurized', 'Boolean', None),
+    Column('TAA', 'Boolean', None),
+]
+
+FLIGHT_COLUMNS = [
+    Column('Date', 'Date', 'date'),
+    Column('AircraftID', 'Text', 'aircraft__reference'),
+    Column('From', 'Text', 'from_airport'),
+    Column('To', 'Text', 'to_airport'),
+    Column('Route', 'Text', 'route'),
+    Column('TimeOut', 'hhmm', 'time_out'),
+    Column('TimeOff', 'hhmm', 'time_off'),
+    Column('TimeOn', 'hhmm', 'time_on'),
+    Column('TimeIn', 'hhmm', 'time_in'),
+    Column('OnDuty', 'hhmm', 'on_duty'),
+    Column('OffDuty', 'hhmm', 'off_duty'),
+    Column('TotalTime', 'Decimal', 'total_time'),
+    Column('PIC', 'Decimal', 'pic'),
+    Column('SIC', 'Decimal', 'sic'),
+    Column('Night', 'Decimal', 'night'),
+    Column('Solo', 'Decimal', 'solo'),
+    Column('CrossCountry', 'Decimal', 'cross_country'),
+    Column('NVG', 'Decimal', 'nvg'),
+    Column('NVGOps', 'Number', 'nvg_ops'),
+    Column('Distance', 'Decimal', 'distance'),
+    Column('DayTakeoffs', 'Number', 'day_takeoffs'),
+    Column('DayLandingsFullStop', 'Number', 'day_landings_full_stop'),
+    Column('NightTakeoffs', 'Number', 'night_takeoffs'),
+    Column('NightLandingsFullStop', 'Number', 'night_landings_full_stop'),
+    Column('AllLandings', 'Number', 'all_landings'),
+    Column('ActualInstrument', 'Decimal', 'actual_instrument'),
+    Column('SimulatedInstrument', 'Decimal', 'simulated_instrument'),
+    Column('HobbsStart', 'Decimal', 'hobbs_start'),
+    Column('HobbsEnd', 'Decimal', 'hobbs_end'),
+    Column('TachStart', 'Decimal', 'tach_start'),
+    Column('TachEnd', 'Decimal', 'tach_end'),
+    Column('Holds', 'Number', 'holds'),
+    Column('Approach1', 'Packed Detail', 'approach'),
+    Column('Approach2', 'Packed Detail', None),
+    Column('Approach3', 'Packed Detail', None),
+    Column('Approach4', 'Packed Detail', None),
+    Column('Approach5', 'Packed Detail', None),
+    Column('Approach6', 'Packed Detail', None),
+    Column('DualGiven', 'Decimal', 'dual_given'),
+    Column('DualReceived', 'Decimal', None),
+    Column('SimulatedFlight', 'Decimal', 'simulated_flight'),
+    Column('GroundTraining', 'Decimal', 'ground_training'),
+    Column('InstructorName', 'Text', 'instructor_name'),
+    Column('InstructorComments', 'Text', 'instructor_comments'),
+    Column('Person1', 'Packed Detail', None),
+    Column('Person2', 'Packed Detail', None),
+    Column('Person3', 'Packed Detail', None),
+    Column('Person4', 'Packed Detail', None),
+    Column('Person5', 'Packed Detail', None),
+    Column('Person6', 'Packed Detail', None),
+    Column('FlightReview', 'Boolean', 'flight_review'),
+    Column('Checkride', 'Boolean', 'checkride'),
+    Column('IPC', 'Boolean', 'ipc'),
+    Column('NVGProficiency', 'Boolean', 'nvg_proficiency'),
+    Column('FAA6158', 'Boolean', None),
+    Column('[Text]CustomFieldName', 'Text', None),
+    Column('[Numeric]CustomFieldName', 'Decimal', None),
+    Column('[Hours]CustomFieldName', 'Decimal', None),
+    Column('[Counter]CustomFieldName', 'Number', None),
+    Column('[Date]CustomFieldName', 'Date', None),
+    Column('[DateTime]CustomFieldName', 'DateTime', None),
+    Column('[Toggle]CustomFieldName', 'Boolean', None),
+    Column('PilotComments', 'Text', 'pilot_comments'),
+]
+
+# Format of the packed-detail columns, written above their first column
+PACKED_FORMATS = {
+    'Approach1': '#;type;runway;airport;comments',
+    'Person1': 'name;role;email',
+}
+
+# Every row is padded to the width of the widest section
+WIDTH = max(len(AIRCRAFT_COLUMNS), len(FLIGHT_COLUMNS))
+
+# Decimal-hour columns whose model field holds minutes (the min* fields of the export)
+HOUR_COLUMNS = {
+    'TotalTime', 'PIC', 'SIC', 'Night', 'Solo', 'CrossCountry', 'NVG', 'ActualInstrument', 'SimulatedInstrument',
+    'DualGiven', 'SimulatedFlight',
+}
+
+# ForeFlight keeps decimal hours to two places, the flight time columns minutes
+HOURS_PRECISION = MINUTES_PRECISION = Decimal('0.01')
+
+
+def format_text(value):
+    return '' if value is None else str(value)
+
+
+def format_boolean(value):
+    return '' if value is None else ('TRUE' if value else 'FALSE')
+
+
+def format_date(value):
+    return '' if value is None else value.isoformat()
+
+
+def format_hhmm(value):
+    return '' if value is None else f'{value.hour:02d}{value.minute:02d}'
+
+
+def format_hours(minutes):
+    if minutes is None:
+        return ''
+    return str((Decimal(minutes) / 60).quantize(HOURS_PRECISION, ROUND_HALF_UP))
+
+
+def format_equipment(fnpt):
+    # FNPT 0 is a real aircraft; any simulator level exports as a training device
+    return 'aircraft' if not fnpt else 'ftd'
+
+
+def format_gear(tailwheel):
+    return 'conventional' if tailwheel else ''
+
+
+FORMATTERS = {
+    'Text': format_text,
+    'YYYY': format_text,
+    'Number': format_text,
+    'Decimal': format_text,
+    'Packed Detail': format_text,
+    'Boolean': format_boolean,
+    'Date': format_date,
+    'DateTime': format_text,
+    'hhmm': format_hhmm,
+}
+
+# Columns whose value is not a plain rendering of their type
+SPECIAL_FORMATTERS = {
+    'EquipmentType': format_equipment,
+    'GearType': format_gear,
+    **{header: format_hours for header in HOUR_COLUMNS},
+}
+
+
+def source_fields(columns):
+    """The model fields to select for ``columns``, in column order."""
+    return [column.source for column in columns if column.source]
+
+
+def row_formatter(columns):
+    """Build ``format(values) -> cells`` for rows selected with :func:`source_fields`.
+
+    Columns without a source are written empty; the others are rendered by
+    the formatter of their type, so a row costs one call per cell.
+    """
+    plan = [
+        (SPECIAL_FORMATTERS.get(column.header) or FORMATTERS[column.type]) if column.source else None
+        for column in columns
+    ]
+    padding = [''] * (WIDTH - len(columns))
+
+    def format_row(values):
+        values = iter(values)
+        cells = [formatter(next(values)) if formatter else '' for formatter in plan]
+        cells.extend(padding)
+        return cells
+
+    return format_row
+
+
+def pad(cells):
+    cells = list(cells)
+    return cells + [''] * (WIDTH - len(cells))
+
+
+def section_header(title, columns):
+    """The title row, type-hint row and column-name row that open a section."""
+    title_row = [title] + [PACKED_FORMATS.get(column.header, '') for column in columns[1:]]
+    return [pad(title_row), pad(column.type for column in columns), pad(column.header for column in columns)]
+
+
+class LogbookWriter:
+    """Write a ForeFlight logbook CSV from streams of selected value tuples."""
+
+    def __init__(self, out):
+        self.writer = csv.writer(out, lineterminator='\n')
+        self.aircraft = 0
+        self.flights = 0
+
+    def write(self, aircraft_rows, flight_rows):
+        writer = self.writer
+        writer.writerow(pad([TITLE]))
+        writer.writerow(pad([]))
+
+        writer.writerows(section_header(AIRCRAFT_SECTION, AIRCRAFT_COLUMNS))
+        format_aircraft = row_formatter(AIRCRAFT_COLUMNS)
+        for values in aircraft_rows:
+            writer.writerow(format_aircraft(values))
+            self.aircraft += 1
+        writer.writerow(pad([]))
+
+        writer.writerows(section_header(FLIGHTS_SECTION, FLIGHT_COLUMNS))
+        format_flight = row_formatter(FLIGHT_COLUMNS)
+        for values in flight_rows:
+            writer.writerow(format_flight(values))
+            self.flights += 1
+
+
+# Reading a ForeFlight logbook back in
+
+# Namespace of the guids derived for CSV rows, so re-importing a file updates the same rows
+LOGBOOK_NAMESPACE = uuid.UUID('5f0d1c1e-6a53-4a4f-9f4e-0b7c2f6c1e2a')
+
+# Platform code of the rows imported from a ForeFlight CSV; pilotlog_mcc exports only use
+# non-negative codes, and 0 is what a JSON record without one is given
+FOREFLIGHT_PLATFORM = -1
+
+# Section title -> export table it is imported as
+SECTION_TABLES = {AIRCRAFT_SECTION: 'aircraft', FLIGHTS_SECTION: 'flight'}
+
+# Section title -> model its rows are written to
+SECTION_MODELS = {AIRCRAFT_SECTION: Aircraft, FLIGHTS_SECTION: Flight}
+
+# Model field each known header of a section is imported into
+SECTION_TARGETS = {
+    AIRCRAFT_SECTION: {column.header: column.source for column in AIRCRAFT_COLUMNS if column.source},
+    FLIGHTS_SECTION: {column.header: column.source for column in FLIGHT_COLUMNS if column.source},
+}
+# Flights name their aircraft by AircraftID; it is resolved to the aircraft guid on import
+SECTION_TARGETS[FLIGHTS_SECTION]['AircraftID'] = 'aircraft_code'
+
+
+def logbook_guid(user_id, *parts):
+    """Deterministic guid of a CSV row of ``user_id`` identified by ``parts``."""
+    return uuid.uuid5(LOGBOOK_NAMESPACE, '\x1f'.join([str(user_id), *parts]))
+
+
+@lru_cache(maxsize=16384)
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, '%m/%d/%Y').date()
+
+
+@lru_cache(maxsize=2048)
+def parse_hhmm(value):
+    digits = value.replace(':', '').zfill(4)
+    if len(digits) != 4 or not digits.isdigit():
+        raise ValueError(f"Invalid hhmm time: {value!r}")
+    return time(int(digits[:2]), int(digits[2:]))
+
+
+def parse_decimal(value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid decimal: {value!r}") from None
+
+
+def parse_hours(value):
+    return (parse_decimal(value) * 60).quantize(MINUTES_PRECISION, ROUND_HALF_UP)
+
+
+def parse_number(value):
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"Invalid whole number: {value!r}")
+    return int(number)
+
+
+def parse_boolean(value):
+    return value.strip().lower() in ('true', 't', 'yes', 'y', '1', 'x')
+
+
+def parse_text(value):
+    return value
+
+
+def parse_equipment(value):
+    return 0 if value.strip().lower() in ('', 'aircraft') else 1
+
+
+def parse_gear(value):
+    return value.strip().lower() in ('conventional', 'tailwheel')
+
+
+# Type hint of a column -> parser of its non-empty cells
+PARSERS = {
+    'Text': parse_text,
+    'Packed Detail': parse_text,
+    'YYYY': parse_number,
+    'Number': parse_number,
+    'Decimal': parse_decimal,
+    'Boolean': parse_boolean,
+    'Date': parse_date,
+    'DateTime': parse_text,
+    'hhmm': parse_hhmm,
+}
+
+SPECIAL_PARSERS = {
+    'EquipmentType': parse_equipment,
+    'GearType': parse_gear,
+    **{header: parse_hours for header in HOUR_COLUMNS},
+}
+
+
+def checked(parser, field):
+    """Wrap ``parser`` to reject the numbers ``field`` cannot store, as ``convert_columns`` does."""
+    if isinstance(field, models.DecimalField):
+        step = Decimal(1).scaleb(-field.decimal_places)
+        limit = Decimal(10) ** (field.max_digits - field.decimal_places)
+        fits = lambda number: number.is_finite() and abs(number.quantize(step, ROUND_HALF_UP)) < limit
+    elif isinstance(field, models.IntegerField):
+        fits = lambda number: abs(number) <= INT_MAX
+    else:
+        return parser
+
+    def parse(value):
+        parsed = parser(value)
+        if isinstance(parsed, (int, Decimal)) and not fits(Decimal(parsed)):
+            raise ValueError(f"Value {value!r} does not fit {field.name}")
+        return parsed
+
+    return parse
+
+
+def section_parser(section, types, headers):
+    """Build ``parse(cells) -> {field: value}`` from a section's type-hint and header rows.
+
+    Each known header is parsed according to the type hint found in the
+    file; unknown headers and empty cells are skipped, so the model
+    defaults apply. Raises ValueError for a cell that cannot be parsed or
+    whose number does not fit its model field.
+    """
+    targets = SECTION_TARGETS[section]
+    model = SECTION_MODELS[section]
+    plan = []
+    for position, (type_hint, header) in enumerate(zip(types, headers)):
+        target = targets.get(header.strip())
+        if target is None:
+            continue
+        parser = SPECIAL_PARSERS.get(header.strip()) or PARSERS.get(type_hint.strip(), parse_text)
+        plan.append((position, target, checked(parser, model._meta.get_field(target))))
+
+    def parse(cells):
+        row = {}
+        width = len(cells)
+        for position, target, parser in plan:
+            if position < width:
+                value = cells[position].strip()
+                if value:
+                    row[target] = parser(value)
+        return row
+
+    return parse
+
+
+def iter_logbook_rows(file_obj):
+    """Split a ForeFlight logbook CSV into its sections while streaming it.
+
+    Yields ``(section, parse, cells)`` for every data row, where ``parse``
+    is the :func:`section_parser` built from that section's own type-hint
+    and header rows. Blank rows are skipped.
+    """
+    rows = csv.reader(file_obj)
+    section = parse = None
+    for cells in rows:
+        first = cells[0].strip() if cells else ''
+        if first in SECTION_TARGETS:
+            section = first
+            types = next(rows, [])
+            headers = next(rows, [])
+            parse = section_parser(section, types, headers)
+            continue
+        if parse is None or not any(cells):
+            continue
+        yield section, parse, cells
@@ -0,0 +1,131 @@
+import glob
+import io
+import os
+import time
+import traceback
+from collections import deque, namedtuple
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from pilotlog.checkpoints import file_digest
+from pilotlog.models import ImportJob
+
+# Files picked up from a directory
+IMPORT_EXTENSIONS = ('.json', '.csv')
+
+# Characters of a file's output kept for the report of a multi-file run; older output is dropped
+OUTPUT_LIMIT = 64 * 1024
+
+# Outcome of one file, as reported back to import_data; ``output`` is what the import wrote
+JobResult = namedtuple('JobResult', [
+    'source', 'status', 'seconds', 'records', 'created', 'updated', 'failed', 'error', 'output',
+])
+
+
+def expand_paths(patterns):
+    """The files named by ``patterns`` (paths, globs or directories), in order and each once.
+
+    A directory stands for the import files directly inside it, a glob for
+    the files it matches, both sorted by name. Raises ValueError for a
+    pattern that names no file.
+    """
+    paths, seen = [], set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = sorted(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if name.lower().endswith(IMPORT_EXTENSIONS) and os.path.isfile(os.path.join(pattern, name))
+            )
+        elif glob.has_magic(pattern):
+            found = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        elif os.path.isfile(pattern):
+            found = [pattern]
+        else:
+            raise ValueError(f"No such file: {pattern}")
+        if not found:
+            raise ValueError(f"No import files match {pattern}")
+        for path in found:
+            key = os.path.realpath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+class TailBuffer(io.TextIOBase):
+    """Text sink that keeps only about the last ``limit`` characters written to it."""
+
+    def __init__(self, limit=OUTPUT_LIMIT):
+        self.limit = limit
+        self.parts = deque()
+        self.size = 0
+        self.dropped = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        while self.size > self.limit and len(self.parts) > 1:
+            dropped = len(self.parts.popleft())
+            self.size -= dropped
+            self.dropped += dropped
+        return len(text)
+
+    def getvalue(self):
+        text = ''.join(self.parts)
+        if self.dropped:
+            text = f"[{self.dropped:,} characters of earlier output dropped]\n{text}"
+        return text
+
+
+def run_import_job(path, options, stdout=None, skip_imported=False):
+    """Import one file in this process and record it as an :class:`ImportJob`.
+
+    With ``skip_imported`` (the files of a multi-file run) the file is
+    hashed first and skipped if the same content was imported successfully
+    before; otherwise it is imported without being hashed up front. A
+    failing file is recorded as failed, with what was committed before the
+    failure counted, and never raises: the next file goes ahead regardless.
+    Without ``stdout`` the output is collected, up to ``OUTPUT_LIMIT``
+    characters, and returned with the result.
+    """
+    from pilotlog.management.commands.import_data import Command
+
+    started = time.perf_counter()
+    out = stdout or TailBuffer()
+    job = ImportJob(
+        source=os.path.abspath(path),
+        # Left empty when the file is not checked against earlier imports
+        source_hash=file_digest(path) if skip_imported else '',
+        source_size=os.path.getsize(path),
+        status=ImportJob.RUNNING,
+        started_at=timezone.now(),
+    )
+    if skip_imported and ImportJob.objects.filter(source_hash=job.source_hash, status=ImportJob.SUCCEEDED).exists():
+        job.status = ImportJob.SKIPPED
+    else:
+        # Saved up front, so a run that dies with the process still shows up
+        job.save()
+        command = Command(stdout=out, stderr=out)
+        try:
+            # Hashed at most once per file: the checkpoints of the import reuse the digest
+            command.import_file(path, source_hash=job.source_hash or None, **options)
+            job.status = ImportJob.SUCCEEDED
+        except CommandError as e:
+            job.status, job.error = ImportJob.FAILED, str(e)
+        except Exception:
+            job.status, job.error = ImportJob.FAILED, traceback.format_exc()
+        stats = getattr(command, 'stats', None)
+        if stats is not None:
+            job.counters = stats.as_dict()
+            job.records, job.created, job.updated, job.failed = (
+                sum(getattr(stats, field).values()) for field in ('records', 'created', 'updated', 'failed')
+            )
+    job.finished_at = timezone.now()
+    job.seconds = round(time.perf_counter() - started, 3)
+    job.save()
+    return JobResult(
+        job.source, job.status, job.seconds, job.records, job.created, job.updated, job.failed, job.error,
+        out.getvalue() if stdout is None else '',
+    )
+
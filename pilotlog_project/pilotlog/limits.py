@@ -0,0 +1,194 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date
+from itertools import accumulate
+
+from django.db import DEFAULT_DB_ALIAS
+
+from pilotlog.models import Flight, LimitRules
+
+# pilotlog_mcc period codes -> length of the rolling window in days. Codes not
+# listed here are read as a number of days (e.g. 28 for "any 28 days").
+PERIOD_DAYS = {
+    1: 1,
+    2: 7,
+    3: 28,
+    4: 30,
+    5: 90,
+    6: 365,
+}
+
+# Outcome of one rule for one pilot. Minutes throughout; ``breaches`` lists
+# ``(window end, minutes)`` of every flying day whose window exceeds the limit.
+LimitResult = namedtuple('LimitResult', [
+    'user_id', 'limit_code', 'window_days', 'limit', 'used', 'headroom', 'peak', 'peak_end', 'breaches',
+])
+
+
+def window_days(period_code):
+    """Rolling window of a period code in days, or None if it cannot be evaluated."""
+    if period_code in PERIOD_DAYS:
+        return PERIOD_DAYS[period_code]
+    return period_code if period_code and period_code > 0 else None
+
+
+class FlightSeries:
+    """A pilot's flight minutes summed per day, sorted, with running totals.
+
+    Built once per pilot; every rule is then evaluated against it, current
+    usage with two binary searches and the whole history with one linear
+    sliding-window pass.
+    """
+
+    def __init__(self, days, minutes):
+        self.days = days  # proleptic ordinals, ascending and distinct
+        self.minutes = minutes
+        self.totals = [0.0, *accumulate(minutes)]
+
+    @classmethod
+    def from_flights(cls, rows):
+        """Build from ``(date, minutes)`` rows sorted by date; undated flights are ignored."""
+        days, minutes = [], []
+        for day, value in rows:
+            if day is None:
+                continue
+            ordinal = day.toordinal()
+            if days and days[-1] == ordinal:
+                minutes[-1] += float(value or 0)
+            else:
+                days.append(ordinal)
+                minutes.append(float(value or 0))
+        return cls(days, minutes)
+
+    def bounds(self, first=None, last=None):
+        """Positions ``[start, end)`` of the days between ``first`` and ``last`` (inclusive ordinals)."""
+        start = bisect_left(self.days, first) if first is not None else 0
+        end = bisect_right(self.days, last) if last is not None else len(self.days)
+        return start, end
+
+    def total(self, first, last):
+        """Minutes flown on the days ``first`` to ``last``."""
+        start, end = self.bounds(first, last)
+        return self.totals[end] - self.totals[start] if end > start else 0.0
+
+    def windows(self, length, start, end):
+        """Yield ``(day, minutes)`` of the ``length``-day window ending on each flying day in ``[start, end)``.
+
+        Two pointers over the sorted days: each day enters and leaves the
+        window once, so a rule costs O(n) whatever its window length.
+        """
+        days, minutes = self.days, self.minutes
+        first, used = start, 0.0
+        for position in range(start, end):
+            day = days[position]
+            used += minutes[position]
+            while days[first] <= day - length:
+                used -= minutes[first]
+                first += 1
+            yield day, used
+
+
+def evaluate_rule(rule, series, as_of):
+    """Evaluate one LimitRules row against a pilot's series; None if it does not apply on ``as_of``."""
+    length = window_days(rule.l_period_code)
+    if length is None or rule.l_minutes <= 0:
+        return None
+    if (rule.l_from and as_of < rule.l_from) or (rule.l_to and as_of > rule.l_to):
+        return None
+    first = rule.l_from.toordinal() if rule.l_from else None
+    last = min(rule.l_to, as_of).toordinal() if rule.l_to else as_of.toordinal()
+
+    today = as_of.toordinal()
+    window_start = today - length + 1
+    if first is not None:
+        window_start = max(window_start, first)
+    used = series.total(window_start, today)
+    peak, peak_end, breaches = 0.0, None, []
+    start, end = series.bounds(first, last)
+    for day, minutes in series.windows(length, start, end):
+        if minutes > peak:
+            peak, peak_end = minutes, date.fromordinal(day)
+        if minutes > rule.l_minutes:
+            breaches.append((date.fromordinal(day), round(minutes, 2)))
+    return LimitResult(
+        user_id=rule.user_id,
+        limit_code=rule.limit_code,
+        window_days=length,
+        limit=rule.l_minutes,
+        used=round(used, 2),
+        headroom=round(rule.l_minutes - used, 2),
+        peak=round(peak, 2),
+        peak_end=peak_end,
+        breaches=breaches,
+    )
+
+
+def evaluate_limits(user_ids=None, as_of=None, using=DEFAULT_DB_ALIAS):
+    """Evaluate every applicable rule of every pilot (or of ``user_ids``) as of ``as_of`` (default today).
+
+    Rules are read in one query, and the flights of all pilots that have
+    rules in one streamed query ordered by (user_id, date), which the
+    flight_user_date index serves without sorting. Returns a list of
+    :data:`LimitResult`, grouped by user.
+    """
+    as_of = as_of or date.today()
+    rules = LimitRules.objects.using(using).order_by('user_id', 'pk')
+    if user_ids is not None:
+        rules = rules.filter(user_id__in=list(user_ids))
+    rules_by_user = {}
+    for rule in rules:
+        rules_by_user.setdefault(rule.user_id, []).append(rule)
+    if not rules_by_user:
+        return []
+
+    flights = Flight.objects.using(using).filter(date__isnull=False, date__lte=as_of)
+    if user_ids is not None:
+        flights = flights.filter(user_id__in=list(rules_by_user))
+    flights = (
+        flights.order_by('user_id', 'date')
+        .values_list('user_id', 'date', 'total_time')
+        .iterator(chunk_size=10000)
+    )
+    results = []
+
+    def evaluate(user_id, rows):
+        series = FlightSeries.from_flights(rows)
+        for rule in rules_by_user.pop(user_id):
+            result = evaluate_rule(rule, series, as_of)
+            if result is not None:
+                results.append(result)
+
+    current, rows = None, []
+    for user_id, day, minutes in flights:
+        if user_id != current:
+            if current in rules_by_user:
+                evaluate(current, rows)
+            current, rows = user_id, []
+        rows.append((day, minutes))
+    if current in rules_by_user:
+        evaluate(current, rows)
+    # Pilots with rules but no flights
+    for user_id in list(rules_by_user):
+        evaluate(user_id, [])
+    return results
+
+
+def report_lines(results, verbose=False):
+    """One line per rule (``verbose``) or per breached rule, and a summary line."""
+    lines = []
+    breached = 0
+    for result in results:
+        if result.breaches:
+            breached += 1
+        if not (verbose or result.breaches):
+            continue
+        line = (
+            f"user {result.user_id} rule {result.limit_code}: {result.used:g}/{result.limit} min "
+            f"in {result.window_days} days, headroom {result.headroom:g}, peak {result.peak:g}"
+        )
+        if result.breaches:
+            first, last = result.breaches[0][0], result.breaches[-1][0]
+            line += f", {len(result.breaches)} windows over the limit ({first} to {last})"
+        lines.append(line)
+    lines.append(f"{len(results)} rules evaluated, {breached} breached")
+    return lines
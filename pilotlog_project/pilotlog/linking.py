@@ -0,0 +1,55 @@
+import uuid
+
+from django.db import DEFAULT_DB_ALIAS
+
+from pilotlog.bulk import DEFAULT_BATCH_SIZE, DEFAULT_INDEX_CHUNK_SIZE
+from pilotlog.models import Aircraft, Flight
+
+
+def link_flight_aircraft(using=DEFAULT_DB_ALIAS, batch_size=DEFAULT_BATCH_SIZE, rollups=None, user_ids=None):
+    """Point ``Flight.aircraft`` at the Aircraft whose guid matches ``aircraft_code``.
+
+    Runs once after all tables are loaded: one scan of Aircraft and one
+    streamed scan of flights carrying a code (both only of ``user_ids``,
+    if given), then a ``bulk_update`` of ``batch_size`` flights per query
+    for only the flights whose link actually changes. The buckets of those
+    flights are added to the ``rollups`` tracker, if given.
+    """
+    aircraft = Aircraft.objects.using(using)
+    flights = Flight.objects.using(using)
+    if user_ids is not None:
+        aircraft = aircraft.filter(user_id__in=list(user_ids))
+        flights = flights.filter(user_id__in=list(user_ids))
+    aircraft_pks = dict(aircraft.values_list('guid', 'pk'))
+    resolved = {}
+
+    def resolve(code):
+        # Codes repeat across many flights, so parse each distinct one once
+        if code not in resolved:
+            try:
+                resolved[code] = aircraft_pks.get(uuid.UUID(code))
+            except ValueError:
+                resolved[code] = None
+        return resolved[code]
+
+    flights = (
+        flights
+        .exclude(aircraft_code__isnull=True)
+        .exclude(aircraft_code='')
+        .values_list('pk', 'aircraft_code', 'aircraft_id', 'user_id', 'date')
+    )
+    changed = []
+    linked = 0
+    for pk, code, current, user_id, day in flights.iterator(chunk_size=DEFAULT_INDEX_CHUNK_SIZE):
+        target = resolve(code)
+        if target != current:
+            changed.append(Flight(pk=pk, aircraft_id=target))
+            if rollups is not None:
+                rollups.add(user_id, day)
+        if len(changed) >= batch_size:
+            linked += Flight.objects.using(using).bulk_update(changed, ['aircraft'], batch_size=batch_size)
+            changed = []
+    if changed:
+        linked += Flight.objects.using(using).bulk_update(changed, ['aircraft'], batch_size=batch_size)
+    return linked
+
@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from pilotlog.benchmark import environment, peak_rss, write_export
+from pilotlog.bulk import DEFAULT_BATCH_SIZE
+from pilotlog.distances import update_bucket_distances
+from pilotlog.linking import link_flight_aircraft
+from pilotlog.management.commands.import_data import Command as ImportCommand
+from pilotlog.profiling import QueryRecorder, TableTimer
+from pilotlog.readers import JsonArrayReader
+from pilotlog.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+
+    help = "Benchmark import_data on a synthetic (or given) export and record the results"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--records', type=int, default=10000,
+            help="Size of the generated export, e.g. 10000, 100000 or 1000000 (default: 10000)",
+        )
+        parser.add_argument('--file', default=None, help="Benchmark this export instead of a generated one")
+        parser.add_argument('--seed', type=int, default=0, help="Seed of the generated export (default: 0)")
+        parser.add_argument('--users', type=int, default=1, help="Distinct user_ids in the generated export (default: 1)")
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Rows per bulk upsert (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            '--pipeline', action='store_true',
+            help="Benchmark the pipelined import (import_data --pipeline)",
+        )
+        parser.add_argument(
+            '--output', default='benchmarks.jsonl',
+            help="JSON Lines file the result is appended to (default: benchmarks.jsonl)",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+
+        # Never benchmark against the real data: run on a throwaway test database
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            if kwargs['file']:
+                result = self.run(kwargs['file'], kwargs['batch_size'], kwargs['pipeline'])
+            else:
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, 'benchmark.json')
+                    with open(path, 'w', encoding='utf-8') as out:
+                        write_export(out, kwargs['records'], seed=kwargs['seed'], users=kwargs['users'])
+                    result = self.run(path, kwargs['batch_size'], kwargs['pipeline'])
+                    result['generated'] = {'records': kwargs['records'], 'seed': kwargs['seed'], 'users': kwargs['users']}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        with open(kwargs['output'], 'a', encoding='utf-8') as out:
+            out.write(json.dumps(result, sort_keys=True) + '\n')
+        if kwargs['verbosity'] >= 1:
+            self.report(result)
+            self.stdout.write(self.style.SUCCESS(f"Result appended to {kwargs['output']}"))
+
+    def run(self, path, batch_size, pipeline=False):
+        """Import ``path`` once, timing each table and phase and counting queries."""
+        command = ImportCommand(stdout=io.StringIO())
+        command.verbosity = 0
+        timer = TableTimer()
+        counter = QueryRecorder()
+        phases = {}
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            with open(path, 'r', encoding='utf-8') as source:
+                command.import_serial(timer.wrap(JsonArrayReader(source)), batch_size, pipeline=pipeline)
+            phases['import'] = {'seconds': time.perf_counter() - started, 'queries': counter.count}
+
+            link_started, link_queries = time.perf_counter(), counter.count
+            link_flight_aircraft(batch_size=batch_size, rollups=command.rollups)
+            phases['link'] = {'seconds': time.perf_counter() - link_started, 'queries': counter.count - link_queries}
+
+            distance_started, distance_queries = time.perf_counter(), counter.count
+            update_bucket_distances(command.rollups.buckets, batch_size=batch_size)
+            phases['distance'] = {
+                'seconds': time.perf_counter() - distance_started, 'queries': counter.count - distance_queries,
+            }
+
+            rollup_started, rollup_queries = time.perf_counter(), counter.count
+            refresh_rollups(command.rollups.buckets)
+            phases['rollup'] = {'seconds': time.perf_counter() - rollup_started, 'queries': counter.count - rollup_queries}
+        elapsed = time.perf_counter() - started
+
+        stats = command.stats
+        tables = {}
+        for table in stats.tables():
+            seconds = timer.seconds(table)
+            tables[table] = {
+                'records': stats.records[table],
+                'seconds': round(seconds, 4),
+                'records_per_sec': round(stats.records[table] / seconds) if seconds else None,
+                **{field: getattr(stats, field)[table] for field in stats.fields if field != 'records'},
+            }
+        records = sum(stats.records.values())
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'file': os.path.basename(path),
+            'file_bytes': os.path.getsize(path),
+            'batch_size': batch_size,
+            'pipeline': pipeline,
+            'records': records,
+            'seconds': round(elapsed, 4),
+            'records_per_sec': round(records / elapsed) if elapsed else None,
+            'peak_rss_bytes': peak_rss(),
+            'queries': counter.count,
+            'phases': {name: {'seconds': round(phase['seconds'], 4), 'queries': phase['queries']} for name, phase in phases.items()},
+            'tables': tables,
+            'environment': environment(),
+        }
+
+    def report(self, result):
+        """Print one line per table and the totals of a benchmark result."""
+        lines = [f"{'Table':<14} {'Records':>10} {'Seconds':>9} {'Rate/s':>10}"]
+        for table, row in result['tables'].items():
+            rate = f"{row['records_per_sec']:,}" if row['records_per_sec'] is not None else '-'
+            lines.append(f"{table:<14} {row['records']:>10,} {row['seconds']:>9.3f} {rate:>10}")
+        lines.append(f"{'total':<14} {result['records']:>10,} {result['seconds']:>9.3f} {result['records_per_sec'] or 0:>10,}")
+        peak = result['peak_rss_bytes']
+        lines.append(
+            f"Queries: {result['queries']:,}   Peak RSS: {peak / 2 ** 20:,.1f} MiB" if peak is not None
+            else f"Queries: {result['queries']:,}"
+        )
+        self.stdout.write('\n'.join(lines))
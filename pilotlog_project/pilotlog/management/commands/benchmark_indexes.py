@@ -0,0 +1,186 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from pilotlog.benchmark import environment
+from pilotlog.models import Aircraft, Airfield, Flight
+
+# Rows written per INSERT while filling the benchmark tables
+FILL_BATCH_SIZE = 5000
+
+# Models whose own indexes are dropped for the "before" measurement
+INDEXED_MODELS = [Flight, Airfield, Aircraft]
+
+FIRST_DATE = date(2015, 1, 1)
+DAYS = 3650
+
+
+class Command(BaseCommand):
+
+    help = "Compare query plans and timings of the hot pilotlog queries without and with the model indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help="Flights to generate (default: 1000000)")
+        parser.add_argument('--users', type=int, default=100, help="Users the flights are spread over (default: 100)")
+        parser.add_argument('--airfields', type=int, default=50000, help="Airfields to generate (default: 50000)")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per query; the median is reported (default: 5)")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+        parser.add_argument('--output', default=None, help="Also write the results as JSON to this file")
+
+    def handle(self, *args, **kwargs):
+        if kwargs['rows'] < 1 or kwargs['users'] < 1 or kwargs['repeat'] < 1:
+            raise CommandError("--rows, --users and --repeat must be positive integers")
+        self.verbosity = kwargs['verbosity']
+        self.random = random.Random(kwargs['seed'])
+
+        # Never touch the real data: fill a throwaway test database
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.fill(kwargs['rows'], kwargs['users'], kwargs['airfields'])
+            queries = self.hot_queries(kwargs['rows'], kwargs['users'])
+
+            self.set_indexes(False)
+            before = self.measure(queries, kwargs['repeat'])
+            self.set_indexes(True)
+            after = self.measure(queries, kwargs['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        results = {
+            'rows': kwargs['rows'],
+            'users': kwargs['users'],
+            'airfields': kwargs['airfields'],
+            'environment': environment(),
+            'queries': {
+                name: {'before': before[name], 'after': after[name]} for name in before
+            },
+        }
+        self.report(results)
+        if kwargs['output']:
+            with open(kwargs['output'], 'w', encoding='utf-8') as out:
+                json.dump(results, out, indent=2, sort_keys=True)
+
+    def log(self, message):
+        if self.verbosity >= 1:
+            self.stdout.write(message)
+
+    def fill(self, rows, users, airfields):
+        """Write ``rows`` flights over ``users`` users (five aircraft each) and ``airfields`` airfields."""
+        rand = self.random
+        started = time.perf_counter()
+        aircraft = [
+            Aircraft(
+                user_id=user_id, guid=uuid.uuid4(), platform=9, _modified=0, make='Cessna', model='172',
+                category=1, aircraft_class=1, power=1, seats=4, active=True, reference=f'N{user_id}{number}',
+                tailwheel=False, complex=False, high_perf=False, aerobatic=False, fnpt=0, kg5700=False,
+                company='', cond_log=0, fav_list=False, record_modified=0,
+            )
+            for user_id in range(1, users + 1) for number in range(5)
+        ]
+        Aircraft.objects.bulk_create(aircraft, batch_size=FILL_BATCH_SIZE)
+        fleet = {}
+        for pk, user_id in Aircraft.objects.values_list('pk', 'user_id'):
+            fleet.setdefault(user_id, []).append(pk)
+
+        def flights():
+            for position in range(rows):
+                user_id = rand.randint(1, users)
+                yield Flight(
+                    user_id=user_id, guid=uuid.UUID(int=rand.getrandbits(128), version=4), platform=9,
+                    _modified=1500000000 + position, aircraft_id=rand.choice(fleet[user_id]),
+                    date=FIRST_DATE + timedelta(days=rand.randrange(DAYS)), from_airport='EDDF', to_airport='EDDM',
+                    total_time=Decimal(rand.randint(30, 600)), distance=Decimal(0),
+                )
+
+        self.bulk_fill(Flight, flights())
+        letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+        def airfield_rows():
+            for position in range(airfields):
+                yield Airfield(
+                    user_id=0, guid=uuid.uuid4(), platform=9, _modified=0, af_code=f'AF{position:07d}',
+                    # Like real data, only part of the airfields carry each code
+                    af_icao=''.join(rand.choices(letters, k=4)) if rand.random() < 0.3 else '',
+                    af_iata=''.join(rand.choices(letters, k=3)) if rand.random() < 0.2 else '',
+                    af_cat=0, tz_code=0, latitude=0, longitude=0, af_country=0, region_user=0,
+                    elevation_ft=0, record_modified=0,
+                )
+
+        self.bulk_fill(Airfield, airfield_rows())
+        self.log(f"Filled {rows:,} flights and {airfields:,} airfields in {time.perf_counter() - started:.1f}s")
+
+    def bulk_fill(self, model, objects):
+        batch = []
+        for instance in objects:
+            batch.append(instance)
+            if len(batch) >= FILL_BATCH_SIZE:
+                with transaction.atomic():
+                    model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+
+    def hot_queries(self, rows, users):
+        """The user-scoped, sync and lookup queries the index set is designed for, over ``rows`` flights."""
+        user_id = users // 2 + 1
+        aircraft_id = Aircraft.objects.filter(user_id=user_id).values_list('pk', flat=True).first()
+        icao = Airfield.objects.exclude(af_icao='').values_list('af_icao', flat=True).first()
+        iata = Airfield.objects.exclude(af_iata='').values_list('af_iata', flat=True).first()
+        # Syncs fetch about the last 100 changes per user; a small table falls back to its oldest flight
+        since = Flight.objects.order_by('-_modified').values_list('_modified', flat=True)[min(100 * users, rows - 1)]
+        return {
+            'logbook page': Flight.objects.filter(user_id=user_id, date__gte=date(2020, 1, 1))
+            .order_by('date', 'id').values_list('id', 'date', 'total_time')[:50],
+            'date range': Flight.objects.filter(user_id=user_id, date__range=(date(2020, 1, 1), date(2020, 3, 31)))
+            .values_list('id', 'date'),
+            'sync since': Flight.objects.filter(user_id=user_id, _modified__gt=since).values_list('guid', '_modified'),
+            'aircraft totals': Flight.objects.filter(user_id=user_id, aircraft_id=aircraft_id)
+            .values('aircraft').annotate(total=Sum('total_time'), flights=Count('id')).order_by(),
+            'airfield by ICAO': Airfield.objects.filter(af_icao=icao).values_list('id', 'af_name'),
+            'airfield by IATA': Airfield.objects.filter(af_iata=iata).values_list('id', 'af_name'),
+        }
+
+    def set_indexes(self, enabled):
+        """Drop or (re)create the declared indexes, then refresh the planner statistics."""
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    if enabled:
+                        editor.add_index(model, index)
+                    else:
+                        editor.remove_index(model, index)
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def measure(self, queries, repeat):
+        """Median wall time (ms) and plan of every query."""
+        results = {}
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {'ms': round(statistics.median(timings), 3), 'plan': queryset.explain()}
+        return results
+
+    def report(self, results):
+        lines = [f"{'Query':<18} {'Before ms':>10} {'After ms':>10} {'Speedup':>8}"]
+        for name, result in results['queries'].items():
+            before, after = result['before']['ms'], result['after']['ms']
+            speedup = f'{before / after:,.1f}x' if after else '-'
+            lines.append(f"{name:<18} {before:>10.3f} {after:>10.3f} {speedup:>8}")
+        for name, result in results['queries'].items():
+            lines.append('')
+            lines.append(name)
+            lines.append('  before: ' + result['before']['plan'].replace('\n', '\n          '))
+            lines.append('  after:  ' + result['after']['plan'].replace('\n', '\n          '))
+        self.stdout.write('\n'.join(lines))
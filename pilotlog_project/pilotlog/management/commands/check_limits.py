@@ -0,0 +1,27 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from pilotlog.limits import evaluate_limits, report_lines
+
+
+class Command(BaseCommand):
+
+    help = "Evaluate the LimitRules of every pilot against their flights and report usage and breaches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', default=None,
+            help="Only check this user_id; repeat for several (default: every pilot with rules)",
+        )
+        parser.add_argument(
+            '--as-of', default=None,
+            help="Evaluate the windows ending on this date, YYYY-MM-DD (default: today)",
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            as_of = date.fromisoformat(kwargs['as_of']) if kwargs['as_of'] else None
+        except ValueError:
+            raise CommandError("--as-of must be a date in YYYY-MM-DD format")
+        results = evaluate_limits(user_ids=kwargs['user'], as_of=as_of)
+        self.stdout.write('\n'.join(report_lines(results, verbose=kwargs['verbosity'] >= 2)))
+
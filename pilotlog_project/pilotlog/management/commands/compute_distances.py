@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from pilotlog.bulk import DEFAULT_BATCH_SIZE
+from pilotlog.distances import update_distances
+from pilotlog.models import Flight
+
+
+class Command(BaseCommand):
+
+    help = "Recompute the great-circle route distance of existing flights from their airfields"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help="Only update the flights of this user_id (default: all users)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Flights written per UPDATE (default: {DEFAULT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+        flights = Flight.objects.all()
+        if kwargs['user'] is not None:
+            flights = flights.filter(user_id=kwargs['user'])
+
+        started = time.perf_counter()
+        updated = update_distances(flights, batch_size=kwargs['batch_size'])
+        if kwargs['verbosity'] >= 1:
+            self.stdout.write(self.style.SUCCESS(
+                f"Updated the distance of {updated} flights in {time.perf_counter() - started:.1f}s"
+            ))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from pilotlog.foreflight import AIRCRAFT_COLUMNS, FLIGHT_COLUMNS, LogbookWriter, source_fields
+from pilotlog.models import Aircraft, Flight
+
+# Rows fetched per round-trip while streaming a table
+DEFAULT_CHUNK_SIZE = 2000
+
+# Bytes buffered before the CSV is written out
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class Command(BaseCommand):
+
+    help = "Export the logbook as a ForeFlight logbook CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-',
+            help="File to write, '-' for standard output (default: -)",
+        )
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help="Only export the aircraft and flights of this user_id (default: all users)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f"Rows fetched per database round-trip (default: {DEFAULT_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be a positive integer")
+        aircraft = Aircraft.objects.all()
+        flights = Flight.objects.all()
+        if kwargs['user'] is not None:
+            aircraft = aircraft.filter(user_id=kwargs['user'])
+            flights = flights.filter(user_id=kwargs['user'])
+
+        chunk_size = kwargs['chunk_size']
+        # Plain value tuples straight from the cursor; no model instance is ever built
+        aircraft_rows = unique_aircraft(
+            aircraft.order_by('reference', 'pk').values_list(*source_fields(AIRCRAFT_COLUMNS)).iterator(chunk_size=chunk_size)
+        )
+        flight_rows = (
+            flights.order_by('user_id', 'date', 'pk')
+            .values_list(*source_fields(FLIGHT_COLUMNS))
+            .iterator(chunk_size=chunk_size)
+        )
+
+        if kwargs['output'] == '-':
+            writer = LogbookWriter(self.stdout)
+            writer.write(aircraft_rows, flight_rows)
+            return
+
+        with open(kwargs['output'], 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as out:
+            writer = LogbookWriter(out)
+            writer.write(aircraft_rows, flight_rows)
+        if kwargs['verbosity'] >= 1:
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {writer.aircraft} aircraft and {writer.flights} flights to {kwargs['output']}"
+            ))
+
+
+def unique_aircraft(rows):
+    """Keep the first aircraft of each AircraftID; ForeFlight identifies aircraft by it."""
+    seen = set()
+    for row in rows:
+        if row[0] not in seen:
+            seen.add(row[0])
+            yield row
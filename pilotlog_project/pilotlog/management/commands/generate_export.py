@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from pilotlog.benchmark import write_export
+
+
+class Command(BaseCommand):
+
+    help = "Write a synthetic pilotlog_mcc JSON export for benchmarks and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="File to write")
+        parser.add_argument(
+            '--records', type=int, default=10000,
+            help="Number of records to generate, e.g. 10000, 100000 or 1000000 (default: 10000)",
+        )
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same file")
+        parser.add_argument('--users', type=int, default=1, help="Number of distinct user_ids (default: 1)")
+
+    def handle(self, *args, **kwargs):
+        if kwargs['records'] < 0:
+            raise CommandError("--records must not be negative")
+        if kwargs['users'] < 1:
+            raise CommandError("--users must be a positive integer")
+        with open(kwargs['output'], 'w', encoding='utf-8') as out:
+            write_export(out, kwargs['records'], seed=kwargs['seed'], users=kwargs['users'])
+        if kwargs['verbosity'] >= 1:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {kwargs['records']:,} records to {kwargs['output']}"))
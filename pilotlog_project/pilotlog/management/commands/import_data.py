@@ -1,500 +1,615 @@
-import json
 import os
-import uuid
-from datetime import datetime
-from decimal import Decimal, InvalidOperation
+from collections import Counter
+from contextlib import nullcontext
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from pilotlog.models import *
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from pilotlog.airfields import invalidate_airfield_index
+from pilotlog.bulk import DEFAULT_BATCH_SIZE, DEFAULT_INDEX_CHUNK_SIZE, BulkUpsertWriter
+from pilotlog.checkpoints import Checkpointer
+from pilotlog.columnar import ColumnarBatcher, columnar_available
+from pilotlog.distances import update_bucket_distances
+from pilotlog.foreflight import FOREFLIGHT_PLATFORM, SECTION_TABLES, iter_logbook_rows, logbook_guid
+from pilotlog.jobs import expand_paths, run_import_job
+from pilotlog.limits import evaluate_limits, report_lines
+from pilotlog.linking import link_flight_aircraft
+from pilotlog.mappings import TABLE_SPECS, compile_spec
+from pilotlog.models import Flight, ImportJob
+from pilotlog.parallel import run_file_imports, run_parallel_import
+from pilotlog.pipeline import PipelinedWriter, PrefetchedReader
+from pilotlog.profiling import ImportProfiler
+from pilotlog.progress import DEFAULT_INTERVAL, ImportStats, ProgressReporter
+from pilotlog.queries import invalidate_flights, invalidate_queries
+from pilotlog.readers import JsonArrayReader
+from pilotlog.rollups import RollupTracker, refresh_rollups
+from pilotlog.watermarks import load_watermarks, merge_watermarks, record_mark, save_watermarks
 
 class Command(BaseCommand):
 
     help = "Import data from JSON file into the database"
 
-    Table_Mapping = {
-        'aircraft': "import_aircraft", 
-        'flight': "import_flights",
-        'imagepic': "import_imagepic",
-        'limitrules': "import_limitrules",
-        'myquery': "import_myquery",
-        'myquerybuild': "import_myquerybuild",
-        'pilot': "import_pilot",
-        'qualification': "import_qualification",
-        'settingconfig': "import_settingconfig",
-        'airfield': "import_airfield"
-    }
+    # Declarative field mapping of each export table, see pilotlog.mappings
+    Table_Mapping = {spec.table: spec for spec in TABLE_SPECS}
 
-    def handle(self, *args, **kwargs):
-        # Path to the JSON file (modify as needed)
-        json_file_path = os.path.join(
-            settings.BASE_DIR, 'pilotlog', 'required_resource', 'import - pilotlog_mcc.json'
-        )
-        self.stdout.write(self.style.SUCCESS("Successfully opened JSON file"))
-        self.stdout.write(f"JSON file path: {json_file_path}")
-        
-        # Open and load the JSON data
-        with open(json_file_path, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-        
-        # Iterate over each record in the JSON data
-        for record in data:
-            table_name = record['table'].lower()  # Convert table name to lowercase
-            
-            # Find and call the appropriate import method
-            method_name = self.Table_Mapping.get(table_name)
-            if method_name:
-                method_to_call = getattr(self, method_name)
-                method_to_call(record)
-                self.stdout.write(self.style.SUCCESS(f'Successfully imported {table_name} record: {record["guid"]}'))
-            else:
-                self.stdout.write(self.style.WARNING(f'No import method for table: {table_name}'))
+    # Model written for each table
+    Table_Models = {spec.table: spec.model for spec in TABLE_SPECS}
 
-    def get_valid_date(self, value):
-        """Convert date strings to date objects."""
-        if isinstance(value, str) and value:
-            try:
-                return datetime.strptime(value, '%Y-%m-%d').date()
-            except ValueError:
-                self.stdout.write(self.style.WARNING(f"Invalid date format for value: {value}. Skipping."))
-        elif value is None or value == '':
-            return None
-        else:
-            self.stdout.write(self.style.WARNING(f"Unexpected value type for date conversion: {type(value)}. Skipping."))
-        return None
+    # Tables whose numeric columns are converted per chunk with NumPy
+    Columnar_Tables = {'flight'}
 
-    def get_valid_decimal(self, value, default=0):
-        """Convert value to Decimal if valid, otherwise return default."""
-        if value:
-            try:
-                return Decimal(value)
-            except (InvalidOperation, ValueError) as e:
-                self.stdout.write(self.style.WARNING(f"Invalid decimal value for {value}: {e}.  Using default value {default}."))
-        return Decimal(default)
-
-    def get_valid_integer(self, value):
-        """Convert value to Integer if valid, otherwise return None."""
-        if value:
-            try:
-                return int(value)
-            except (ValueError, TypeError) as e:
-                self.stdout.write(self.style.WARNING(f"Invalid integer value for {value}: {e}. Skipping."))
-        return None
-
-    def get_valid_time(self, value):
-        """Convert time strings to integers."""
-        if isinstance(value, str) and value:
-            try:
-                return int(value)
-            except ValueError:
-                self.stdout.write(self.style.WARNING(f"Invalid time format for value: {value}. Skipping."))
-        return None
-
-    def validate_guid(self, guid):
-        if guid and isinstance(guid, str) and len(guid) == 36:  # Example validation
-            return True
-        return False
-
-    def import_aircraft(self, record):
-        """Import Aircraft data."""
-        meta = record['meta']
-
-        # Create or update the Aircraft record
-        aircraft, created = Aircraft.objects.update_or_create(
-            guid=uuid.UUID(record['guid']),
-            defaults={
-                'user_id': record['user_id'],
-                'platform': record['platform'],
-                '_modified': record['_modified'],
-                'make': meta.get('Make', ''),
-                'model': meta.get('Model', ''),
-                'category': meta.get('Category', 0),
-                'aircraft_class': meta.get('Class', 0),
-                'power': meta.get('Power', 0),
-                'seats': meta.get('Seats', 0),
-                'active': meta.get('Active', False),
-                'reference': meta.get('Reference', ''),
-                'tailwheel': meta.get('Tailwheel', False),
-                'complex': meta.get('Complex', False),
-                'high_perf': meta.get('HighPerf', False),
-                'aerobatic': meta.get('Aerobatic', False),
-                'fnpt': meta.get('FNPT', 0),
-                'kg5700': meta.get('Kg5700', False),
-                'rating': meta.get('Rating', ''),
-                'company': meta.get('Company', ''),
-                'cond_log': meta.get('CondLog', 0),
-                'fav_list': meta.get('FavList', False),
-                'sub_model': meta.get('SubModel', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
-        )
+    # Conversion errors that fail a single record instead of the whole run
+    Record_Errors = (ValueError, TypeError, KeyError, AttributeError)
 
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Aircraft: {aircraft.reference}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Aircraft: {aircraft.reference}'))
+    verbosity = 1
 
-        # Assign the Aircraft to a Flight if a Flight record exists
-        try:
-            flight_instance = Flight.objects.get(guid=uuid.UUID(record['guid']))
-            flight_instance.aircraft = aircraft
-            flight_instance.save()
-            self.stdout.write(self.style.SUCCESS(f'Assigned Aircraft to Flight: {flight_instance.guid}'))
-        except Flight.DoesNotExist:
-            self.stdout.write(self.style.WARNING(f'No Flight found with guid: {record.get("FlightGuid", "")}'))
-            
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Aircraft: {aircraft.reference}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Aircraft: {aircraft.reference}'))
-            
-    def import_flights(self, record):
-        """Import Flight data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-            return
+    # Set by --profile / --profile-output
+    profiler = None
 
-        meta = record['meta']
-
-        # Create or update the Flight record
-        flight, created = Flight.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                '_modified': record.get('_modified', 0),
-                'aircraft_id': meta.get('AircraftCode', ''),
-                'from_airport': meta.get('ArrCode', ''),  # Assuming 'ArrCode' as 'from_airport'
-                'to_airport': meta.get('DepCode', ''),    # Assuming 'DepCode' as 'to_airport'
-                'route': meta.get('Route', ''),
-                'date': self.get_valid_date(meta.get('DateUTC', '')),
-                'time_out': self.get_valid_time(meta.get('ArrTimeUTC', '')),
-                'time_off': self.get_valid_time(meta.get('DepTimeUTC', '')),
-                'time_on': self.get_valid_time(meta.get('LdgTimeUTC', '')),
-                'time_in': self.get_valid_time(meta.get('ArrTimeUTC', '')),  # Consider replacing if another field is more appropriate
-                'on_duty': self.get_valid_time(meta.get('ArrOffset', '')),
-                'off_duty': self.get_valid_time(meta.get('DepOffset', '')),
-                'total_time': self.get_valid_decimal(meta.get('minTOTAL', 0)),  # Based on available fields, `minTOTAL` seems closest
-                'pic': self.get_valid_decimal(meta.get('minPIC', 0)),
-                'sic': self.get_valid_decimal(meta.get('minCOP', 0)),  # Assuming 'minCOP' as 'SIC'
-                'night': self.get_valid_decimal(meta.get('minNIGHT', 0)),
-                'solo': self.get_valid_decimal(meta.get('minSFR', 0)),
-                'cross_country': self.get_valid_decimal(meta.get('minXC', 0)),
-                'nvg': self.get_valid_decimal(meta.get('minNIGHT', 0)),  # Assuming 'minNIGHT' for NVG, adjust if necessary
-                'nvg_ops': self.get_valid_decimal(meta.get('minAIR', 0)),
-                'distance': self.get_valid_decimal(meta.get('FuelUsed', 0)),  # No direct distance field found, 'FuelUsed' may be a placeholder
-                'day_takeoffs': self.get_valid_integer(meta.get('ToDay', 0)),  # Assuming 'ToDay' might represent day takeoffs
-                'day_landings_full_stop': self.get_valid_integer(meta.get('LdgDay', 0)),  # Assuming 'LdgDay' represents day landings full stop
-                'night_takeoffs': self.get_valid_integer(meta.get('ToNight', 0)),  # Assuming 'ToNight' might represent night takeoffs
-                'night_landings_full_stop': self.get_valid_integer(meta.get('LdgNight', 0)),
-                'all_landings': self.get_valid_integer(meta.get('Holding', 0)),  # 'Holding' used as a placeholder, adjust if necessary
-                'actual_instrument': self.get_valid_decimal(meta.get('minINSTR', 0)),
-                'simulated_instrument': self.get_valid_decimal(meta.get('minIFR', 0)),  # No direct field for simulated instrument found
-                'hobbs_start': self.get_valid_decimal(meta.get('HobbsIn', 0)),
-                'hobbs_end': self.get_valid_decimal(meta.get('HobbsOut', 0)),
-                'tach_start': self.get_valid_decimal(meta.get('ArrTimeSCHED', 0)),  # Placeholder for tach start
-                'tach_end': self.get_valid_decimal(meta.get('DepTimeSCHED', 0)),    # Placeholder for tach end
-                'holds': self.get_valid_integer(meta.get('Holding', 0)),
-                'approach': meta.get('TagApproach', ''),
-                'dual_given': self.get_valid_decimal(meta.get('minDUAL', 0)),
-                'simulated_flight': self.get_valid_decimal(meta.get('minEXAM', 0)),  # Placeholder for simulated flight
-                'ground_training': self.get_valid_decimal(meta.get('Training', 0)),
-                'instructor_comments': meta.get('Remarks', ''),
-                'pilot_comments': meta.get('Remarks', ''),
-                'flight_review': meta.get('ToEdit', False),  # Using 'ToEdit' as a placeholder
-                'checkride': meta.get('NextPage', False),
-                'ipc': meta.get('UserBool', False),  # Assuming 'UserBool' for IPC status
-                'nvg_proficiency': meta.get('PF', False)  # Assuming 'PF' represents NVG proficiency
-            }
-        )
+    # Options handed to the import of every file of a run
+    File_Options = (
+        'user', 'replace', 'batch_size', 'workers', 'pipeline', 'incremental', 'resume', 'checkpoint_every',
+        'progress_interval', 'check_limits', 'profile', 'profile_output', 'verbosity',
+    )
 
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Flight: {flight.guid}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Flight: {flight.guid}'))
-            
-    def import_imagepic(self, record):
-        """Import ImagePic data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-            return
-        meta = record['meta']
-        
-        # Create or update the ImagePic record
-        imagepic, created = ImagePic.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            img_code=meta['ImgCode'],
-            defaults={
-                'user_id': record['user_id'],
-                'platform': record['platform'],
-                '_modified': record['_modified'],
-                'file_ext': meta.get('FileExt', ''),
-                'file_name': meta.get('FileName', ''),
-                'link_code': meta.get('LinkCode', ''),
-                'img_upload': meta.get('Img_Upload', ''),
-                'img_download': meta.get('Img_Download', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
-        )
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new ImagePic: {imagepic.img_code}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated ImagePic: {imagepic.img_code}'))
+    # Users whose flights are relinked by id; larger imports scan every flight instead
+    Link_Users_Limit = 500
 
-    def import_limitrules(self, record):
-        """Import LimitRules data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-            return
-
-        meta = record['meta']
-
-        # Create or update the LimitRules record
-        limitrules, created = LimitRules.objects.update_or_create(
-            user_id=record.get('user_id', 0),
-            limit_code=uuid.UUID(meta.get('LimitCode', '')),
-            platform=record.get('platform', 0),
-            defaults={
-                'guid': uuid.UUID(guid),  
-                '_modified': record.get('_modified', 0),
-                'l_from': self.get_valid_date(meta.get('LFrom', '')),
-                'l_to': self.get_valid_date(meta.get('LTo', '')),
-                'l_type': meta.get('LType', 0),
-                'l_zone': meta.get('LZone', 0),
-                'l_minutes': meta.get('LMinutes', 0),
-                'l_period_code': meta.get('LPeriodCode', 0),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help="Files, globs or directories to import: pilotlog_mcc JSON exports and ForeFlight logbook CSVs "
+                 "(*.csv); a directory imports every *.json and *.csv file in it",
         )
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new LimitRules: {limitrules.limit_code}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated LimitRules: {limitrules.limit_code}'))
-
-    def import_myquery(self, record):
-        """Import MyQuery data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-            return
-
-        meta = record['meta']
-
-        # Create or update the Query record
-        query, created = Query.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'name': meta.get('Name', ''),
-                'mQCode': meta.get('mQCode', ''),
-                'quick_view': meta.get('QuickView', False),
-                'short_name': meta.get('ShortName', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                '_modified': record.get('_modified', 0),
-            }
+        parser.add_argument(
+            '--file', default=None,
+            help="File to import: a pilotlog_mcc JSON export, or a ForeFlight logbook CSV (*.csv) "
+                 "(default: required_resource/import - pilotlog_mcc.json)",
         )
-
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Query: {query.name}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Query: {query.name}'))
-
-
-    def import_myquerybuild(self, record):
-        """Import MyQueryBuild data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-            return
-
-        meta = record['meta']
-        
-        # Create or update the MyQueryBuild record
-        myquerybuild, created = MyQueryBuild.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                '_modified': record.get('_modified', 0),
-                'build1': meta.get('Build1', ''),
-                'build2': meta.get('Build2', 0),
-                'build3': meta.get('Build3', 0),
-                'build4': meta.get('Build4', ''),
-                'mQCode': meta.get('mQCode', ''),
-                'mQBCode': meta.get('mQBCode', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help="Files imported at the same time, each in its own process; needs a server database, "
+                 "SQLite allows a single writer (default: 1)",
         )
-        
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new MyQueryBuild: {myquerybuild.guid}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated MyQueryBuild: {myquerybuild.guid}'))
-
-    def import_pilot(self, record):
-        """Import Pilot data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-            return
-
-        meta = record['meta']
-        
-        # Create or update the Pilot record
-        pilot, created = Pilot.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                '_modified': record.get('_modified', 0),
-                'notes': meta.get('Notes', ''),
-                'active': meta.get('Active', False),
-                'company': meta.get('Company', ''),
-                'fav_list': meta.get('FavList', False),
-                'user_api': meta.get('UserAPI', ''),
-                'facebook': meta.get('Facebook', ''),
-                'linkedin': meta.get('LinkedIn', ''),
-                'pilot_ref': meta.get('PilotRef', ''),
-                'pilot_code': meta.get('PilotCode', ''),
-                'pilot_name': meta.get('PilotName', ''),
-                'pilot_email': meta.get('PilotEMail', ''),
-                'pilot_phone': meta.get('PilotPhone', ''),
-                'certificate': meta.get('Certificate', ''),
-                'phone_search': meta.get('PhoneSearch', ''),
-                'pilot_search': meta.get('PilotSearch', ''),
-                'roster_alias': meta.get('RosterAlias', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
+        parser.add_argument(
+            '--force', action='store_true',
+            help="In a multi-file run, import files even if their exact content was imported successfully before",
+        )
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help="user_id the rows of a ForeFlight CSV belong to (required for *.csv files)",
+        )
+        parser.add_argument(
+            '--replace', action='store_true',
+            help="Treat a ForeFlight CSV as the user's whole logbook: delete their ForeFlight flights it does not contain",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Number of rows per model written in one bulk upsert (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help="Number of worker processes; tables (and Flight guids) are partitioned across them. Meant for a "
+                 "server database: SQLite takes one writer at a time, so it gains nothing there (default: 1)",
+        )
+        parser.add_argument(
+            '--pipeline', action='store_true',
+            help="Overlap reading, converting and writing in separate threads joined by bounded queues",
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help="Skip records whose _modified is not newer than the last import of their user and table",
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help="Continue an interrupted import of the same file from its last checkpoint",
+        )
+        parser.add_argument(
+            '--checkpoint-every', type=int, default=None,
+            help="Save a checkpoint every N records read so --resume can continue an interrupted run; each one "
+                 "flushes every partially filled batch (default: off, or the batch size with --resume)",
+        )
+        parser.add_argument(
+            '--progress-interval', type=float, default=DEFAULT_INTERVAL,
+            help=f"Seconds between progress reports (default: {DEFAULT_INTERVAL:g})",
+        )
+        parser.add_argument(
+            '--check-limits', action='store_true',
+            help="After the import, evaluate the LimitRules of every pilot whose flights or rules were imported",
+        )
+        parser.add_argument(
+            '--profile', action='store_true',
+            help="Report time per phase and table, SQL query counts and time, and the slowest statements",
+        )
+        parser.add_argument(
+            '--profile-output', default=None,
+            help="Also run cProfile and write its pstats file here (implies --profile)",
         )
-        
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Pilot: {pilot.pilot_name}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Pilot: {pilot.pilot_name}'))
-
 
-    def import_qualification(self, record):
-        """Import Qualification data."""
-        guid = record.get('guid')
-        if not self.validate_guid(guid):
-            self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
+    def handle(self, *args, **kwargs):
+        if kwargs['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+        if kwargs['workers'] < 1:
+            raise CommandError("--workers must be a positive integer")
+        if kwargs['jobs'] < 1:
+            raise CommandError("--jobs must be a positive integer")
+        if kwargs['checkpoint_every'] is None:
+            # Checkpoints cost a flush of every buffer each time; only a resumed run keeps taking them unasked
+            kwargs['checkpoint_every'] = kwargs['batch_size'] if kwargs['resume'] else 0
+        if kwargs['checkpoint_every'] < 0:
+            raise CommandError("--checkpoint-every must not be negative")
+        if kwargs['workers'] > 1 and kwargs['resume']:
+            raise CommandError("--resume is only supported by the single-process import")
+        if kwargs['workers'] > 1 and kwargs['pipeline']:
+            raise CommandError("--pipeline and --workers cannot be combined")
+        self.verbosity = kwargs['verbosity']
+
+        # Files to import (the bundled sample by default)
+        patterns = kwargs['paths'] + ([kwargs['file']] if kwargs['file'] else [])
+        if not patterns:
+            patterns = [os.path.join(settings.BASE_DIR, 'pilotlog', 'required_resource', 'import - pilotlog_mcc.json')]
+        try:
+            paths = expand_paths(patterns)
+        except ValueError as e:
+            raise CommandError(str(e))
+        jobs = min(kwargs['jobs'], len(paths))
+        if jobs > 1 and kwargs['workers'] > 1:
+            raise CommandError("--jobs and --workers cannot be combined")
+        if jobs > 1 and (kwargs['profile'] or kwargs['profile_output']):
+            raise CommandError("--profile is only supported with --jobs 1")
+        if jobs > 1 and connection.vendor == 'sqlite':
+            # Concurrent files would fail with "database is locked" rather than wait their turn
+            raise CommandError("--jobs needs a server database; SQLite allows a single writer at a time")
+
+        options = {name: kwargs[name] for name in self.File_Options}
+        if len(paths) == 1:
+            # One file: classify its records against guid indexes loaded up front
+            options['preload'] = True
+            result = run_import_job(paths[0], options, stdout=self.stdout)
+            if result.status == ImportJob.FAILED:
+                raise CommandError(result.error)
             return
 
-        meta = record['meta']
-    
-        # Create or update the Qualification record
-        qualification, created = Qualification.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                '_modified': record.get('_modified', 0),
-                'q_code': uuid.UUID(meta.get('QCode')),
-                'ref_extra': meta.get('RefExtra', 0),
-                'ref_model': meta.get('RefModel', ''),
-                'validity': meta.get('Validity', 0),
-                'date_valid': self.get_valid_date(meta.get('DateValid', '')),
-                'q_type_code': meta.get('QTypeCode', 0),
-                'date_issued': self.get_valid_date(meta.get('DateIssued', '')),
-                'minimum_qty': meta.get('MinimumQty', 0),
-                'notify_days': meta.get('NotifyDays', 0),
-                'ref_airfield': meta.get('RefAirfield', uuid.uuid4()),  # Default UUID if missing
-                'minimum_period': meta.get('MinimumPeriod', 0),
-                'notify_comment': meta.get('NotifyComment', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
-        )
-
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Qualification: {qualification.guid}'))
+        self.log(1, f"Importing {len(paths)} files with {jobs} job(s)")
+        skip_imported = not kwargs['force']
+        if jobs > 1:
+            # Each file's output arrives in one piece, capped, once it is done
+            results = run_file_imports(paths, options, jobs, skip_imported=skip_imported)
         else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Qualification: {qualification.guid}'))
-
-
-    def import_settingconfig(self, record):
-        """Import SettingConfig data."""
-        guid = record.get('guid')
-        if isinstance(guid, str):
-            if not self.validate_guid(guid):
-                self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-                # If the guid is not a valid UUID, convert numeric string to UUID
-                if guid.isdigit():
-                    # Generate a UUID with the numeric value appended
-                    base_uuid = uuid.UUID('00000000-0000-0000-0000-000000000000')
-                    # Create UUID based on the numeric value
-                    new_uuid = uuid.UUID(int=(base_uuid.int + int(guid)))
-                    guid = str(new_uuid)
-                    print(f"Created guid is : {guid}")
-                else:
-                    raise ValueError("Invalid GUID format")
+            # One file at a time: its output is written as it happens
+            stdout = self.stdout if self.verbosity >= 2 else None
+            results = (run_import_job(path, options, stdout=stdout, skip_imported=skip_imported) for path in paths)
+        outcomes = Counter()
+        for result in results:
+            outcomes[result.status] += 1
+            if result.output and self.verbosity >= 2:
+                self.stdout.write(result.output, ending='')
+            self.report_job(result)
+        self.log(1, ', '.join(f"{outcomes[status]} {label.lower()}" for status, label in ImportJob.STATUS_CHOICES[1:]))
+        if outcomes[ImportJob.FAILED]:
+            raise CommandError(f"{outcomes[ImportJob.FAILED]} of {len(paths)} files failed")
+
+    def report_job(self, result):
+        """One line per file of a multi-file run."""
+        if result.status == ImportJob.SKIPPED:
+            self.log(1, f"{result.source}: skipped, imported before")
+        elif result.status == ImportJob.FAILED:
+            self.stderr.write(f"{result.source}: failed after {result.seconds:.1f}s: {result.error.strip().splitlines()[-1]}")
         else:
-            raise ValueError("GUID must be a string")
-
-        meta = record['meta']
-
-        # Create or update the SettingConfig record
-        setting_config, created = SettingConfig.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                'config_code': meta.get('ConfigCode', 0),
-                '_modified': record.get('_modified', 0),
-                'name': meta.get('Name', ''),
-                'group': meta.get('Group', ''),
-                'data': meta.get('Data', ''),
-                'record_modified': meta.get('Record_Modified', 0),
-            }
+            self.log(1, self.style.SUCCESS(
+                f"{result.source}: {result.records:,} records ({result.created:,} created, {result.updated:,} updated, "
+                f"{result.failed:,} failed) in {result.seconds:.1f}s"
+            ))
+
+    def import_file(self, file_path, **kwargs):
+        """Import one file with the given options; the unit of work of a (multi-file) run."""
+        self.verbosity = kwargs['verbosity']
+        self.stats = ImportStats()
+        if kwargs['profile'] or kwargs['profile_output']:
+            self.profiler = ImportProfiler(dump_path=kwargs['profile_output'])
+        with self.profiler.recording() if self.profiler else nullcontext():
+            if file_path.lower().endswith('.csv'):
+                self.handle_foreflight(file_path, **kwargs)
+            else:
+                self.handle_json(file_path, **kwargs)
+        if self.profiler:
+            self.stdout.write('\n'.join(self.profiler.report(self.stats)))
+
+    def handle_json(self, file_path, source_hash=None, preload=False, **kwargs):
+        """Import a pilotlog_mcc JSON export; ``source_hash`` is its digest, if already known.
+
+        With ``preload`` the single-process import loads the guid index of
+        every table before the first record (see :meth:`import_serial`).
+        """
+        self.log(2, f"JSON file path: {file_path}")
+
+        # Checkpoints are tied to the exact content of the file
+        checkpoints = None
+        if kwargs['workers'] == 1 and (kwargs['checkpoint_every'] or kwargs['resume']):
+            with self.phase('hash'):
+                checkpoints = Checkpointer(file_path, kwargs['checkpoint_every'], source_hash=source_hash)
+            if kwargs['resume']:
+                if checkpoints.load():
+                    self.stats.merge(checkpoints.counters)
+                    self.log(1, f"Resuming after record {checkpoints.records:,} of {file_path}")
+                else:
+                    self.log(1, self.style.WARNING("No checkpoint for this file, starting from the beginning"))
+
+        # Stream the records one at a time instead of loading the whole file
+        with open(file_path, 'r', encoding='utf-8') as json_file:
+            self.progress = self.make_progress(json_file, kwargs['progress_interval'])
+            reader = JsonArrayReader(json_file, start=checkpoints.offset if checkpoints else 0)
+            if kwargs['workers'] > 1:
+                self.import_parallel(iter(reader), kwargs['workers'], kwargs['batch_size'], kwargs['incremental'])
+            else:
+                self.import_serial(
+                    reader, kwargs['batch_size'], kwargs['incremental'], checkpoints, pipeline=kwargs['pipeline'],
+                    preload=preload,
+                )
+
+        self.link_aircraft(kwargs['batch_size'], {user_id for user_id, _ in self.marks})
+        self.update_distances(kwargs['batch_size'])
+        self.update_rollups()
+        invalidate_flights({user_id for user_id, _ in self.rollups.buckets})
+        invalidate_queries({user_id for user_id, table in self.marks if table in ('myquery', 'myquerybuild')})
+
+        if kwargs['check_limits']:
+            users = {user_id for user_id, _ in self.rollups.buckets}
+            users.update(user_id for user_id, table in self.marks if table == 'limitrules')
+            self.check_limits(users)
+
+        # Only a completed run moves the high-water marks forward
+        with self.phase('finalize'):
+            save_watermarks(self.marks)
+            if checkpoints is not None:
+                checkpoints.clear()
+
+        if self.verbosity >= 1:
+            self.progress.summary()
+
+    def handle_foreflight(self, csv_file_path, **kwargs):
+        """Import a ForeFlight logbook CSV for the user given with --user."""
+        if kwargs['user'] is None:
+            raise CommandError("--user is required to import a ForeFlight CSV")
+        if kwargs['workers'] > 1 or kwargs['resume'] or kwargs['incremental'] or kwargs['pipeline']:
+            raise CommandError("--workers, --resume, --incremental and --pipeline only apply to the pilotlog JSON import")
+        self.log(2, f"CSV file path: {csv_file_path}")
+
+        # The CSV carries no modification time of its own; use the file's
+        modified = int(os.path.getmtime(csv_file_path))
+        with open(csv_file_path, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            self.progress = self.make_progress(csv_file, kwargs['progress_interval'])
+            self.import_foreflight(csv_file, kwargs['batch_size'], kwargs['user'], modified, replace=kwargs['replace'])
+
+        self.link_aircraft(kwargs['batch_size'], {kwargs['user']})
+        self.update_distances(kwargs['batch_size'])
+        self.update_rollups()
+        invalidate_flights({user_id for user_id, _ in self.rollups.buckets})
+        if kwargs['check_limits']:
+            self.check_limits({kwargs['user']})
+        if self.verbosity >= 1:
+            self.progress.summary()
+
+    def make_progress(self, source, interval):
+        """Progress reporter whose ETA follows the bytes read from ``source``."""
+        return ProgressReporter(
+            self.stdout, self.style, self.stats,
+            interval=interval,
+            position=source.buffer.tell,
+            total_size=os.fstat(source.fileno()).st_size,
         )
 
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new SettingConfig: {setting_config.guid}'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'Updated SettingConfig: {setting_config.guid}'))
-
-
-    def import_airfield(self, record):
-        """Import Airfield data."""
+    def link_aircraft(self, batch_size, users=None):
+        # Resolve Flight -> Aircraft once every table is loaded, for the users this file wrote
+        if users is not None and len(users) > self.Link_Users_Limit:
+            users = None
+        with self.phase('link'):
+            linked = link_flight_aircraft(batch_size=batch_size, rollups=self.rollups, user_ids=users)
+        self.log(2, self.style.SUCCESS(f'Linked {linked} flights to their aircraft'))
+
+    def update_distances(self, batch_size):
+        if self.stats.created['airfield'] or self.stats.updated['airfield']:
+            # Distances must be computed against the airfields this run wrote
+            invalidate_airfield_index()
+        with self.phase('distance'):
+            updated = update_bucket_distances(self.rollups.buckets, batch_size=batch_size)
+        self.log(2, self.style.SUCCESS(f'Updated the route distance of {updated} flights'))
+
+    def update_rollups(self):
+        # Recompute the logbook totals of only the months this run wrote to
+        with self.phase('rollup'):
+            written = refresh_rollups(self.rollups.buckets)
+        self.log(2, self.style.SUCCESS(
+            f'Refreshed {len(self.rollups.buckets)} logbook rollup months ({written} rows)'
+        ))
+
+    def check_limits(self, users):
+        """Evaluate the flight-time limits of ``users`` in one pass and report the breached ones."""
+        with self.phase('limits'):
+            results = evaluate_limits(user_ids=users)
+        for line in report_lines(results, verbose=self.verbosity >= 2):
+            self.stdout.write(self.style.WARNING(line) if 'over the limit' in line else line)
+
+    def phase(self, name):
+        """Time ``name`` when profiling; a no-op otherwise."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def log(self, level, message):
+        """Write ``message`` only when running at ``level`` verbosity or above."""
+        if self.verbosity >= level:
+            self.stdout.write(message)
+
+    def setup_writer(self, batch_size, incremental=False, pipeline=False):
+        """Create the batch writer and counters used by the import methods."""
+        if not hasattr(self, 'stats'):
+            self.stats = ImportStats()
+        # Marks of the previous runs (only consulted with --incremental) and of this one
+        self.watermarks = load_watermarks() if incremental else {}
+        self.marks = {}
+        self.model_tables = {model: table for table, model in self.Table_Models.items()}
+        self.rollups = RollupTracker()
+        writer_class = PipelinedWriter if pipeline else BulkUpsertWriter
+        self.writer = writer_class(
+            batch_size=batch_size,
+            on_flush=self.report_flush,
+            before_flush=self.rollups.before_flush,
+            # The aircraft link is owned by the post-import linking pass
+            preserve_fields={Flight: ['aircraft']},
+        )
+        # Compile every mapping once; converting a record is then a single call
+        warn = lambda message: self.log(2, self.style.WARNING(message))
+        self.converters = {}
+        self.batchers = {}
+        for table, spec in self.Table_Mapping.items():
+            exclude = ()
+            if table in self.Columnar_Tables and columnar_available():
+                batcher = ColumnarBatcher(spec, self.writer, batch_size, on_bad=self.report_bad_cells)
+                self.batchers[table] = batcher
+                exclude = {field.target for field in batcher.fields}
+            self.converters[table] = compile_spec(spec, warn, exclude=exclude)
+
+    def import_serial(self, reader, batch_size, incremental=False, checkpoints=None, pipeline=False, preload=False):
+        """Import every record in this process, checkpointing as configured.
+
+        With ``preload``, the ``guid -> (pk, _modified)`` index of every
+        table is loaded in one chunked scan per table before the first
+        record, so no batch needs a lookup of its own. Without it (each file
+        of a multi-file run) only the guids of each batch are looked up,
+        which keeps a small file from scanning every table in full.
+
+        With ``pipeline``, records are read and decoded on one thread and
+        written on another while this one converts them, so the import runs
+        at the pace of its slowest stage rather than of all three in turn.
+        """
+        self.setup_writer(batch_size, incremental, pipeline)
+        if preload:
+            with self.phase('preload'):
+                self.writer.preload(self.Table_Models.values())
+        if checkpoints is not None:
+            self.marks.update(checkpoints.marks)
+            self.rollups.buckets.update(checkpoints.buckets)
+        if pipeline:
+            reader = PrefetchedReader(reader)
+            self.writer.start()
+        records = self.profiler.tables.wrap(reader) if self.profiler else reader
         try:
-            guid = record.get('guid')
-            if not self.validate_guid(guid):
-                self.stdout.write(self.style.ERROR(f'Invalid or missing GUID: {guid}'))
-                return
-        except TypeError as e:
-            print("Error occurred:", e)
-        meta = record['meta']
-
-        # Create or update the Airfield record
-        airfield, created = Airfield.objects.update_or_create(
-            guid=uuid.UUID(guid),
-            defaults={
-                'user_id': record.get('user_id', 0),
-                'platform': record.get('platform', 0),
-                '_modified': record.get('_modified', 0),
-                'af_code': meta.get('AFCode', ''),
-                'af_iata': meta.get('AFIATA', ''),
-                'af_icao': meta.get('AFICAO', ''),
-                'af_name': meta.get('AFName', ''),
-                'city': meta.get('City', ''),
-                'af_cat': meta.get('AFCat', 0),
-                'tz_code': meta.get('TZCode', 0),
-                'latitude': meta.get('Latitude', 0),
-                'longitude': meta.get('Longitude', 0),
-                'show_list': meta.get('ShowList', False),
-                'user_edit': meta.get('UserEdit', False),
-                'af_country': meta.get('AFCountry', 0),
-                'notes': meta.get('Notes', ''),
-                'notes_user': meta.get('NotesUser', ''),
-                'region_user': meta.get('RegionUser', 0),
-                'elevation_ft': meta.get('ElevationFT', 0),
-                'record_modified': meta.get('Record_Modified', 0),
+            with self.phase('stream'):
+                for record in records:
+                    self.import_record(record)
+                    if self.verbosity >= 1:
+                        self.progress.tick()
+                    if checkpoints is not None and checkpoints.due():
+                        # A checkpoint may only cover records that are already written
+                        self.flush_all()
+                        checkpoints.save(reader.offset, self.stats, self.marks, self.rollups.buckets)
+
+            # Write whatever is left in the partially filled batches
+            with self.phase('flush'):
+                self.flush_all()
+        finally:
+            if pipeline:
+                self.writer.stop()
+
+    def import_parallel(self, records, workers, batch_size, incremental=False):
+        """Partition the records across worker processes, one DB connection each."""
+        self.log(2, f"Importing with {workers} worker processes")
+
+        def dispatched(records):
+            # Workers report their outcome at the end; count dispatches for live progress
+            for record in records:
+                self.stats.records[record['table'].lower()] += 1
+                if self.verbosity >= 1:
+                    self.progress.tick()
+                yield record
+
+        if self.profiler:
+            # Only the reading and dispatching is timed here; workers have their own connections
+            records = self.profiler.tables.wrap(records)
+        with self.phase('stream'):
+            snapshots, marks, buckets, errors = run_parallel_import(
+                dispatched(records), workers, batch_size, verbosity=self.verbosity, incremental=incremental,
+            )
+        for snapshot in snapshots:
+            self.stats.merge(snapshot, fields=('created', 'updated', 'superseded', 'unchanged', 'skipped', 'failed'))
+        self.rollups = RollupTracker()
+        self.rollups.buckets.update(buckets)
+        self.marks = {}
+        for worker_marks in marks:
+            merge_watermarks(self.marks, worker_marks)
+        for error in errors:
+            self.stderr.write(error)
+        if errors:
+            raise CommandError(f"{len(errors)} of {workers} import workers failed")
+
+    def import_foreflight(self, csv_file, batch_size, user_id, modified, replace=False):
+        """Stream the sections of a ForeFlight CSV into the same batched writes as the JSON import.
+
+        With ``replace`` the user's ForeFlight flights the file does not
+        contain are deleted afterwards (see :meth:`prune_foreflight`).
+        """
+        self.setup_writer(batch_size)
+        # Every column the CSV does not carry keeps the default of the table mapping
+        base_rows = {}
+        for table in SECTION_TABLES.values():
+            convert = compile_spec(self.Table_Mapping[table])
+            record = {
+                'guid': str(logbook_guid(user_id)), 'user_id': user_id, 'platform': FOREFLIGHT_PLATFORM,
+                '_modified': modified,
             }
+            base_rows[table] = convert(record)[1]
+        # Flight guids given out so far, to number identical flights of the file
+        assigned = set()
+
+        rows = iter_logbook_rows(csv_file)
+        if self.profiler:
+            rows = self.profiler.tables.wrap(rows, key=lambda row: SECTION_TABLES[row[0]])
+        for section, parse, cells in rows:
+            table_name = SECTION_TABLES[section]
+            self.stats.records[table_name] += 1
+            if self.verbosity >= 1:
+                self.progress.tick()
+            try:
+                values = parse(cells)
+            except self.Record_Errors as e:
+                self.stats.failed[table_name] += 1
+                self.log(2, self.style.ERROR(f'Failed to import {section} row {cells[:3]}: {e}'))
+                continue
+
+            if table_name == 'aircraft':
+                if not values.get('reference'):
+                    self.stats.skipped[table_name] += 1
+                    self.log(2, self.style.ERROR(f'Missing AircraftID in {section} row {cells[:3]}'))
+                    continue
+                guid = logbook_guid(user_id, 'aircraft', values['reference'])
+            else:
+                guid = self.foreflight_flight_guid(user_id, values, assigned)
+                # Point at the guid the aircraft row of the same AircraftID was given
+                if values.get('aircraft_code'):
+                    values['aircraft_code'] = str(logbook_guid(user_id, 'aircraft', values['aircraft_code']))
+
+            row = dict(base_rows[table_name])
+            row.update(values)
+            self.writer.add(self.Table_Models[table_name], guid, row)
+
+        with self.phase('flush'):
+            self.flush_all()
+        if replace:
+            with self.phase('prune'):
+                self.prune_foreflight(user_id, batch_size)
+
+    def foreflight_flight_guid(self, user_id, values, assigned):
+        """Guid of a CSV flight, derived from the columns every export of it repeats.
+
+        Flights have no id in the CSV: the date, aircraft, route ends and
+        out time identify one, so re-importing it (or an overlapping file)
+        updates the same row wherever it sits in the file. Identical flights
+        of one file, such as untimed circuits, are numbered in file order.
+        """
+        identity = [
+            values['date'].isoformat() if values.get('date') else '',
+            values.get('aircraft_code') or '',
+            values.get('from_airport') or '',
+            values.get('to_airport') or '',
+            values['time_out'].isoformat() if values.get('time_out') else '',
+        ]
+        guid = logbook_guid(user_id, 'flight', *identity)
+        copy = 1
+        while guid in assigned:
+            guid = logbook_guid(user_id, 'flight', *identity, str(copy))
+            copy += 1
+        assigned.add(guid)
+        return guid
+
+    def prune_foreflight(self, user_id, batch_size):
+        """Delete the user's ForeFlight flights the logbook just imported does not contain.
+
+        Only run with ``--replace``, when the CSV is the user's whole
+        logbook. Nothing is removed after a run that failed or skipped
+        flight rows.
+        """
+        if self.stats.failed['flight'] or self.stats.skipped['flight']:
+            self.log(1, self.style.WARNING("Some flights were not imported; keeping the flights missing from the CSV"))
+            return 0
+        written = self.writer.written.get(Flight, set())
+        flights = (
+            Flight.objects.filter(user_id=user_id, platform=FOREFLIGHT_PLATFORM)
+            .values_list('pk', 'guid', 'date')
+            .iterator(chunk_size=DEFAULT_INDEX_CHUNK_SIZE)
         )
-        
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created new Airfield: {airfield.guid}'))
+        stale = []
+        for pk, guid, day in flights:
+            # CSV rows get uuid5 guids; rows from other sources are never touched
+            if guid.version == 5 and guid not in written:
+                stale.append(pk)
+                self.rollups.add(user_id, day)
+        for start in range(0, len(stale), batch_size):
+            Flight.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+        self.log(2, self.style.SUCCESS(f'Removed {len(stale)} flights no longer in the logbook'))
+        return len(stale)
+
+    def import_record(self, record):
+        """Dispatch one export record to the import method of its table."""
+        table_name = record['table'].lower()  # Convert table name to lowercase
+        self.stats.records[table_name] += 1
+
+        # Find and call the compiled converter of the table
+        convert = self.converters.get(table_name)
+        if convert is None:
+            self.stats.skipped[table_name] += 1
+            self.log(2, self.style.WARNING(f'No import method for table: {table_name}'))
+            return
+
+        mark = record_mark(record)
+        if mark is not None:
+            key = (mark[0], table_name)
+            if mark[1] <= self.watermarks.get(key, -1):
+                # Unchanged since the last import: no conversion, no write
+                self.stats.unchanged[table_name] += 1
+                return
+
+        try:
+            converted = convert(record)
+        except self.Record_Errors as e:
+            self.stats.failed[table_name] += 1
+            self.log(2, self.style.ERROR(f'Failed to import {table_name} record {record.get("guid")}: {e}'))
+            return
+        if converted is None:
+            self.stats.skipped[table_name] += 1
+            self.log(2, self.style.ERROR(f'Invalid or missing GUID: {record.get("guid")}'))
+            return
+
+        guid, row = converted
+        batcher = self.batchers.get(table_name)
+        if batcher is not None:
+            batcher.add(guid, row, record.get('meta') or {})
         else:
-            self.stdout.write(self.style.SUCCESS(f'Updated Airfield: {airfield.guid}'))
+            self.writer.add(self.Table_Models[table_name], guid, row)
+        if mark is not None and mark[1] > self.marks.get(key, -1):
+            self.marks[key] = mark[1]
+        if self.verbosity >= 3:
+            self.stdout.write(self.style.SUCCESS(f'Successfully imported {table_name} record: {record["guid"]}'))
+
+    def flush_all(self):
+        """Convert the pending columnar chunks and write every buffered row."""
+        for batcher in self.batchers.values():
+            batcher.flush()
+        self.writer.flush_all()
+
+    def report_bad_cells(self, spec, bad):
+        """Report the cells a columnar chunk replaced with their defaults."""
+        if self.verbosity < 2:
+            return
+        for target, values in bad.items():
+            sample = ', '.join(repr(value) for value in values[:3])
+            self.stdout.write(self.style.WARNING(
+                f'{spec.table}.{target}: {len(values)} invalid values replaced with the default (e.g. {sample})'
+            ))
+
+    def report_flush(self, model, created, updated, superseded):
+        """Count a batch written by the bulk upsert writer."""
+        table_name = self.model_tables[model]
+        self.stats.created[table_name] += created
+        self.stats.updated[table_name] += updated
+        self.stats.superseded[table_name] += superseded
+        self.log(3, self.style.SUCCESS(
+            f'Saved {model.__name__} batch: {created} created, {updated} updated, {superseded} superseded'
+        ))
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from pilotlog.bulk import DEFAULT_BATCH_SIZE
+from pilotlog.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+
+    help = "Recompute the per-user, aircraft and month logbook totals from the Flight table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help="Only rebuild the totals of this user_id (default: all users)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Rollup rows written per INSERT (default: {DEFAULT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+        started = time.perf_counter()
+        written = rebuild_rollups(user_id=kwargs['user'], batch_size=kwargs['batch_size'])
+        if kwargs['verbosity'] >= 1:
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {written} logbook rollup rows in {time.perf_counter() - started:.1f}s"
+            ))
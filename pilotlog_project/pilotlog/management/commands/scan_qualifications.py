@@ -0,0 +1,50 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from pilotlog.bulk import DEFAULT_BATCH_SIZE
+from pilotlog.currency import due_notifications, scan_qualifications
+from pilotlog.models import QualificationStatus
+
+
+class Command(BaseCommand):
+
+    help = "Recompute the currency status (current, expiring, expired, recency lapsed) of every qualification"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', default=None,
+            help="Only scan this user_id; repeat for several (default: every pilot)",
+        )
+        parser.add_argument(
+            '--as-of', default=None,
+            help="Compute the status on this date, YYYY-MM-DD (default: today)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Status rows written per INSERT (default: {DEFAULT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer")
+        try:
+            as_of = date.fromisoformat(kwargs['as_of']) if kwargs['as_of'] else None
+        except ValueError:
+            raise CommandError("--as-of must be a date in YYYY-MM-DD format")
+
+        started = time.perf_counter()
+        written = scan_qualifications(user_ids=kwargs['user'], as_of=as_of, batch_size=kwargs['batch_size'])
+        if kwargs['verbosity'] >= 2:
+            due = due_notifications()
+            if kwargs['user']:
+                due = due.filter(user_id__in=kwargs['user'])
+            for status in due:
+                self.stdout.write(
+                    f"user {status.user_id} qualification {status.qualification_id}: {status.status}, "
+                    f"expires {status.expires or '-'}, {status.recent_flights}/{status.required_flights} recent flights"
+                )
+        if kwargs['verbosity'] >= 1:
+            summary = ', '.join(f"{written[code]} {label.lower()}" for code, label in QualificationStatus.STATUS_CHOICES)
+            self.stdout.write(self.style.SUCCESS(
+                f"Scanned {sum(written.values())} qualifications in {time.perf_counter() - started:.1f}s: {summary}"
+            ))
@@ -0,0 +1,375 @@
+import uuid
+from collections import namedtuple
+from datetime import date, time
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from pilotlog.models import (
+    Aircraft, Airfield, Flight, ImagePic, LimitRules, MyQueryBuild, Pilot, Qualification, Query, SettingConfig,
+)
+
+# One column of a table: ``meta[source]`` -> ``target`` via ``converter``, ``default`` when missing
+Field = namedtuple('Field', ['source', 'target', 'converter', 'default'], defaults=['text', ''])
+
+# How one export table maps onto a model; ``guid`` is 'uuid' or 'numeric' (numeric ids allowed)
+TableSpec = namedtuple('TableSpec', ['table', 'model', 'fields', 'guid'], defaults=['uuid'])
+
+# Columns every table reads from the record itself rather than from its meta
+RECORD_FIELDS = [
+    Field('user_id', 'user_id', 'int', 0),
+    Field('platform', 'platform', 'int', 0),
+    Field('_modified', '_modified', 'int', 0),
+]
+
+_INVALID = object()
+
+
+class RecordError(ValueError):
+    """Raised when a required value of a record cannot be converted."""
+
+
+def parse_guid(value, allow_numeric=False):
+    """Return the UUID of a record guid, or None if it is invalid or missing."""
+    if isinstance(value, str):
+        if len(value) == 36:
+            try:
+                return uuid.UUID(value)
+            except ValueError:
+                return None
+        # Some tables (SettingConfig) use numeric ids; map them onto the UUID space
+        if allow_numeric and value.isdigit():
+            return uuid.UUID(int=int(value))
+    return None
+
+
+@lru_cache(maxsize=16384)
+def _parse_date(value):
+    # Exports repeat the same few thousand dates, so each distinct string is parsed once
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return _INVALID
+
+
+@lru_cache(maxsize=2048)
+def _minutes_to_time(minutes):
+    return time(minutes // 60 % 24, minutes % 60)
+
+
+def make_text(default, warn):
+    def convert(value):
+        return default if value is None else value
+    return convert
+
+
+def make_int(default, warn):
+    def convert(value):
+        if value is None or value == '':
+            return default
+        if type(value) is int:
+            return value
+        try:
+            return int(value)
+        except (ValueError, TypeError) as e:
+            warn(f"Invalid integer value for {value}: {e}. Using default value {default}.")
+            return default
+    return convert
+
+
+def make_decimal(default, warn):
+    fallback = Decimal(default)
+
+    def convert(value):
+        if not value:
+            return fallback
+        kind = type(value)
+        if kind is int:
+            return Decimal(value)
+        try:
+            # Go through str() so floats keep their short decimal form
+            return Decimal(str(value) if kind is float else value)
+        except (InvalidOperation, ValueError, TypeError) as e:
+            warn(f"Invalid decimal value for {value}: {e}. Using default value {default}.")
+            return fallback
+    return convert
+
+
+def make_bool(default, warn):
+    def convert(value):
+        if value is None or value == '':
+            return default
+        if isinstance(value, str):
+            return value.strip().lower() not in ('0', 'false', 'f', 'no', 'n')
+        return bool(value)
+    return convert
+
+
+def make_date(default, warn):
+    def convert(value):
+        if value is None or value == '':
+            return default
+        if not isinstance(value, str):
+            warn(f"Unexpected value type for date conversion: {type(value)}. Skipping.")
+            return default
+        parsed = _parse_date(value)
+        if parsed is _INVALID:
+            warn(f"Invalid date format for value: {value}. Skipping.")
+            return default
+        return parsed
+    return convert
+
+
+def make_time(default, warn):
+    """Times are exported as minutes after midnight (int or digit string) or ``HH:MM``."""
+    def convert(value):
+        if value is None or value == '':
+            return default
+        try:
+            if isinstance(value, str) and ':' in value:
+                return time.fromisoformat(value)
+            minutes = int(value)
+            if minutes < 0:
+                raise ValueError("negative minutes")
+            return _minutes_to_time(minutes)
+        except (ValueError, TypeError):
+            warn(f"Invalid time format for value: {value}. Skipping.")
+            return default
+    return convert
+
+
+def make_uuid(default, warn):
+    """Required UUID columns; a missing value uses ``default`` (called if callable)."""
+    def convert(value):
+        if value is None or value == '':
+            if default is None:
+                raise RecordError("missing required UUID value")
+            return default() if callable(default) else default
+        if isinstance(value, uuid.UUID):
+            return value
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            raise RecordError(f"invalid UUID value: {value!r}") from None
+    return convert
+
+
+CONVERTERS = {
+    'text': make_text,
+    'int': make_int,
+    'decimal': make_decimal,
+    'bool': make_bool,
+    'date': make_date,
+    'time': make_time,
+    'uuid': make_uuid,
+}
+
+
+def compile_spec(spec, warn=None, exclude=()):
+    """Build a specialised ``convert(record) -> (guid, row)`` function for ``spec``.
+
+    ``convert`` returns None for a record without a valid guid and raises
+    :class:`RecordError` for one whose required values cannot be converted.
+    The field list is turned into a single dict literal so that converting a
+    row costs one function call and no loop over the spec. Text columns are
+    inlined; every other column calls its pre-built converter directly.
+    Targets listed in ``exclude`` are left out of the row (e.g. columns that
+    are converted in bulk elsewhere).
+    """
+    warn = warn or (lambda message: None)
+    namespace = {
+        'parse_guid': parse_guid,
+        'allow_numeric': spec.guid == 'numeric',
+    }
+    items = []
+    for position, field in enumerate(RECORD_FIELDS + list(spec.fields)):
+        if field.target in exclude:
+            continue
+        getter = 'rget' if position < len(RECORD_FIELDS) else 'get'
+        source = repr(field.source)
+        default_name = f'd{position}'
+        namespace[default_name] = field.default
+        if field.converter == 'text':
+            value = f'(value if (value := {getter}({source})) is not None else {default_name})'
+        else:
+            converter_name = f'c{position}'
+            namespace[converter_name] = CONVERTERS[field.converter](field.default, warn)
+            value = f'{converter_name}({getter}({source}))'
+        items.append(f'        {field.target!r}: {value},')
+
+    source = '\n'.join([
+        'def convert(record):',
+        '    guid = parse_guid(record.get("guid"), allow_numeric)',
+        '    if guid is None:',
+        '        return None',
+        '    rget = record.get',
+        '    get = (record.get("meta") or {}).get',
+        '    return guid, {',
+        *items,
+        '    }',
+    ])
+    exec(compile(source, f'<mapping {spec.table}>', 'exec'), namespace)
+    return namespace['convert']
+
+
+TABLE_SPECS = [
+    TableSpec('aircraft', Aircraft, [
+        Field('Make', 'make'),
+        Field('Model', 'model'),
+        Field('Category', 'category', 'int', 0),
+        Field('Class', 'aircraft_class', 'int', 0),
+        Field('Power', 'power', 'int', 0),
+        Field('Seats', 'seats', 'int', 0),
+        Field('Active', 'active', 'bool', False),
+        Field('Reference', 'reference'),
+        Field('Tailwheel', 'tailwheel', 'bool', False),
+        Field('Complex', 'complex', 'bool', False),
+        Field('HighPerf', 'high_perf', 'bool', False),
+        Field('Aerobatic', 'aerobatic', 'bool', False),
+        Field('FNPT', 'fnpt', 'int', 0),
+        Field('Kg5700', 'kg5700', 'bool', False),
+        Field('Rating', 'rating'),
+        Field('Company', 'company'),
+        Field('CondLog', 'cond_log', 'int', 0),
+        Field('FavList', 'fav_list', 'bool', False),
+        Field('SubModel', 'sub_model'),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('flight', Flight, [
+        Field('AircraftCode', 'aircraft_code'),
+        Field('ArrCode', 'from_airport'),  # Assuming 'ArrCode' as 'from_airport'
+        Field('DepCode', 'to_airport'),  # Assuming 'DepCode' as 'to_airport'
+        Field('Route', 'route'),
+        Field('DateUTC', 'date', 'date', None),
+        Field('ArrTimeUTC', 'time_out', 'time', None),
+        Field('DepTimeUTC', 'time_off', 'time', None),
+        Field('LdgTimeUTC', 'time_on', 'time', None),
+        Field('ArrTimeUTC', 'time_in', 'time', None),  # Consider replacing if another field is more appropriate
+        Field('ArrOffset', 'on_duty', 'time', None),
+        Field('DepOffset', 'off_duty', 'time', None),
+        Field('minTOTAL', 'total_time', 'decimal', 0),  # Based on available fields, `minTOTAL` seems closest
+        Field('minPIC', 'pic', 'decimal', 0),
+        Field('minCOP', 'sic', 'decimal', 0),  # Assuming 'minCOP' as 'SIC'
+        Field('minNIGHT', 'night', 'decimal', 0),
+        Field('minSFR', 'solo', 'decimal', 0),
+        Field('minXC', 'cross_country', 'decimal', 0),
+        Field('minNIGHT', 'nvg', 'decimal', 0),  # Assuming 'minNIGHT' for NVG, adjust if necessary
+        Field('minAIR', 'nvg_ops', 'decimal', 0),
+        Field('ToDay', 'day_takeoffs', 'int', None),  # Assuming 'ToDay' might represent day takeoffs
+        Field('LdgDay', 'day_landings_full_stop', 'int', None),  # Assuming 'LdgDay' represents day landings full stop
+        Field('ToNight', 'night_takeoffs', 'int', None),  # Assuming 'ToNight' might represent night takeoffs
+        Field('LdgNight', 'night_landings_full_stop', 'int', None),
+        Field('Holding', 'all_landings', 'int', None),  # 'Holding' used as a placeholder, adjust if necessary
+        Field('minINSTR', 'actual_instrument', 'decimal', 0),
+        Field('minIFR', 'simulated_instrument', 'decimal', 0),  # No direct field for simulated instrument found
+        Field('HobbsIn', 'hobbs_start', 'decimal', 0),
+        Field('HobbsOut', 'hobbs_end', 'decimal', 0),
+        Field('ArrTimeSCHED', 'tach_start', 'decimal', 0),  # Placeholder for tach start
+        Field('DepTimeSCHED', 'tach_end', 'decimal', 0),  # Placeholder for tach end
+        Field('Holding', 'holds', 'int', None),
+        Field('TagApproach', 'approach'),
+        Field('minDUAL', 'dual_given', 'decimal', 0),
+        Field('minEXAM', 'simulated_flight', 'decimal', 0),  # Placeholder for simulated flight
+        Field('Training', 'ground_training', 'decimal', 0),
+        Field('Remarks', 'instructor_comments'),
+        Field('Remarks', 'pilot_comments'),
+        Field('ToEdit', 'flight_review', 'bool', False),  # Using 'ToEdit' as a placeholder
+        Field('NextPage', 'checkride', 'bool', False),
+        Field('UserBool', 'ipc', 'bool', False),  # Assuming 'UserBool' for IPC status
+        Field('PF', 'nvg_proficiency', 'bool', False),  # Assuming 'PF' represents NVG proficiency
+    ]),
+    TableSpec('imagepic', ImagePic, [
+        Field('ImgCode', 'img_code', 'uuid', None),
+        Field('FileExt', 'file_ext'),
+        Field('FileName', 'file_name'),
+        Field('LinkCode', 'link_code', 'uuid', None),
+        Field('Img_Upload', 'img_upload', 'bool', False),
+        Field('Img_Download', 'img_download', 'bool', False),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('limitrules', LimitRules, [
+        Field('LimitCode', 'limit_code', 'uuid', None),
+        Field('LFrom', 'l_from', 'date', None),
+        Field('LTo', 'l_to', 'date', None),
+        Field('LType', 'l_type', 'int', 0),
+        Field('LZone', 'l_zone', 'int', 0),
+        Field('LMinutes', 'l_minutes', 'int', 0),
+        Field('LPeriodCode', 'l_period_code', 'int', 0),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('myquery', Query, [
+        Field('Name', 'name'),
+        Field('mQCode', 'mQCode'),
+        Field('QuickView', 'quick_view', 'bool', False),
+        Field('ShortName', 'short_name'),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('myquerybuild', MyQueryBuild, [
+        Field('Build1', 'build1'),
+        Field('Build2', 'build2', 'int', 0),
+        Field('Build3', 'build3', 'int', 0),
+        Field('Build4', 'build4'),
+        Field('mQCode', 'mQCode', 'uuid', None),
+        Field('mQBCode', 'mQBCode', 'uuid', None),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('pilot', Pilot, [
+        Field('Notes', 'notes'),
+        Field('Active', 'active', 'bool', False),
+        Field('Company', 'company'),
+        Field('FavList', 'fav_list', 'bool', False),
+        Field('UserAPI', 'user_api'),
+        Field('Facebook', 'facebook'),
+        Field('LinkedIn', 'linkedin'),
+        Field('PilotRef', 'pilot_ref'),
+        Field('PilotCode', 'pilot_code', 'uuid', None),
+        Field('PilotName', 'pilot_name'),
+        Field('PilotEMail', 'pilot_email'),
+        Field('PilotPhone', 'pilot_phone'),
+        Field('Certificate', 'certificate'),
+        Field('PhoneSearch', 'phone_search'),
+        Field('PilotSearch', 'pilot_search'),
+        Field('RosterAlias', 'roster_alias'),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('qualification', Qualification, [
+        Field('QCode', 'q_code', 'uuid', None),
+        Field('RefExtra', 'ref_extra', 'int', 0),
+        Field('RefModel', 'ref_model'),
+        Field('Validity', 'validity', 'int', 0),
+        Field('DateValid', 'date_valid', 'date', None),
+        Field('QTypeCode', 'q_type_code', 'int', 0),
+        Field('DateIssued', 'date_issued', 'date', None),
+        Field('MinimumQty', 'minimum_qty', 'int', 0),
+        Field('NotifyDays', 'notify_days', 'int', 0),
+        Field('RefAirfield', 'ref_airfield', 'uuid', uuid.uuid4),  # New UUID if missing
+        Field('MinimumPeriod', 'minimum_period', 'int', 0),
+        Field('NotifyComment', 'notify_comment'),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+    TableSpec('settingconfig', SettingConfig, [
+        Field('ConfigCode', 'config_code', 'int', 0),
+        Field('Name', 'name'),
+        Field('Group', 'group'),
+        Field('Data', 'data'),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ], guid='numeric'),
+    TableSpec('airfield', Airfield, [
+        Field('AFCode', 'af_code'),
+        Field('AFIATA', 'af_iata'),
+        Field('AFICAO', 'af_icao'),
+        Field('AFName', 'af_name'),
+        Field('City', 'city'),
+        Field('AFCat', 'af_cat', 'int', 0),
+        Field('TZCode', 'tz_code', 'int', 0),
+        Field('Latitude', 'latitude', 'int', 0),
+        Field('Longitude', 'longitude', 'int', 0),
+        Field('ShowList', 'show_list', 'bool', False),
+        Field('UserEdit', 'user_edit', 'bool', False),
+        Field('AFCountry', 'af_country', 'int', 0),
+        Field('Notes', 'notes'),
+        Field('NotesUser', 'notes_user'),
+        Field('RegionUser', 'region_user', 'int', 0),
+        Field('ElevationFT', 'elevation_ft', 'int', 0),
+        Field('Record_Modified', 'record_modified', 'int', 0),
+    ]),
+]
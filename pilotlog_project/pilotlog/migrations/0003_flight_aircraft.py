@@ -0,0 +1,22 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0002_airfield_imagepic_limitrules_myquerybuild_pilot_and_more'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='flight',
+            old_name='aircraft_id',
+            new_name='aircraft_code',
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='aircraft',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='flights', to='pilotlog.aircraft'),
+        ),
+    ]
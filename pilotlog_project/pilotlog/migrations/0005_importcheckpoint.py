@@ -0,0 +1,27 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0004_importstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500)),
+                ('source_hash', models.CharField(max_length=64, unique=True)),
+                ('source_size', models.BigIntegerField()),
+                ('records', models.BigIntegerField(default=0)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('counters', models.JSONField(default=dict)),
+                ('marks', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
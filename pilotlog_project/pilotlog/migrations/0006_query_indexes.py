@@ -0,0 +1,73 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0005_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aircraft',
+            index=models.Index(fields=['user_id', '_modified'], name='aircraft_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='aircraft',
+            index=models.Index(fields=['user_id', 'reference'], name='aircraft_user_reference'),
+        ),
+        migrations.AddIndex(
+            model_name='airfield',
+            index=models.Index(fields=['user_id', '_modified'], name='airfield_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='airfield',
+            index=models.Index(fields=['af_icao'], name='airfield_icao'),
+        ),
+        migrations.AddIndex(
+            model_name='airfield',
+            index=models.Index(fields=['af_iata'], name='airfield_iata'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['user_id', '_modified'], name='flight_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['user_id', 'date', 'id'], name='flight_user_date'),
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['user_id', 'aircraft', 'date', 'total_time'], name='flight_user_aircraft_time'),
+        ),
+        migrations.AddIndex(
+            model_name='imagepic',
+            index=models.Index(fields=['user_id', '_modified'], name='imagepic_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='limitrules',
+            index=models.Index(fields=['user_id', '_modified'], name='limitrules_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='myquerybuild',
+            index=models.Index(fields=['user_id', '_modified'], name='myquerybuild_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='pilot',
+            index=models.Index(fields=['user_id', '_modified'], name='pilot_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='qualification',
+            index=models.Index(fields=['user_id', '_modified'], name='qualification_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='query',
+            index=models.Index(fields=['user_id', '_modified'], name='query_user_modified'),
+        ),
+        migrations.AddIndex(
+            model_name='settingconfig',
+            index=models.Index(fields=['user_id', '_modified'], name='settingconfig_user_modified'),
+        ),
+    ]
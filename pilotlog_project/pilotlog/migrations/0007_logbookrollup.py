@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='buckets',
+            field=models.JSONField(default=list),
+        ),
+        migrations.CreateModel(
+            name='LogbookRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('month', models.DateField(null=True)),
+                ('flights', models.IntegerField(default=0)),
+                ('total_time', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('pic', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('sic', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('night', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('actual_instrument', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('simulated_instrument', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('cross_country', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('day_landings', models.IntegerField(default=0)),
+                ('night_landings', models.IntegerField(default=0)),
+                ('all_landings', models.IntegerField(default=0)),
+                ('aircraft', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='pilotlog.aircraft')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'month'], name='rollup_user_month')],
+                'constraints': [models.UniqueConstraint(fields=('user_id', 'aircraft', 'month'), name='unique_logbook_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0007_logbookrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='flight',
+            name='distance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
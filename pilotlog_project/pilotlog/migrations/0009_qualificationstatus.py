@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0008_flight_distance_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QualificationStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('status', models.CharField(choices=[('current', 'Current'), ('expiring', 'Expiring'), ('expired', 'Expired'), ('lapsed', 'Recency lapsed')], max_length=16)),
+                ('expires', models.DateField(null=True)),
+                ('notify_on', models.DateField(null=True)),
+                ('recent_flights', models.IntegerField(default=0)),
+                ('required_flights', models.IntegerField(default=0)),
+                ('scanned_on', models.DateField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['date', 'user_id'], name='flight_date_user'),
+        ),
+        migrations.AddField(
+            model_name='qualificationstatus',
+            name='qualification',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='status', to='pilotlog.qualification'),
+        ),
+        migrations.AddIndex(
+            model_name='qualificationstatus',
+            index=models.Index(fields=['user_id', 'status'], name='qualstatus_user_status'),
+        ),
+        migrations.AddIndex(
+            model_name='qualificationstatus',
+            index=models.Index(fields=['status', 'user_id'], name='qualstatus_status_user'),
+        ),
+    ]
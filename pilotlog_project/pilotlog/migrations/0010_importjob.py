@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0009_qualificationstatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('source_size', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed'), ('skipped', 'Skipped')], max_length=16)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('seconds', models.FloatField(null=True)),
+                ('records', models.BigIntegerField(default=0)),
+                ('created', models.BigIntegerField(default=0)),
+                ('updated', models.BigIntegerField(default=0)),
+                ('failed', models.BigIntegerField(default=0)),
+                ('counters', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source_hash', 'status'], name='importjob_hash_status')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0010_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryCacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField(unique=True)),
+                ('flights', models.BigIntegerField(default=0)),
+                ('queries', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
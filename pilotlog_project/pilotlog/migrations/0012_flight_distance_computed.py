@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilotlog', '0011_querycacheversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='distance_computed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -11,6 +11,10 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+        indexes = [
+            # Incremental sync: "what changed for this user since <_modified>"
+            models.Index(fields=['user_id', '_modified'], name='%(class)s_user_modified'),
+        ]
 
 # Aircraft Model
 class Aircraft(BaseModel):
@@ -35,13 +39,20 @@ class Aircraft(BaseModel):
     sub_model = models.CharField(max_length=100, blank=True)
     record_modified = models.IntegerField()
 
+    class Meta(BaseModel.Meta):
+        indexes = BaseModel.Meta.indexes + [
+            # A user's aircraft by registration (ForeFlight AircraftID)
+            models.Index(fields=['user_id', 'reference'], name='aircraft_user_reference'),
+        ]
+
     def __str__(self):
         return f"{self.make} {self.model} ({self.reference})"
 
 # Flights Model
 class Flight(BaseModel):
-    # aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE)
-    aircraft_id = models.TextField(null=True)
+    # Resolved from aircraft_code by the post-import linking pass
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.SET_NULL, null=True, blank=True, related_name='flights')
+    aircraft_code = models.TextField(null=True)
     date = models.DateField(null=True)
     from_airport = models.CharField(max_length=100)
     to_airport = models.CharField(max_length=100)
@@ -60,7 +71,10 @@ class Flight(BaseModel):
     cross_country = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     nvg = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     nvg_ops = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
-    distance = models.DecimalField(max_digits=10, decimal_places=2)
+    # Great-circle route distance in nautical miles, computed from the airfields after import
+    distance = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Whether distance was computed from the airfields rather than given by the imported source
+    distance_computed = models.BooleanField(default=False)
     day_takeoffs = models.IntegerField(blank=True, null=True)
     day_landings_full_stop = models.IntegerField(blank=True, null=True)
     night_takeoffs = models.IntegerField(blank=True, null=True)
@@ -85,7 +99,17 @@ class Flight(BaseModel):
     checkride = models.BooleanField(default=False)
     ipc = models.BooleanField(default=False)
     nvg_proficiency = models.BooleanField(default=False)
-    
+
+    class Meta(BaseModel.Meta):
+        indexes = BaseModel.Meta.indexes + [
+            # A user's logbook by date range, ordered (and paginated) by (date, id)
+            models.Index(fields=['user_id', 'date', 'id'], name='flight_user_date'),
+            # Covers per-aircraft time totals without touching the table
+            models.Index(fields=['user_id', 'aircraft', 'date', 'total_time'], name='flight_user_aircraft_time'),
+            # Flights of every user in a recent date range, counted without touching the table
+            models.Index(fields=['date', 'user_id'], name='flight_date_user'),
+        ]
+
     def __str__(self):
         return f"Flight on {self.date} from {self.from_airport} to {self.to_airport}"
 
@@ -205,5 +229,156 @@ class Airfield(BaseModel):
     elevation_ft = models.IntegerField()
     record_modified = models.IntegerField()
 
+    class Meta(BaseModel.Meta):
+        indexes = BaseModel.Meta.indexes + [
+            # Airfield lookups by code. Not partial (af_icao <> ''): SQLite cannot
+            # match a partial index to a lookup with a bound parameter
+            models.Index(fields=['af_icao'], name='airfield_icao'),
+            models.Index(fields=['af_iata'], name='airfield_iata'),
+        ]
+
     def __str__(self):
         return f"{self.af_name} ({self.af_code})"
+
+class ImportState(models.Model):
+    """High-water mark of ``_modified`` imported per user and export table."""
+    user_id = models.IntegerField()
+    table = models.CharField(max_length=50)
+    last_modified = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'table'], name='unique_import_state'),
+        ]
+
+    def __str__(self):
+        return f"{self.table} for user {self.user_id} up to {self.last_modified}"
+
+class ImportCheckpoint(models.Model):
+    """Last committed position of an interrupted import, per source file."""
+    source = models.CharField(max_length=500)
+    source_hash = models.CharField(max_length=64, unique=True)
+    source_size = models.BigIntegerField()
+    records = models.BigIntegerField(default=0)
+    offset = models.BigIntegerField(default=0)
+    counters = models.JSONField(default=dict)
+    marks = models.JSONField(default=list)
+    # (user_id, month) rollup buckets written before the checkpoint
+    buckets = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} at record {self.records}"
+
+class ImportJob(models.Model):
+    """One file of an import_data run: outcome, timing and record counts."""
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+    STATUS_CHOICES = [
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+        (SKIPPED, 'Skipped'),
+    ]
+
+    source = models.CharField(max_length=500)
+    source_hash = models.CharField(max_length=64)
+    source_size = models.BigIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True)
+    seconds = models.FloatField(null=True)
+    records = models.BigIntegerField(default=0)
+    created = models.BigIntegerField(default=0)
+    updated = models.BigIntegerField(default=0)
+    failed = models.BigIntegerField(default=0)
+    # ImportStats.as_dict(): every counter per table
+    counters = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # Has this content been imported already?
+            models.Index(fields=['source_hash', 'status'], name='importjob_hash_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.status}"
+
+class QueryCacheVersion(models.Model):
+    """Version of a user's flights and stored queries, part of every cached query result key.
+
+    Kept in the database so a bump made by the importer reaches every
+    process serving the cache, whatever cache backend each one has.
+    """
+    user_id = models.IntegerField(unique=True)
+    flights = models.BigIntegerField(default=0)
+    queries = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"user {self.user_id} at flights {self.flights}, queries {self.queries}"
+
+class LogbookRollup(models.Model):
+    """Flight totals of one user, aircraft and calendar month, kept current by the importer."""
+    user_id = models.IntegerField()
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, null=True, blank=True, related_name='rollups')
+    # First day of the month; null for flights without a date
+    month = models.DateField(null=True)
+    flights = models.IntegerField(default=0)
+    total_time = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    pic = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    sic = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    night = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    actual_instrument = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    simulated_instrument = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    cross_country = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    day_landings = models.IntegerField(default=0)
+    night_landings = models.IntegerField(default=0)
+    all_landings = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'aircraft', 'month'], name='unique_logbook_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['user_id', 'month'], name='rollup_user_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.flights} flights of user {self.user_id} in {self.month}"
+
+class QualificationStatus(models.Model):
+    """Currency of one qualification as of the last scan, materialized for notification jobs."""
+    CURRENT = 'current'
+    EXPIRING = 'expiring'
+    EXPIRED = 'expired'
+    LAPSED = 'lapsed'
+    STATUS_CHOICES = [
+        (CURRENT, 'Current'),
+        (EXPIRING, 'Expiring'),
+        (EXPIRED, 'Expired'),
+        (LAPSED, 'Recency lapsed'),
+    ]
+
+    qualification = models.OneToOneField(Qualification, on_delete=models.CASCADE, related_name='status')
+    user_id = models.IntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES)
+    expires = models.DateField(null=True)
+    # Day the pilot is to be reminded: ``expires`` minus the qualification's notify_days
+    notify_on = models.DateField(null=True)
+    recent_flights = models.IntegerField(default=0)
+    required_flights = models.IntegerField(default=0)
+    scanned_on = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'status'], name='qualstatus_user_status'),
+            # The notification job: every qualification in a given status
+            models.Index(fields=['status', 'user_id'], name='qualstatus_status_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.qualification_id} {self.status} as of {self.scanned_on}"
@@ -0,0 +1,177 @@
+import multiprocessing
+import traceback
+import zlib
+from queue import Empty, Full
+
+# Chunks of records that may wait in a worker's queue before the reader blocks
+QUEUE_DEPTH = 4
+
+# Seconds the parent waits on a worker's queue or result before checking that the worker is still alive
+POLL_INTERVAL = 1.0
+
+# Tables large enough to be spread across workers by guid instead of by table
+HASHED_TABLES = {'flight'}
+
+
+def partition_index(record, workers):
+    """Return the worker that owns ``record``.
+
+    Every table goes to a single worker, except the hashed tables which are
+    split by guid. A given guid therefore always lands on the same worker,
+    so repeated versions of a record are still applied in file order.
+    """
+    table_name = record['table'].lower()
+    key = str(record.get('guid', '')) if table_name in HASHED_TABLES else table_name
+    return zlib.crc32(key.encode('utf-8')) % workers
+
+
+def worker_context():
+    """Multiprocessing context for import workers, once the parent's connections are closed.
+
+    Children must open their own connections rather than share the parent's.
+    """
+    from django.db import connections
+
+    connections.close_all()
+    return multiprocessing.get_context()
+
+
+def setup_worker():
+    """Make Django usable in a worker process; returns its connection handler."""
+    import django
+    from django.apps import apps
+
+    # Spawned workers start with a fresh interpreter
+    if not apps.ready:
+        django.setup()
+
+    from django.db import connections
+    return connections
+
+
+def run_import_worker(position, queue, results, batch_size, verbosity, incremental):
+    """Import the record chunks read from ``queue`` on this process' own connection."""
+    connections = setup_worker()
+    from pilotlog.management.commands.import_data import Command
+
+    command = Command()
+    command.verbosity = verbosity
+    command.setup_writer(batch_size, incremental)
+    error = None
+    try:
+        while True:
+            chunk = queue.get()
+            if chunk is None:
+                break
+            for record in chunk:
+                command.import_record(record)
+        command.flush_all()
+    except Exception:
+        error = traceback.format_exc()
+        # Keep draining so the reader never blocks on a dead worker
+        while queue.get() is not None:
+            pass
+    finally:
+        connections.close_all()
+
+    # Batches flushed before a failure are committed, so report them (and their buckets) either way
+    marks = command.marks if error is None else {}
+    results.put((position, command.stats.as_dict(), marks, command.rollups.buckets, error))
+
+
+def run_parallel_import(records, workers, batch_size, verbosity=1, incremental=False):
+    """Fan ``records`` out to ``workers`` processes and wait for them to finish.
+
+    Returns ``(snapshots, marks, buckets, errors)``: the ``ImportStats.as_dict()``,
+    the ``_modified`` high-water marks and the rollup buckets written by every
+    worker, and the traceback of every worker that failed. A worker that dies
+    without reporting (killed by the OOM killer, say) is found within
+    ``POLL_INTERVAL`` seconds and reported as an error instead of hanging
+    the run; what it had already committed is not counted.
+    """
+    context = worker_context()
+    queues = [context.Queue(maxsize=QUEUE_DEPTH) for _ in range(workers)]
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=run_import_worker, args=(position, queue, results, batch_size, verbosity, incremental), daemon=True,
+        )
+        for position, queue in enumerate(queues)
+    ]
+    for process in processes:
+        process.start()
+
+    def send(position, item):
+        # A dead worker never frees room in its queue; its records are dropped instead
+        while processes[position].is_alive():
+            try:
+                queues[position].put(item, timeout=POLL_INTERVAL)
+                return
+            except Full:
+                pass
+
+    chunks = [[] for _ in range(workers)]
+    try:
+        for record in records:
+            index = partition_index(record, workers)
+            chunks[index].append(record)
+            if len(chunks[index]) >= batch_size:
+                send(index, chunks[index])
+                chunks[index] = []
+    finally:
+        for position, chunk in enumerate(chunks):
+            if chunk:
+                send(position, chunk)
+            send(position, None)
+
+    snapshots, marks, buckets, errors = [], [], set(), []
+    pending = set(range(workers))
+    while pending:
+        try:
+            reported = [results.get(timeout=POLL_INTERVAL)]
+        except Empty:
+            exited = {position for position in pending if not processes[position].is_alive()}
+            if not exited:
+                continue
+            # A worker flushes its result before it exits, so whatever it sent is readable now
+            reported = []
+            while True:
+                try:
+                    reported.append(results.get(timeout=POLL_INTERVAL))
+                except Empty:
+                    break
+            exited -= {result[0] for result in reported}
+            for position in exited:
+                pending.discard(position)
+                errors.append(
+                    f"Import worker {position} exited with code {processes[position].exitcode} without reporting\n"
+                )
+        for position, snapshot, worker_marks, worker_buckets, error in reported:
+            pending.discard(position)
+            snapshots.append(snapshot)
+            marks.append(worker_marks)
+            buckets.update(worker_buckets)
+            if error:
+                errors.append(error)
+    for process in processes:
+        process.join()
+    return snapshots, marks, buckets, errors
+
+
+def run_file_worker(task):
+    """Pool entry point of a multi-file import: import one whole file on this process' own connection."""
+    connections = setup_worker()
+    from pilotlog.jobs import run_import_job
+
+    path, options, skip_imported = task
+    try:
+        return run_import_job(path, options, skip_imported=skip_imported)
+    finally:
+        connections.close_all()
+
+
+def run_file_imports(paths, options, jobs, skip_imported=True):
+    """Import ``paths`` on a pool of ``jobs`` processes, yielding each ``JobResult`` as its file finishes."""
+    context = worker_context()
+    with context.Pool(processes=jobs) as pool:
+        yield from pool.imap_unordered(run_file_worker, [(path, options, skip_imported) for path in paths])
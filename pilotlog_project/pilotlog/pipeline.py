@@ -0,0 +1,141 @@
+import queue
+import threading
+
+from django.db import connections
+
+from pilotlog.bulk import BulkUpsertWriter
+
+# Records handed from the reading thread to the converting one at a time
+READ_BATCH_SIZE = 500
+
+# Batches a stage may run ahead of the next one before it blocks
+QUEUE_DEPTH = 4
+
+
+class PrefetchedReader:
+    """Iterate over the records of a reader while a thread reads and decodes ahead.
+
+    The records are handed over in batches through a queue of
+    ``QUEUE_DEPTH`` batches, so reading stalls instead of buffering the
+    file when conversion falls behind. ``offset`` follows the record last
+    yielded, as on :class:`~pilotlog.readers.JsonArrayReader`, so
+    checkpoints are taken at the same positions; it stays None for plain
+    iterables of records.
+    """
+
+    def __init__(self, reader, batch_size=READ_BATCH_SIZE, depth=QUEUE_DEPTH):
+        self.reader = reader
+        self.batch_size = batch_size
+        self.offset = getattr(reader, 'offset', None)
+        self.batches = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+
+    def read(self):
+        batch = []
+        try:
+            for record in self.reader:
+                batch.append((record, getattr(self.reader, 'offset', None)))
+                if len(batch) >= self.batch_size:
+                    if self.stopped.is_set():
+                        return
+                    self.batches.put(batch)
+                    batch = []
+            self.batches.put(batch)
+        except Exception as e:
+            self.batches.put(e)
+        finally:
+            self.batches.put(None)
+
+    def __iter__(self):
+        thread = threading.Thread(target=self.read, name='import-reader', daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = self.batches.get()
+                if batch is None:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                for record, offset in batch:
+                    self.offset = offset
+                    yield record
+        finally:
+            # Unblock a reader still waiting for room when the consumer gives up early
+            self.stopped.set()
+            while thread.is_alive():
+                try:
+                    self.batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+
+
+class PipelinedWriter(BulkUpsertWriter):
+    """:class:`BulkUpsertWriter` whose batches are written by a dedicated thread.
+
+    A full buffer is queued instead of written in place, so the importing
+    thread goes on converting records while the database works; once
+    ``QUEUE_DEPTH`` batches are waiting it blocks until the writer catches
+    up. The writer thread borrows the importing thread's connection (and
+    so its transaction), which is otherwise idle while records stream.
+    Between :meth:`start` and :meth:`stop` the guid indexes and counters
+    belong to the writer thread; :meth:`flush_all` waits for every queued
+    batch and re-raises a failed write.
+    """
+
+    def __init__(self, *args, depth=QUEUE_DEPTH, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending = queue.Queue(maxsize=depth)
+        self.thread = None
+        self.error = None
+
+    def start(self):
+        connection = connections[self.using]
+        connection.inc_thread_sharing()
+        self.thread = threading.Thread(target=self.run, args=(connection,), name='import-writer', daemon=True)
+        self.thread.start()
+
+    def run(self, connection):
+        connections[self.using] = connection
+        while True:
+            job = self.pending.get()
+            try:
+                if job is None:
+                    return
+                # After a failure the remaining batches are dropped, not written out of order
+                if self.error is None:
+                    self.write(*job)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.pending.task_done()
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def flush(self, model):
+        if self.thread is None:
+            return super().flush(model)
+        buffer = self.buffers.pop(model, None)
+        if not buffer:
+            return 0
+        self.raise_error()
+        self.pending.put((model, buffer, self.replaced.pop(model, 0)))
+        return len(buffer)
+
+    def flush_all(self):
+        total = super().flush_all()
+        if self.thread is not None:
+            self.pending.join()
+        self.raise_error()
+        return total
+
+    def stop(self):
+        """Let the writer finish the queued batches and end the thread."""
+        if self.thread is None:
+            return
+        self.pending.put(None)
+        self.thread.join()
+        self.thread = None
+        connections[self.using].dec_thread_sharing()
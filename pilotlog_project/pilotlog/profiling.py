@@ -0,0 +1,155 @@
+import cProfile
+import heapq
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+
+# Slowest statements kept for the report
+SLOWEST_COUNT = 10
+
+# Characters of SQL shown per statement
+SQL_PREVIEW = 160
+
+
+def record_table(record):
+    return record['table'].lower()
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook counting and timing the statements sent to the database.
+
+    Only the ``keep`` slowest statements are retained, so recording a
+    million-query import costs constant memory.
+    """
+
+    def __init__(self, keep=SLOWEST_COUNT):
+        self.count = 0
+        self.seconds = 0.0
+        self.keep = keep
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.seconds += duration
+            entry = (duration, self.count, sql, len(params) if many and hasattr(params, '__len__') else 1)
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def slowest_statements(self):
+        """``(seconds, sql, rows)`` of the slowest statements, slowest first."""
+        return [(duration, sql, rows) for duration, _, sql, rows in sorted(self.slowest, reverse=True)]
+
+
+class TableTimer:
+    """Attribute the wall time of an import loop to the table of each record.
+
+    Wraps the record iterator: the time spent reading (parsing) a record
+    is charged to ``read``, and the time the consumer spends on it before
+    asking for the next one (conversion, buffering and any batch it causes
+    to be flushed) to ``process``.
+    """
+
+    def __init__(self):
+        self.read = Counter()
+        self.process = Counter()
+
+    def seconds(self, table):
+        return self.read[table] + self.process[table]
+
+    def wrap(self, records, key=record_table):
+        clock = time.perf_counter
+        read, process = self.read, self.process
+        iterator = iter(records)
+        while True:
+            started = clock()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                return
+            table = key(record)
+            yielded = clock()
+            read[table] += yielded - started
+            yield record
+            process[table] += clock() - yielded
+
+
+class ImportProfiler:
+    """Collect phase and table timings, query statistics and an optional cProfile of an import."""
+
+    def __init__(self, dump_path=None):
+        self.queries = QueryRecorder()
+        self.tables = TableTimer()
+        self.phases = {}
+        self.dump_path = dump_path
+        self.started = None
+        self.elapsed = 0.0
+
+    @contextmanager
+    def recording(self):
+        """Instrument the default connection (and run cProfile if a dump was requested)."""
+        profile = cProfile.Profile() if self.dump_path else None
+        self.started = time.perf_counter()
+        with connection.execute_wrapper(self.queries):
+            if profile is not None:
+                profile.enable()
+            try:
+                yield self
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    profile.dump_stats(self.dump_path)
+                self.elapsed = time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase and the queries it runs; repeated phases add up."""
+        queries = self.queries
+        started, count, seconds = time.perf_counter(), queries.count, queries.seconds
+        try:
+            yield
+        finally:
+            phase = self.phases.setdefault(name, {'seconds': 0.0, 'queries': 0, 'query_seconds': 0.0})
+            phase['seconds'] += time.perf_counter() - started
+            phase['queries'] += queries.count - count
+            phase['query_seconds'] += queries.seconds - seconds
+
+    def report(self, stats):
+        """Render the profile as text lines."""
+        lines = ['Profile', f"{'Phase':<14} {'Seconds':>9} {'Queries':>9} {'Query s':>9}"]
+        for name, phase in self.phases.items():
+            lines.append(f"{name:<14} {phase['seconds']:>9.3f} {phase['queries']:>9,} {phase['query_seconds']:>9.3f}")
+        lines.append(f"{'total':<14} {self.elapsed:>9.3f} {self.queries.count:>9,} {self.queries.seconds:>9.3f}")
+
+        lines.append('')
+        lines.append(f"{'Table':<14} {'Records':>10} {'Read s':>9} {'Process s':>10} {'Rate/s':>10}")
+        for table in stats.tables():
+            seconds = self.tables.seconds(table)
+            rate = f'{stats.records[table] / seconds:,.0f}' if seconds else '-'
+            lines.append(
+                f"{table:<14} {stats.records[table]:>10,} {self.tables.read[table]:>9.3f}"
+                f" {self.tables.process[table]:>10.3f} {rate:>10}"
+            )
+
+        slowest = self.queries.slowest_statements()
+        if slowest:
+            lines.append('')
+            lines.append('Slowest statements')
+            for duration, sql, rows in slowest:
+                preview = ' '.join(sql.split())
+                if len(preview) > SQL_PREVIEW:
+                    preview = preview[:SQL_PREVIEW - 3] + '...'
+                batch = f' [{rows} parameter sets]' if rows > 1 else ''
+                lines.append(f'  {duration * 1000:>9.2f} ms  {preview}{batch}')
+        if self.dump_path:
+            lines.append('')
+            lines.append(f'cProfile stats written to {self.dump_path} (inspect with python -m pstats)')
+        return lines
@@ -0,0 +1,127 @@
+import time
+from collections import Counter
+
+# Records processed between two looks at the clock
+CHECK_EVERY = 1000
+
+# Seconds between two progress reports
+DEFAULT_INTERVAL = 5.0
+
+
+class ImportStats:
+    """Per-table counters for one import run."""
+
+    fields = ('records', 'created', 'updated', 'superseded', 'unchanged', 'skipped', 'failed')
+
+    def __init__(self):
+        for field in self.fields:
+            setattr(self, field, Counter())
+
+    def tables(self):
+        """Every table that has at least one counter, in first-seen order."""
+        seen = {}
+        for field in self.fields:
+            for table in getattr(self, field):
+                seen.setdefault(table, None)
+        return list(seen)
+
+    def as_dict(self):
+        """Plain-dict snapshot, safe to send between processes."""
+        return {field: dict(getattr(self, field)) for field in self.fields}
+
+    def merge(self, snapshot, fields=fields):
+        """Add the counters of an :meth:`as_dict` snapshot to this one."""
+        for field in fields:
+            getattr(self, field).update(snapshot.get(field, {}))
+
+
+def format_duration(seconds):
+    """Render a duration as ``1h02m03s`` / ``2m03s`` / ``3s``."""
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f'{hours}h{minutes:02d}m{seconds:02d}s'
+    if minutes:
+        return f'{minutes}m{seconds:02d}s'
+    return f'{seconds}s'
+
+
+class ProgressReporter:
+    """Print periodic per-table throughput lines and a final summary.
+
+    ``tick`` is called once per record and only reads the clock every
+    ``CHECK_EVERY`` records, so reporting stays off the hot path. Each
+    report is formatted into one string and written in a single call.
+    """
+
+    def __init__(self, stdout, style, stats, interval=DEFAULT_INTERVAL, position=None, total_size=None):
+        self.stdout = stdout
+        self.style = style
+        self.stats = stats
+        self.interval = interval
+        # Callable returning how many bytes of the source have been read
+        self.position = position
+        self.total_size = total_size
+        self.started = self.last_report = time.monotonic()
+        self.ticks = 0
+
+    def tick(self):
+        self.ticks += 1
+        if self.ticks % CHECK_EVERY:
+            return
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(now)
+
+    def eta(self, elapsed):
+        """Estimate the remaining time from the share of the source read so far."""
+        if not self.position or not self.total_size:
+            return None
+        done = self.position()
+        if not done:
+            return None
+        fraction = min(done / self.total_size, 1.0)
+        return fraction, elapsed * (1 - fraction) / fraction
+
+    def report(self, now=None):
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        stats = self.stats
+        lines = []
+        for table in stats.tables():
+            lines.append(
+                f'  {table:<14} {stats.records[table]:>10,} records {stats.records[table] / elapsed:>10,.0f}/s'
+                f'  created {stats.created[table]:,}  updated {stats.updated[table]:,}  superseded {stats.superseded[table]:,}'
+                f'  unchanged {stats.unchanged[table]:,}'
+                f'  skipped {stats.skipped[table]:,}  failed {stats.failed[table]:,}'
+            )
+        header = f'[{format_duration(elapsed)}] {sum(stats.records.values()):,} records'
+        estimate = self.eta(elapsed)
+        if estimate:
+            fraction, remaining = estimate
+            header += f', {fraction:.1%} of input, ETA {format_duration(remaining)}'
+        self.stdout.write('\n'.join([header] + lines))
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stats = self.stats
+        columns = ('Table',) + tuple(field.capitalize() for field in stats.fields) + ('Rate/s',)
+        rows = [
+            (table,) + tuple(f'{getattr(stats, field)[table]:,}' for field in stats.fields)
+            + (f'{stats.records[table] / elapsed:,.0f}',)
+            for table in stats.tables()
+        ]
+        totals = ('total',) + tuple(f'{sum(getattr(stats, field).values()):,}' for field in stats.fields)
+        rows.append(totals + (f'{sum(stats.records.values()) / elapsed:,.0f}',))
+
+        widths = [max(len(str(row[i])) for row in [columns] + rows) for i in range(len(columns))]
+
+        def render(row):
+            return '  '.join(str(cell).ljust(width) if i == 0 else str(cell).rjust(width)
+                             for i, (cell, width) in enumerate(zip(row, widths)))
+
+        lines = [render(columns), '  '.join('-' * width for width in widths)]
+        lines.extend(render(row) for row in rows)
+        lines.append(f'Finished in {format_duration(elapsed)}')
+        self.stdout.write(self.style.SUCCESS('\n'.join(lines)))
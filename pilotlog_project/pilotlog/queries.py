@@ -0,0 +1,170 @@
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models import F, Q
+
+from pilotlog.mappings import TABLE_SPECS
+from pilotlog.models import Flight, MyQueryBuild, Query, QueryCacheVersion
+from pilotlog.rollups import flight_aggregates
+
+# Prefix of every cache key of this module
+CACHE_PREFIX = 'pilotlog:query'
+
+# Seconds a result is kept when nothing invalidates it first (changes made outside the importer)
+RESULT_TIMEOUT = 24 * 60 * 60
+
+# MyQueryBuild.build2 -> (field lookup, negated)
+OPERATORS = {
+    0: ('exact', False),
+    1: ('exact', True),
+    2: ('gt', False),
+    3: ('gte', False),
+    4: ('lt', False),
+    5: ('lte', False),
+    6: ('icontains', False),
+    7: ('istartswith', False),
+    8: ('iendswith', False),
+    9: ('empty', False),
+    10: ('empty', True),
+}
+
+# MyQueryBuild.build3: how a condition joins the ones before it. AND binds
+# tighter, so ``a AND b OR c`` is ``(a AND b) OR c``
+AND, OR = 0, 1
+
+# Flight column a build refers to: the model field name or the pilotlog_mcc export name
+FLIGHT_FIELDS = {field.name: field for field in Flight._meta.concrete_fields}
+FLIGHT_FIELDS.update({
+    field.source.lower(): Flight._meta.get_field(field.target)
+    for spec in TABLE_SPECS if spec.model is Flight
+    for field in spec.fields if field.target in FLIGHT_FIELDS
+})
+
+# A query ready to run: its Flight condition and the Query row it came from
+CompiledQuery = namedtuple('CompiledQuery', ['user_id', 'code', 'name', 'quick_view', 'condition'])
+
+
+class QueryError(ValueError):
+    """Raised when the build rows of a stored query cannot be compiled."""
+
+
+def compile_condition(column, operator, value):
+    """The ``Q`` of one build row."""
+    field = FLIGHT_FIELDS.get(column) or FLIGHT_FIELDS.get((column or '').lower())
+    if field is None:
+        raise QueryError(f"Unknown flight column: {column}")
+    if operator not in OPERATORS:
+        raise QueryError(f"Unknown operator {operator} on {column}")
+    lookup, negated = OPERATORS[operator]
+    name = field.attname if isinstance(field, models.ForeignKey) else field.name
+
+    if lookup == 'empty':
+        condition = Q(**{f'{name}__isnull': True})
+        if isinstance(field, (models.CharField, models.TextField)):
+            condition |= Q(**{name: ''})
+    elif lookup in ('icontains', 'istartswith', 'iendswith'):
+        condition = Q(**{f'{name}__{lookup}': value})
+    else:
+        target = field.target_field if isinstance(field, models.ForeignKey) else field
+        try:
+            condition = Q(**{f'{name}__{lookup}': target.to_python(value)})
+        except ValidationError:
+            raise QueryError(f"Invalid value for {column}: {value!r}")
+    return ~condition if negated else condition
+
+
+def compile_builds(builds):
+    """Combine ``(build1, build2, build3, build4)`` rows, in order, into one ``Q`` over Flight."""
+    groups = []
+    for column, operator, connector, value in builds:
+        condition = compile_condition(column, operator, value)
+        if groups and connector != OR:
+            groups[-1] &= condition
+        else:
+            groups.append(condition)
+    combined = Q()
+    for group in groups:
+        combined |= group
+    return combined
+
+
+# Users whose version is bumped per statement
+BUMP_CHUNK_SIZE = 500
+
+
+def _bump(kind, user_ids, using=DEFAULT_DB_ALIAS):
+    # The versions live in the database, not the cache: a per-process cache would
+    # never see a bump made by the importer's process
+    user_ids = sorted(user_ids)
+    versions = QueryCacheVersion.objects.using(using)
+    for start in range(0, len(user_ids), BUMP_CHUNK_SIZE):
+        chunk = user_ids[start:start + BUMP_CHUNK_SIZE]
+        versions.bulk_create([QueryCacheVersion(user_id=user_id) for user_id in chunk], ignore_conflicts=True)
+        versions.filter(user_id__in=chunk).update(**{kind: F(kind) + 1})
+
+
+def invalidate_flights(user_ids, using=DEFAULT_DB_ALIAS):
+    """Drop the cached results of these users, whose flights have changed."""
+    _bump('flights', user_ids, using)
+
+
+def invalidate_queries(user_ids, using=DEFAULT_DB_ALIAS):
+    """Drop the compiled plans and results of these users, whose MyQuery/MyQueryBuild rows have changed."""
+    _bump('queries', user_ids, using)
+
+
+def _versions(user_id, using=DEFAULT_DB_ALIAS):
+    found = QueryCacheVersion.objects.using(using).filter(user_id=user_id).values_list('queries', 'flights').first()
+    return found or (0, 0)
+
+
+def load_plan(user_id, code, using=DEFAULT_DB_ALIAS):
+    """The :class:`CompiledQuery` of a user's stored query, or None if there is no such query.
+
+    Plans are cached under the query's code and ``record_modified`` (and
+    the user's query version), so the build rows are only read and
+    compiled again once the query changes.
+    """
+    found = (
+        Query.objects.using(using).filter(user_id=user_id, mQCode=code)
+        .order_by('pk').values_list('name', 'quick_view', 'record_modified').first()
+    )
+    if found is None:
+        return None
+    name, quick_view, record_modified = found
+    key = f'{CACHE_PREFIX}:plan:{user_id}:{code}:{record_modified}:{_versions(user_id, using)[0]}'
+    plan = cache.get(key)
+    if plan is None:
+        try:
+            builds = (
+                MyQueryBuild.objects.using(using).filter(user_id=user_id, mQCode=uuid.UUID(code))
+                .order_by('pk').values_list('build1', 'build2', 'build3', 'build4')
+            )
+        except ValueError:
+            builds = []  # Not a build code: a query without conditions
+        plan = CompiledQuery(user_id, code, name, quick_view, compile_builds(builds))
+        cache.set(key, plan, None)
+    return plan
+
+
+def run_query(user_id, code, using=DEFAULT_DB_ALIAS):
+    """Flight count and totals of a user's stored query, or None if there is no such query.
+
+    Results are cached until the user's flights or queries change; a
+    repeated call (e.g. a quick view on every page load) costs one lookup
+    of the user's :class:`QueryCacheVersion` row and a cache read.
+    """
+    key = f'{CACHE_PREFIX}:result:{user_id}:{code}:' + ':'.join(map(str, _versions(user_id, using)))
+    result = cache.get(key)
+    if result is not None:
+        return result
+    plan = load_plan(user_id, code, using)
+    if plan is None:
+        return None
+    totals = Flight.objects.using(using).filter(user_id=user_id).filter(plan.condition).aggregate(**flight_aggregates())
+    result = {'code': code, 'name': plan.name, 'quick_view': plan.quick_view, 'totals': totals}
+    cache.set(key, result, RESULT_TIMEOUT)
+    return result
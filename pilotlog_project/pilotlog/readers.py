@@ -0,0 +1,123 @@
+import json
+
+# Number of characters read from disk per refill of the decode buffer
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+# A decode error this close to the end of the buffer may be a token cut off
+# by the chunk boundary (e.g. a literal or a \uXXXX surrogate pair)
+_TRUNCATION_MARGIN = 12
+
+
+class JsonArrayReader:
+    """Iterate over the elements of a top-level JSON array one at a time.
+
+    Only the current record and one read chunk are held in memory, so the
+    peak footprint does not grow with the size of the export.
+
+    ``offset`` is the number of characters consumed up to the end of the
+    last record yielded. Passing it back as ``start`` on a new reader over
+    the same file continues right after that record.
+    """
+
+    def __init__(self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE, start=0):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.start = start
+        self.offset = start
+        # Characters dropped from the front of the buffer so far
+        self.dropped = 0
+
+    def skip_to_start(self):
+        """Read past the first ``start`` characters without decoding them."""
+        remaining = self.start
+        while remaining:
+            chunk = self.file_obj.read(min(remaining, self.chunk_size))
+            if not chunk:
+                raise ValueError("Resume offset is past the end of the import file")
+            remaining -= len(chunk)
+        self.dropped = self.start
+
+    def __iter__(self):
+        decoder = json.JSONDecoder()
+        file_obj = self.file_obj
+        chunk_size = self.chunk_size
+        buffer = ''
+        pos = 0
+
+        def refill():
+            nonlocal buffer, pos
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                return False
+            # Drop everything already consumed before growing the buffer
+            self.dropped += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or not refill():
+                    return
+
+        if self.start:
+            # Continue after a record: the next token is ',' or ']'
+            self.skip_to_start()
+            refill()
+            expect_value = False
+        else:
+            # Opening bracket of the top-level array (tolerate a UTF-8 BOM)
+            refill()
+            if buffer.startswith('\ufeff'):
+                pos = 1
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] != '[':
+                raise ValueError("Expected a JSON array at the top level of the import file")
+            pos += 1
+            expect_value = True
+
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError("Unexpected end of file: unterminated JSON array")
+
+            char = buffer[pos]
+            if char == ']':
+                return
+            if char == ',' and not expect_value:
+                pos += 1
+                expect_value = True
+                continue
+
+            if not expect_value:
+                raise ValueError(f"Expected ',' or ']' between records, found {char!r}")
+
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # Only a record running into the end of the buffer can be completed by reading more
+                    truncated = e.pos >= len(buffer) - _TRUNCATION_MARGIN or e.msg.startswith('Unterminated string')
+                    if not truncated or not refill():
+                        raise ValueError(
+                            f"Malformed JSON record at offset {self.dropped + pos}: {e.msg}"
+                        ) from e
+                    continue
+                # A value ending exactly at the buffer edge (e.g. a number) may be truncated
+                if end == len(buffer) and refill():
+                    continue
+                break
+            pos = end
+            self.offset = self.dropped + pos
+            expect_value = False
+            yield record
+
+
+def iter_json_records(file_obj, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array one at a time."""
+    return iter(JsonArrayReader(file_obj, chunk_size))
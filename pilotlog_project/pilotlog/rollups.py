@@ -0,0 +1,168 @@
+from datetime import date
+
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from pilotlog.bulk import DEFAULT_BATCH_SIZE, DEFAULT_INDEX_CHUNK_SIZE
+from pilotlog.models import Flight, LogbookRollup
+
+# Rollup column -> the Flight column it sums
+TOTALS = {
+    'total_time': 'total_time',
+    'pic': 'pic',
+    'sic': 'sic',
+    'night': 'night',
+    'actual_instrument': 'actual_instrument',
+    'simulated_instrument': 'simulated_instrument',
+    'cross_country': 'cross_country',
+    'day_landings': 'day_landings_full_stop',
+    'night_landings': 'night_landings_full_stop',
+    'all_landings': 'all_landings',
+}
+
+# Months recomputed per query when refreshing a user's buckets
+MONTHS_PER_QUERY = 100
+
+
+def month_of(day):
+    """First day of the month of ``day``; None stays None (the bucket of undated flights)."""
+    return day.replace(day=1) if day is not None else None
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _sum(model, name):
+    field = model._meta.get_field(name)
+    if isinstance(field, models.DecimalField):
+        output_field = models.DecimalField(max_digits=10, decimal_places=field.decimal_places)
+    else:
+        output_field = models.IntegerField()
+    # Empty groups sum to 0, not NULL
+    return Coalesce(Sum(name), Value(0), output_field=output_field)
+
+
+def flight_aggregates():
+    """Flight count and the ``TOTALS`` sums, as ``aggregate()``/``annotate()`` keyword arguments."""
+    sums = {column: _sum(Flight, source) for column, source in TOTALS.items()}
+    return {'flights': Count('id'), **sums}
+
+
+class RollupTracker:
+    """Collect the ``(user_id, month)`` buckets an import touches.
+
+    Hooked in front of every flush of the bulk writer: a written flight
+    dirties the bucket of its new date, and an updated one also that of the
+    date it had before, so a flight moved to another month leaves both
+    correct. Aircraft changes stay within a month, and a month is always
+    recomputed for all of its aircraft.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.buckets = set()
+
+    def before_flush(self, model, instances, index):
+        if model is not Flight:
+            return
+        existing = []
+        for instance in instances:
+            self.buckets.add((instance.user_id, month_of(instance.date)))
+            if instance.guid in index:
+                existing.append(index[instance.guid][0])
+        if existing:
+            stored = Flight.objects.using(self.using).filter(pk__in=existing).values_list('user_id', 'date')
+            self.buckets.update((user_id, month_of(day)) for user_id, day in stored)
+
+    def add(self, user_id, day):
+        self.buckets.add((user_id, month_of(day)))
+
+
+def refresh_rollups(buckets, using=DEFAULT_DB_ALIAS):
+    """Recompute the rollup rows of the given ``(user_id, month)`` buckets from Flight.
+
+    Each user's months are re-aggregated with one grouped query per
+    ``MONTHS_PER_QUERY`` months, over the (user_id, date) index, and
+    swapped in with a delete and insert in one transaction. Returns the
+    number of rollup rows written.
+    """
+    months_by_user = {}
+    for user_id, month in buckets:
+        months_by_user.setdefault(user_id, set()).add(month)
+
+    written = 0
+    for user_id, months in sorted(months_by_user.items()):
+        dated = sorted(month for month in months if month is not None)
+        chunks = [dated[start:start + MONTHS_PER_QUERY] for start in range(0, len(dated), MONTHS_PER_QUERY)]
+        if None in months:
+            chunks.append([None])
+        for chunk in chunks:
+            written += _refresh_months(user_id, chunk, using)
+    return written
+
+
+def month_filter(months):
+    """Flights dated within any of ``months`` (None: undated flights)."""
+    condition = Q()
+    for month in months:
+        if month is None:
+            condition |= Q(date__isnull=True)
+        else:
+            condition |= Q(date__gte=month, date__lt=next_month(month))
+    return condition
+
+
+def _refresh_months(user_id, months, using):
+    flights = Flight.objects.using(using).filter(Q(user_id=user_id) & month_filter(months))
+    rows = [
+        LogbookRollup(user_id=user_id, **values)
+        for values in flights.values('aircraft_id', month=TruncMonth('date')).annotate(**flight_aggregates()).order_by()
+    ]
+    stale = LogbookRollup.objects.using(using).filter(user_id=user_id)
+    if months == [None]:
+        stale = stale.filter(month__isnull=True)
+    else:
+        stale = stale.filter(month__in=months)
+    with transaction.atomic(using=using):
+        stale.delete()
+        LogbookRollup.objects.using(using).bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_rollups(user_id=None, using=DEFAULT_DB_ALIAS, batch_size=DEFAULT_BATCH_SIZE):
+    """Drop and recompute every rollup row (of one user) in a single grouped scan of Flight."""
+    flights = Flight.objects.using(using)
+    rollups = LogbookRollup.objects.using(using)
+    if user_id is not None:
+        flights = flights.filter(user_id=user_id)
+        rollups = rollups.filter(user_id=user_id)
+    grouped = (
+        flights.values('user_id', 'aircraft_id', month=TruncMonth('date'))
+        .annotate(**flight_aggregates())
+        .order_by()
+        .iterator(chunk_size=DEFAULT_INDEX_CHUNK_SIZE)
+    )
+    written = 0
+    with transaction.atomic(using=using):
+        rollups.delete()
+        batch = []
+        for values in grouped:
+            batch.append(LogbookRollup(**values))
+            if len(batch) >= batch_size:
+                LogbookRollup.objects.using(using).bulk_create(batch)
+                written += len(batch)
+                batch = []
+        LogbookRollup.objects.using(using).bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def rollup_totals(user_id, group_by=(), using=DEFAULT_DB_ALIAS):
+    """Totals of a user from the rollup table, per ``group_by`` (``'aircraft'``, ``'month'``) or lifetime."""
+    rollups = LogbookRollup.objects.using(using).filter(user_id=user_id)
+    sums = {column: _sum(LogbookRollup, column) for column in ('flights', *TOTALS)}
+    if not group_by:
+        return rollups.aggregate(**sums)
+    return list(rollups.values(*group_by).annotate(**sums).order_by(*group_by))
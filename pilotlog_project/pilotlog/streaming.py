@@ -0,0 +1,64 @@
+import csv
+import io
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Rows encoded into one chunk of the response body
+ROWS_PER_CHUNK = 500
+
+# Rows fetched per database round-trip while streaming
+FETCH_SIZE = 2000
+
+# wbits for zlib that produce a gzip stream (header and CRC trailer)
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _batched(rows, size=ROWS_PER_CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_chunks(rows, fields):
+    """Encode value tuples as one JSON object per line, ``ROWS_PER_CHUNK`` lines per chunk."""
+    encode = DjangoJSONEncoder(separators=(',', ':')).encode
+    for batch in _batched(rows):
+        yield ''.join(encode(dict(zip(fields, row))) + '\n' for row in batch).encode('utf-8')
+
+
+def csv_chunks(rows, fields):
+    """Encode value tuples as CSV; the header is sent before the first row is fetched."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(fields)
+    yield drain()
+    for batch in _batched(rows):
+        writer.writerows(batch)
+        yield drain()
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a gzip stream as they arrive.
+
+    Every chunk is sync-flushed, so the client receives data as soon as
+    it is produced instead of when the compressor's window fills up.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,3 +1,1170 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import random
+import signal
+import tempfile
+import uuid
+from datetime import date, time
+from decimal import Decimal
+from time import sleep
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from pilotlog.airfields import KDTree, airfield_index, invalidate_airfield_index, unit_vector
+from pilotlog.benchmark import RecordGenerator, write_export
+from pilotlog.bulk import BulkUpsertWriter
+from pilotlog.checkpoints import Checkpointer
+from pilotlog.management.commands.import_data import Command
+from pilotlog.columnar import convert_columns, numeric_fields
+from pilotlog.currency import add_months, due_notifications, scan_qualifications
+from pilotlog.distances import DistanceCalculator
+from pilotlog.foreflight import FOREFLIGHT_PLATFORM, logbook_guid
+from pilotlog.jobs import TailBuffer, expand_paths
+from pilotlog.limits import evaluate_limits
+from pilotlog.linking import link_flight_aircraft
+from pilotlog.mappings import TABLE_SPECS, RecordError, compile_spec
+from pilotlog.models import (
+    Aircraft, Airfield, Flight, ImportCheckpoint, ImportJob, ImportState, LimitRules, LogbookRollup, MyQueryBuild, Pilot,
+    Qualification, QualificationStatus, Query, QueryCacheVersion,
+)
+from pilotlog.parallel import partition_index, run_file_imports, run_import_worker, run_parallel_import
+from pilotlog.pipeline import PipelinedWriter
+from pilotlog.profiling import QueryRecorder
+from pilotlog.queries import QueryError, compile_builds, run_query
+from pilotlog.readers import JsonArrayReader, iter_json_records
+from pilotlog.rollups import refresh_rollups, rollup_totals
+from pilotlog.views import decode_cursor, encode_cursor, seek
+from pilotlog.watermarks import load_watermarks, save_watermarks
+
+
+class JsonRecordReaderTests(SimpleTestCase):
+
+    def test_streams_records_across_chunk_boundaries(self):
+        records = [{'table': 'Flight', 'guid': str(i), 'meta': {'Route': 'A,]B' * i, 'minPIC': i * 1.5}} for i in range(50)]
+        payload = json.dumps(records, indent=2)
+        for chunk_size in (1, 7, 4096):
+            self.assertEqual(list(iter_json_records(io.StringIO(payload), chunk_size=chunk_size)), records)
+
+    def test_rejects_non_array_and_truncated_files(self):
+        for payload in ('{}', '[{"table": "Flight"} {"table": "Pilot"}]', '[{"table": "Flight"},'):
+            with self.assertRaises(ValueError):
+                list(iter_json_records(io.StringIO(payload), chunk_size=4))
+
+    def test_malformed_record_fails_without_reading_to_the_end(self):
+        records = [json.dumps({'guid': str(i), 'Route': 'A-B'}) for i in range(1000)]
+        records[10] = '{"guid": "10", "Route": A-B}'
+        payload = '[' + ','.join(records) + ']'
+        source = io.StringIO(payload)
+        reader = JsonArrayReader(source, chunk_size=64)
+        with self.assertRaisesRegex(ValueError, f'offset {payload.index(records[10])}'):
+            list(reader)
+        self.assertLess(source.tell(), len(payload) // 10)
+
+    def test_restarts_after_the_offset_of_a_record(self):
+        records = [{'guid': str(i), 'Route': 'é' * i} for i in range(10)]
+        payload = '\ufeff' + json.dumps(records, indent=2)
+        reader = JsonArrayReader(io.StringIO(payload), chunk_size=5)
+        for _ in zip(range(4), reader):
+            pass
+        resumed = JsonArrayReader(io.StringIO(payload), chunk_size=5, start=reader.offset)
+        self.assertEqual(list(resumed), records[4:])
+
+
+def make_record(table, guid, meta=None, user_id=1, modified=1700000000):
+    """Build a pilotlog_mcc export record for ``table``."""
+    return {
+        'table': table,
+        'guid': guid,
+        'user_id': user_id,
+        'platform': 9,
+        '_modified': modified,
+        'meta': meta or {},
+    }
+
+
+def make_command(batch_size=1000, incremental=False):
+    """Return an import command wired to a fresh batch writer."""
+    command = Command(stdout=io.StringIO())
+    command.setup_writer(batch_size, incremental)
+    return command
+
+
+class BulkUpsertWriterTests(TestCase):
+
+    def test_flushes_full_batches_in_one_statement_each(self):
+        command = make_command(batch_size=10)
+        command.writer.preload([Flight])
+        guids = [str(uuid.uuid4()) for _ in range(25)]
+        # Two full batches are written while queuing, each in its own transaction
+        with self.assertNumQueries(6):
+            for guid in guids:
+                command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-01', 'minTOTAL': 60}))
+        with self.assertNumQueries(3):
+            command.flush_all()
+        self.assertEqual(Flight.objects.count(), 25)
+
+    def test_reimport_updates_existing_rows(self):
+        guid = str(uuid.uuid4())
+        pilot_code = str(uuid.uuid4())
+        for name in ('First Name', 'Second Name'):
+            command = make_command()
+            command.import_record(make_record('Pilot', guid, {'PilotCode': pilot_code, 'PilotName': name}))
+            command.flush_all()
+        self.assertEqual(list(Pilot.objects.values_list('pilot_name', flat=True)), ['Second Name'])
+
+    def test_keeps_last_version_of_a_guid_within_a_batch(self):
+        command = make_command()
+        guid = str(uuid.uuid4())
+        command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-01', 'minTOTAL': 60}))
+        command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-02', 'minTOTAL': 75}))
+        command.flush_all()
+        flight = Flight.objects.get()
+        self.assertEqual(str(flight.date), '2024-03-02')
+        self.assertEqual(flight.total_time, 75)
+
+    def test_counts_later_versions_as_superseded_across_batches(self):
+        guids = [str(uuid.uuid4()) for _ in range(6)]
+        counts = []
+        for batch_size in (2, 100):
+            Flight.objects.all().delete()
+            command = make_command(batch_size=batch_size)
+            for guid in guids + guids[:3] + guids[:1]:
+                command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-01', 'minTOTAL': 60}))
+            command.flush_all()
+            stats = command.stats
+            counts.append((stats.created['flight'], stats.updated['flight'], stats.superseded['flight']))
+        self.assertEqual(counts, [(6, 0, 4), (6, 0, 4)])
+
+    def test_counts_created_and_updated_from_preloaded_index(self):
+        existing = [str(uuid.uuid4()) for _ in range(3)]
+        command = make_command()
+        for guid in existing:
+            command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-01', 'minTOTAL': 60}))
+        command.flush_all()
+
+        command = make_command()
+        with self.assertNumQueries(1):
+            command.writer.preload([Flight])
+        for guid in existing + [str(uuid.uuid4()) for _ in range(2)]:
+            command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-02', 'minTOTAL': 90}))
+        command.flush_all()
+        self.assertEqual(command.writer.created[Flight], 2)
+        self.assertEqual(command.writer.updated[Flight], 3)
+
+    def test_looks_up_only_the_guids_of_each_batch(self):
+        stored = [str(uuid.uuid4()) for _ in range(20)]
+        command = make_command()
+        for guid in stored:
+            command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-01', 'minTOTAL': 60}))
+        command.flush_all()
+
+        command = make_command(batch_size=3)
+        for guid in stored[:2] + [str(uuid.uuid4())]:
+            command.import_record(make_record('Flight', guid, {'DateUTC': '2024-03-02', 'minTOTAL': 90}))
+        self.assertEqual(len(command.writer.indexes[Flight]), 3)
+        self.assertEqual((command.writer.created[Flight], command.writer.updated[Flight]), (1, 2))
+
+    def test_only_a_single_file_run_preloads_every_table(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        paths = []
+        for name in ('a.json', 'b.json'):
+            paths.append(os.path.join(directory.name, name))
+            with open(paths[-1], 'w', encoding='utf-8') as source:
+                json.dump([make_record('Flight', str(uuid.uuid4()))], source)
+        for files, preloads in ((paths[:1], 1), (paths, 0)):
+            preload = mock.patch.object(BulkUpsertWriter, 'preload', autospec=True, side_effect=BulkUpsertWriter.preload)
+            with self.subTest(files=len(files)), preload as preload:
+                call_command('import_data', *files, verbosity=0, force=True)
+                self.assertEqual(preload.call_count, preloads)
+                if preloads:
+                    self.assertEqual(set(preload.call_args.args[1]), set(Command.Table_Models.values()))
+
+
+class FlightAircraftLinkTests(TestCase):
+
+    def test_links_flights_by_aircraft_code_in_bulk(self):
+        command = make_command()
+        aircraft_guids = [str(uuid.uuid4()) for _ in range(3)]
+        for guid in aircraft_guids:
+            command.import_record(make_record('Aircraft', guid, {'Reference': guid[:6]}))
+        for index in range(12):
+            code = aircraft_guids[index % 3] if index < 9 else str(uuid.uuid4())
+            command.import_record(make_record('Flight', str(uuid.uuid4()), {'DateUTC': '2024-03-01', 'AircraftCode': code}))
+        command.flush_all()
+
+        # Aircraft scan, flight scan and one bulk UPDATE, whatever the fleet size
+        with self.assertNumQueries(3):
+            self.assertEqual(link_flight_aircraft(), 9)
+        for aircraft in Aircraft.objects.all():
+            self.assertEqual(aircraft.flights.count(), 3)
+        self.assertEqual(Flight.objects.filter(aircraft__isnull=True).count(), 3)
+        # A second pass finds nothing left to change
+        self.assertEqual(link_flight_aircraft(), 0)
+
+
+class PartitionTests(SimpleTestCase):
+
+    def test_tables_stay_on_one_worker_and_flights_spread_by_guid(self):
+        pilots = {partition_index(make_record('Pilot', str(uuid.uuid4())), 4) for _ in range(50)}
+        flights = {partition_index(make_record('Flight', str(uuid.uuid4())), 4) for _ in range(200)}
+        self.assertEqual(len(pilots), 1)
+        self.assertEqual(flights, {0, 1, 2, 3})
+
+    def test_same_guid_always_maps_to_same_worker(self):
+        guid = str(uuid.uuid4())
+        first = make_record('Flight', guid, modified=1)
+        second = make_record('FLIGHT', guid, modified=2)
+        self.assertEqual(partition_index(first, 8), partition_index(second, 8))
+
+
+class ImportRecordStatsTests(TestCase):
+
+    def test_counts_skipped_and_failed_records_per_table(self):
+        command = make_command()
+        command.import_record(make_record('Flight', str(uuid.uuid4()), {'DateUTC': '2024-03-01'}))
+        command.import_record(make_record('Flight', 'not-a-guid'))
+        command.import_record(make_record('Qualification', str(uuid.uuid4()), {'QCode': 'broken'}))
+        command.import_record(make_record('Unknown', str(uuid.uuid4())))
+        command.flush_all()
+
+        stats = command.stats
+        self.assertEqual(stats.records['flight'], 2)
+        self.assertEqual(stats.created['flight'], 1)
+        self.assertEqual(stats.skipped['flight'], 1)
+        self.assertEqual(stats.failed['qualification'], 1)
+        self.assertEqual(stats.skipped['unknown'], 1)
+        # Per-record lines are reserved for --verbosity 3
+        self.assertEqual(command.stdout.getvalue(), '')
+
+
+class LogbookRollupTests(TestCase):
+
+    def import_flights(self, flights):
+        command = make_command()
+        command.writer.preload([Flight])
+        for guid, day, minutes in flights:
+            command.import_record(make_record('Flight', guid, {'DateUTC': day, 'minTOTAL': minutes, 'minPIC': minutes}))
+        command.flush_all()
+        refresh_rollups(command.rollups.buckets)
+        return command.rollups.buckets
+
+    def test_import_refreshes_only_the_touched_months(self):
+        moved = str(uuid.uuid4())
+        self.import_flights([
+            (moved, '2024-03-02', 60), (str(uuid.uuid4()), '2024-03-20', 30), (str(uuid.uuid4()), '2024-04-01', 90),
+        ])
+        april = LogbookRollup.objects.get(month=date(2024, 4, 1))
+        self.assertEqual(rollup_totals(1)['flights'], 3)
+
+        # Moving a flight to May dirties both the month it left and the one it joined
+        buckets = self.import_flights([(moved, '2024-05-10', 60)])
+        self.assertEqual(buckets, {(1, date(2024, 3, 1)), (1, date(2024, 5, 1))})
+        by_month = {row['month']: row for row in rollup_totals(1, group_by=('month',))}
+        self.assertEqual({month: row['flights'] for month, row in by_month.items()},
+                         {date(2024, 3, 1): 1, date(2024, 4, 1): 1, date(2024, 5, 1): 1})
+        self.assertEqual(by_month[date(2024, 5, 1)]['pic'], Flight.objects.get(guid=moved).pic)
+        self.assertEqual(LogbookRollup.objects.get(month=date(2024, 4, 1)).pk, april.pk)
+
+        lifetime = rollup_totals(1)
+        self.assertEqual(lifetime['total_time'], Flight.objects.aggregate(total=Sum('total_time'))['total'])
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        self.import_flights([(str(uuid.uuid4()), f'2023-{month:02d}-15', 45) for month in range(1, 13)])
+        refreshed = sorted(LogbookRollup.objects.values_list('month', 'flights', 'total_time'))
+        call_command('rebuild_rollups', stdout=io.StringIO())
+        self.assertEqual(sorted(LogbookRollup.objects.values_list('month', 'flights', 'total_time')), refreshed)
+
+
+class IncrementalImportTests(TestCase):
+
+    def test_skips_records_not_newer_than_the_watermark_without_writing(self):
+        ImportState.objects.create(user_id=1, table='flight', last_modified=1700000000)
+        command = make_command(incremental=True)
+        with self.assertNumQueries(0):
+            command.import_record(make_record('Flight', str(uuid.uuid4()), modified=1700000000))
+            command.import_record(make_record('Flight', str(uuid.uuid4()), modified=1600000000))
+            command.flush_all()
+        command.import_record(make_record('Flight', str(uuid.uuid4()), modified=1700000001))
+        command.import_record(make_record('Flight', str(uuid.uuid4()), user_id=2, modified=1600000000))
+        command.flush_all()
+
+        self.assertEqual(command.stats.unchanged['flight'], 2)
+        self.assertEqual(Flight.objects.count(), 2)
+        self.assertEqual(command.marks, {(1, 'flight'): 1700000001, (2, 'flight'): 1600000000})
+
+    def test_saved_watermarks_never_move_backwards(self):
+        save_watermarks({(1, 'flight'): 1700000000})
+        save_watermarks({(1, 'flight'): 1600000000, (1, 'pilot'): 1500000000})
+        self.assertEqual(load_watermarks(), {(1, 'flight'): 1700000000, (1, 'pilot'): 1500000000})
+
+
+class CheckpointResumeTests(TestCase):
+
+    def setUp(self):
+        self.guids = [str(uuid.uuid4()) for _ in range(5)]
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as source:
+            json.dump([make_record('Flight', guid) for guid in self.guids], source)
+        self.addCleanup(os.remove, self.path)
+
+    def run_import(self, checkpoints, fail_at=None, pipeline=False):
+        command = make_command(batch_size=10)
+        command.verbosity = 0
+        import_record = command.import_record
+
+        def failing_import_record(record):
+            if record['guid'] == fail_at:
+                raise RuntimeError('killed')
+            import_record(record)
+
+        command.import_record = failing_import_record
+        with open(self.path, encoding='utf-8') as source:
+            reader = JsonArrayReader(source, start=checkpoints.offset)
+            command.import_serial(reader, 10, checkpoints=checkpoints, pipeline=pipeline)
+        return command
+
+    def test_resumes_after_the_last_committed_checkpoint(self):
+        for pipeline in (False, True):
+            with self.subTest(pipeline=pipeline):
+                ImportCheckpoint.objects.all().delete()
+                Flight.objects.all().delete()
+                with self.assertRaises(RuntimeError):
+                    self.run_import(Checkpointer(self.path, every=2), fail_at=self.guids[3], pipeline=pipeline)
+                checkpoint = ImportCheckpoint.objects.get()
+                self.assertEqual((checkpoint.records, checkpoint.counters['created']), (2, {'flight': 2}))
+                self.assertEqual(Flight.objects.count(), 2)
+
+                checkpoints = Checkpointer(self.path, every=2)
+                self.assertTrue(checkpoints.load())
+                command = self.run_import(checkpoints, pipeline=pipeline)
+                self.assertEqual(command.stats.records['flight'], 3)
+                self.assertEqual(set(map(str, Flight.objects.values_list('guid', flat=True))), set(self.guids))
+
+    def test_checkpoints_are_opt_in(self):
+        for options, saves in (({}, 0), ({'checkpoint_every': 2}, 2)):
+            save = mock.patch.object(Checkpointer, 'save', autospec=True, side_effect=Checkpointer.save)
+            with self.subTest(**options), save as save:
+                call_command('import_data', file=self.path, verbosity=0, **options)
+                self.assertEqual(save.call_count, saves)
+
+
+class PipelinedImportTests(TestCase):
+
+    def test_matches_the_serial_import(self):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as source:
+            write_export(source, 3000, seed=4, users=3)
+        self.addCleanup(os.remove, path)
+
+        results = []
+        for pipeline in (False, True):
+            for model in (*Command.Table_Models.values(), LogbookRollup):
+                model.objects.all().delete()
+            out = io.StringIO()
+            call_command('import_data', file=path, batch_size=50, pipeline=pipeline, verbosity=2, stdout=out)
+            results.append((
+                list(Flight.objects.order_by('guid').values_list('guid', 'date', 'total_time', 'aircraft__guid')),
+                list(LogbookRollup.objects.order_by('user_id', 'month', 'aircraft').values_list('flights', 'total_time')),
+                # Created/updated counts of the summary table, without the rate
+                [line.rsplit(None, 1)[0] for line in out.getvalue().splitlines() if line.startswith('total ')],
+            ))
+        self.assertEqual(results[0], results[1])
+
+    def test_a_failed_write_stops_the_import(self):
+        writer = PipelinedWriter(batch_size=2)
+        writer.write = lambda model, buffer, superseded: 1 / 0
+        writer.start()
+        try:
+            writer.add(Flight, uuid.uuid4(), {'user_id': 1, 'platform': 0, '_modified': 0})
+            writer.add(Flight, uuid.uuid4(), {'user_id': 1, 'platform': 0, '_modified': 0})
+            with self.assertRaises(ZeroDivisionError):
+                writer.flush_all()
+        finally:
+            writer.stop()
+
+
+def killed_or_import_worker(position, *args):
+    """Import worker whose first instance is killed before it reports, as the OOM killer would."""
+    if position == 0:
+        os.kill(os.getpid(), signal.SIGKILL)
+    run_import_worker(position, *args)
+
+
+class ParallelImportTests(TransactionTestCase):
+
+    def test_a_killed_worker_is_reported_instead_of_waited_for(self):
+        records = [make_record('Flight', str(uuid.uuid4())) for _ in range(200)]
+        worker = mock.patch('pilotlog.parallel.run_import_worker', killed_or_import_worker)
+        with worker, mock.patch('pilotlog.parallel.POLL_INTERVAL', 0.1):
+            snapshots, _, _, errors = run_parallel_import(iter(records), 2, batch_size=5, verbosity=0)
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(errors, [f"Import worker 0 exited with code {-signal.SIGKILL} without reporting\n"])
+        self.assertEqual(Flight.objects.count(), snapshots[0]['created']['flight'])
+
+    def test_workers_match_the_serial_import(self):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as source:
+            write_export(source, 3000, seed=5, users=3)
+        self.addCleanup(os.remove, path)
+
+        results = []
+        for workers in (1, 2):
+            for model in (*Command.Table_Models.values(), LogbookRollup):
+                model.objects.all().delete()
+            out = io.StringIO()
+            call_command('import_data', file=path, batch_size=50, workers=workers, verbosity=1, stdout=out)
+            lines = out.getvalue().splitlines()
+            table = lines[lines.index(next(line for line in lines if line.startswith('---'))) + 1:-1]
+            results.append((
+                list(Flight.objects.order_by('guid').values_list('guid', 'date', 'total_time', 'aircraft__guid')),
+                [model.objects.count() for model in Command.Table_Models.values()],
+                list(LogbookRollup.objects.order_by('user_id', 'month', 'aircraft').values_list('flights', 'total_time')),
+                # Per-table counts of the summary table, without the rate
+                sorted(line.rsplit(None, 1)[0] for line in table),
+            ))
+        self.assertEqual(len(results[0][3]), len(Command.Table_Models) + 1)
+        self.assertEqual(results[0], results[1])
+
+
+class FieldMappingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.warnings = []
+        self.convert = {spec.table: compile_spec(spec, self.warnings.append) for spec in TABLE_SPECS}
+
+    def test_converts_flight_columns(self):
+        guid = str(uuid.uuid4())
+        converted_guid, row = self.convert['flight'](make_record('Flight', guid, {
+            'DateUTC': '2024-03-01', 'DepTimeUTC': 545, 'ArrTimeUTC': '07:30', 'minTOTAL': 95,
+            'minPIC': '12.5', 'minNIGHT': 0.1, 'ToDay': '2', 'PF': 'false', 'UserBool': 1, 'Route': None,
+        }))
+        self.assertEqual(converted_guid, uuid.UUID(guid))
+        self.assertEqual(row['date'], date(2024, 3, 1))
+        self.assertEqual(row['time_off'], time(9, 5))
+        self.assertEqual(row['time_in'], time(7, 30))
+        self.assertEqual((row['total_time'], row['pic'], row['night'], row['sic']),
+                         (Decimal(95), Decimal('12.5'), Decimal('0.1'), Decimal(0)))
+        self.assertEqual(row['day_takeoffs'], 2)
+        self.assertIsNone(row['night_takeoffs'])
+        self.assertEqual((row['nvg_proficiency'], row['ipc']), (False, True))
+        self.assertEqual(row['route'], '')
+        self.assertEqual(self.warnings, [])
+
+    def test_invalid_values_fall_back_to_defaults_with_a_warning(self):
+        _, row = self.convert['flight'](make_record('Flight', str(uuid.uuid4()), {
+            'DateUTC': '2024-02-30', 'minTOTAL': 'n/a', 'ToDay': 'x', 'DepTimeUTC': -5,
+        }))
+        self.assertIsNone(row['date'])
+        self.assertEqual(row['total_time'], Decimal(0))
+        self.assertIsNone(row['day_takeoffs'])
+        self.assertIsNone(row['time_off'])
+        self.assertEqual(len(self.warnings), 4)
+
+    def test_guid_handling(self):
+        self.assertIsNone(self.convert['pilot'](make_record('Pilot', '12345')))
+        guid, row = self.convert['settingconfig'](make_record('SettingConfig', '42', {'ConfigCode': 42}))
+        self.assertEqual(guid, uuid.UUID(int=42))
+        with self.assertRaises(RecordError):
+            self.convert['pilot'](make_record('Pilot', str(uuid.uuid4()), {'PilotCode': ''}))
+
+
+class ColumnarConversionTests(TestCase):
+
+    def setUp(self):
+        self.spec = next(spec for spec in TABLE_SPECS if spec.table == 'flight')
+        self.fields = numeric_fields(self.spec)
+
+    def test_matches_per_row_conversion_for_valid_cells(self):
+        convert = compile_spec(self.spec)
+        metas = [
+            {'minTOTAL': 95, 'minPIC': '12.5', 'minNIGHT': 0.1, 'ToDay': '2', 'LdgDay': 1, 'HobbsIn': ''},
+            {'minTOTAL': 0, 'ToNight': None, 'Holding': 3},
+        ]
+        columns, bad = convert_columns(metas, self.fields, self.spec.model)
+        self.assertEqual(bad, {})
+        for position, meta in enumerate(metas):
+            _, row = convert(make_record('Flight', str(uuid.uuid4()), meta))
+            for field in self.fields:
+                value = columns[field.target][position]
+                if isinstance(value, float):
+                    value = Decimal(str(value))
+                self.assertEqual(value, row[field.target], field.target)
+
+    def test_replaces_and_reports_invalid_cells_in_bulk(self):
+        metas = [{'minTOTAL': 'n/a', 'ToDay': 2.5}, {'minTOTAL': 1000, 'ToDay': [1]}, {'minTOTAL': 'NaN', 'ToDay': 4}]
+        columns, bad = convert_columns(metas, self.fields, self.spec.model)
+        # total_time is DecimalField(max_digits=5, decimal_places=2), so 1000 does not fit
+        self.assertEqual(columns['total_time'], [0.0, 0.0, 0.0])
+        self.assertEqual(bad['total_time'], ['n/a', 1000, 'NaN'])
+        self.assertEqual(columns['day_takeoffs'], [None, None, 4])
+        self.assertEqual(bad['day_takeoffs'], [2.5, [1]])
+
+    def test_columnar_flights_are_stored_as_decimals(self):
+        command = make_command()
+        command.import_record(make_record('Flight', str(uuid.uuid4()), {'minTOTAL': 95, 'minPIC': '12.5', 'ToDay': 1}))
+        command.flush_all()
+        flight = Flight.objects.get()
+        self.assertEqual((flight.total_time, flight.pic, flight.day_takeoffs), (Decimal('95'), Decimal('12.5'), 1))
+
+
+class RecordListApiTests(TestCase):
+
+    def setUp(self):
+        days = [date(2024, 1, 1 + day % 5) for day in range(12)] + [None, None]
+        for position, day in enumerate(days):
+            Flight.objects.create(
+                user_id=1, guid=uuid.uuid4(), platform=9, _modified=position, date=day,
+                from_airport='EDDF', to_airport='EDDM', total_time=Decimal(position), distance=Decimal(0),
+            )
+        Flight.objects.create(
+            user_id=2, guid=uuid.uuid4(), platform=9, _modified=0, date=date(2024, 1, 1),
+            from_airport='LFPG', to_airport='EGLL', total_time=Decimal(1), distance=Decimal(0),
+        )
+        self.client.force_login(User.objects.create(username='staff', is_staff=True))
+
+    def test_pages_follow_date_and_id_without_gaps_or_repeats(self):
+        seen, url = [], '/api/users/1/flights/?limit=5&fields=id,date'
+        while url:
+            body = self.client.get(url).json()
+            self.assertTrue(all(set(row) == {'id', 'date'} for row in body['results']))
+            seen.extend(row['id'] for row in body['results'])
+            url = f"/api/users/1/flights/?limit=5&fields=id,date&after={body['next']}" if body['next'] else None
+        expected = list(Flight.objects.filter(user_id=1).order_by('date', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_selected_fields_and_errors(self):
+        body = self.client.get('/api/users/2/flights/?fields=from_airport,total_time').json()
+        self.assertEqual(body, {'results': [{'from_airport': 'LFPG', 'total_time': '1.00'}], 'next': None})
+        self.assertEqual(self.client.get('/api/users/1/flights/?fields=password').status_code, 400)
+        self.assertEqual(self.client.get('/api/users/1/flights/?after=bogus').status_code, 400)
+        self.assertEqual(self.client.get('/api/users/1/flights/?limit=0').status_code, 400)
+        self.assertEqual(self.client.post('/api/users/1/flights/').status_code, 405)
+
+    def test_only_staff_and_the_owner_may_read_a_logbook(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/users/1/flights/').status_code, 401)
+        owner = User.objects.create(id=2, username='pilot')
+        self.client.force_login(owner)
+        self.assertEqual(self.client.get('/api/users/1/flights/').status_code, 403)
+        self.assertEqual(self.client.get('/api/users/1/queries/x/results/').status_code, 403)
+        self.assertEqual(len(self.client.get('/api/users/2/flights/').json()['results']), 1)
+
+    def test_later_pages_seek_the_date_index(self):
+        after = decode_cursor(encode_cursor([date(2024, 1, 3), 5]), ('date', 'id'))
+        query = Flight.objects.filter(user_id=1).filter(seek(('date', 'id'), after)).order_by('date', 'id')
+        self.assertIn('flight_user_date', query.explain())
+
+
+def make_airfield(code, icao, iata, latitude, longitude, name='', user_id=1):
+    """Store an airfield at ``latitude``/``longitude`` degrees (kept as minutes of arc)."""
+    return Airfield.objects.create(
+        user_id=user_id, guid=uuid.uuid4(), platform=9, _modified=0, af_code=code, af_icao=icao, af_iata=iata,
+        af_name=name, af_cat=0, tz_code=0, latitude=round(latitude * 60), longitude=round(longitude * 60),
+        af_country=0, region_user=0, elevation_ft=0, record_modified=0,
+    )
+
+
+class AirfieldIndexTests(TestCase):
+
+    def setUp(self):
+        invalidate_airfield_index()
+        self.addCleanup(invalidate_airfield_index)
+        make_airfield('A1', 'EDDF', 'FRA', 50.0333, 8.5706, 'Frankfurt')
+        make_airfield('A2', 'EDDM', 'MUC', 48.3538, 11.7861, 'Munich')
+        make_airfield('A3', 'EGLL', 'LHR', 51.4700, -0.4543, 'Heathrow')
+        make_airfield('A4', 'KJFK', 'JFK', 40.6413, -73.7781, 'Kennedy')
+
+    def test_kd_tree_matches_a_linear_scan(self):
+        rand = random.Random(5)
+        points = [unit_vector(rand.uniform(-90, 90), rand.uniform(-180, 180)) for _ in range(2000)]
+        tree = KDTree(points)
+        for _ in range(50):
+            target = unit_vector(rand.uniform(-90, 90), rand.uniform(-180, 180))
+            expected = sorted(range(len(points)), key=lambda index: math.dist(points[index], target))[:3]
+            self.assertEqual([index for _, index in tree.nearest(target, k=3)], expected)
+
+    def test_resolves_codes_and_finds_nearest(self):
+        index = airfield_index(1)
+        self.assertEqual(index.resolve('eddm').name, 'Munich')
+        self.assertEqual(index.resolve('LHR').code, 'A3')
+        self.assertEqual(index.resolve('A4').icao, 'KJFK')
+        self.assertIsNone(index.resolve('ZZZZ'))
+        (distance, nearest), = index.nearest(49.9, 8.6, max_km=100)
+        self.assertEqual(nearest.icao, 'EDDF')
+        self.assertAlmostEqual(distance, 15, delta=1)
+        self.assertEqual([entry.icao for _, entry in index.nearest(50, 5, k=3)], ['EDDF', 'EGLL', 'EDDM'])
+
+    def test_indexes_hold_only_the_airfields_of_their_user(self):
+        make_airfield('B1', 'EDDF', 'FRA', 10.0, 10.0, 'Elsewhere', user_id=2)
+        make_airfield('B2', 'LFPG', 'CDG', 49.0097, 2.5479, 'Paris', user_id=2)
+        self.assertEqual(airfield_index(1).resolve('EDDF').name, 'Frankfurt')
+        self.assertEqual(airfield_index(2).resolve('EDDF').name, 'Elsewhere')
+        self.assertIsNone(airfield_index(1).resolve('CDG'))
+        self.assertEqual(len(airfield_index(2)), 2)
+
+    def test_api_uses_the_index(self):
+        self.assertEqual(self.client.get('/api/users/1/airfields/fra/').status_code, 401)
+        self.assertEqual(self.client.get('/api/users/1/airfields/nearest/?lat=40.7&lon=-74').status_code, 401)
+        self.client.force_login(User.objects.create(id=1, username='pilot'))
+        self.assertEqual(self.client.get('/api/users/2/airfields/fra/').status_code, 403)
+        self.assertEqual(self.client.get('/api/users/1/airfields/fra/').json()['icao'], 'EDDF')
+        self.assertEqual(self.client.get('/api/users/1/airfields/nope/').status_code, 404)
+        body = self.client.get('/api/users/1/airfields/nearest/?lat=40.7&lon=-74&limit=1').json()
+        self.assertEqual(body['results'][0]['iata'], 'JFK')
+        self.assertEqual(self.client.get('/api/users/1/airfields/nearest/?lat=95&lon=0').status_code, 400)
+
+        for codes in (('A1', 'EDDM'), ('EGLL', 'XXXX')):
+            Flight.objects.create(
+                user_id=1, guid=uuid.uuid4(), platform=9, _modified=0, date=date(2024, 1, 1), from_airport=codes[0],
+                to_airport=codes[1], total_time=Decimal(1), distance=Decimal(0),
+            )
+        airfield_index(1)
+        # The session, the user and one query for the page; airports come from the warm index
+        with self.assertNumQueries(3):
+            rows = self.client.get('/api/users/1/flights/?fields=id&expand=airfields').json()['results']
+        self.assertEqual(set(rows[0]), {'id', 'from_airfield', 'to_airfield'})
+        self.assertEqual([(row['from_airfield']['icao'], row['to_airfield'] and row['to_airfield']['icao']) for row in rows],
+                         [('EDDF', 'EDDM'), ('EGLL', None)])
+
+
+class FlightDistanceTests(TestCase):
+
+    def setUp(self):
+        invalidate_airfield_index()
+        self.addCleanup(invalidate_airfield_index)
+
+    def test_vectorised_and_per_flight_distances_agree(self):
+        make_airfield('A1', 'EDDF', 'FRA', 50.0333, 8.5706)
+        make_airfield('A2', 'EGLL', 'LHR', 51.4700, -0.4543)
+        make_airfield('A3', 'KJFK', 'JFK', 40.6413, -73.7781)
+        calculator = DistanceCalculator(airfield_index(1))
+        origins, destinations = ['EDDF', 'A2', 'EDDF', None], ['LHR', 'KJFK', 'ZZZZ', 'EGLL']
+        distances = calculator.compute(origins, destinations)
+        self.assertAlmostEqual(distances[0], 354, delta=2)
+        self.assertAlmostEqual(distances[1], 2990, delta=10)
+        self.assertEqual(distances[2:], [None, None])
+        self.assertEqual(calculator._compute_rows(origins, destinations), distances)
+
+    def test_import_post_stage_and_backfill(self):
+        records = [
+            make_record('Airfield', str(uuid.uuid4()), {'AFCode': code, 'AFICAO': icao, 'Latitude': lat, 'Longitude': lon})
+            for code, icao, lat, lon in (('A1', 'EDDF', 3002, 514), ('A2', 'EDDM', 2901, 707))
+        ] + [
+            make_record('Flight', str(uuid.uuid4()), {'DateUTC': '2024-05-01', 'ArrCode': 'A1', 'DepCode': 'A2'}),
+            make_record('Flight', str(uuid.uuid4()), {'DateUTC': '2024-05-02', 'ArrCode': 'A1', 'DepCode': 'NOPE'}),
+        ]
+        handle, path = tempfile.mkstemp(suffix='.json')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as out:
+            json.dump(records, out)
+        call_command('import_data', file=path, verbosity=0)
+
+        resolved, unresolved = Flight.objects.order_by('date').values_list('distance', flat=True)
+        self.assertAlmostEqual(float(resolved), 162, delta=2)
+        self.assertEqual(unresolved, 0)
+
+        Flight.objects.update(distance=0)
+        call_command('compute_distances', stdout=io.StringIO())
+        self.assertEqual(Flight.objects.order_by('date').first().distance, resolved)
+
+    def test_unresolved_routes_reset_a_stale_distance(self):
+        make_airfield('A1', 'EDDF', 'FRA', 50.0333, 8.5706)
+        make_airfield('A2', 'EGLL', 'LHR', 51.4700, -0.4543)
+        command = make_command()
+        command.import_record(make_record('Flight', str(uuid.uuid4()), {'DateUTC': '2024-05-01', 'DepCode': 'A1', 'ArrCode': 'A2'}))
+        command.flush_all()
+        flight = Flight.objects.get()
+        call_command('compute_distances', stdout=io.StringIO())
+        flight.refresh_from_db()
+        self.assertAlmostEqual(float(flight.distance), 354, delta=2)
+
+        Airfield.objects.filter(af_code='A2').delete()
+        invalidate_airfield_index()
+        call_command('compute_distances', stdout=io.StringIO())
+        flight.refresh_from_db()
+        self.assertEqual(flight.distance, 0)
+
+
+    def test_unresolved_routes_keep_the_distance_of_their_source(self):
+        rows = [
+            'ForeFlight Logbook Import,,,', 'Flights Table,,,', 'Date,Text,Text,Decimal', 'Date,From,To,Distance',
+            '2024-05-01,NOPE,ZZZZ,123.4',
+        ]
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as out:
+            out.write('\n'.join(rows))
+        call_command('import_data', file=path, user=3, verbosity=0)
+        call_command('compute_distances', stdout=io.StringIO())
+        self.assertEqual(Flight.objects.get().distance, Decimal('123.4'))
+
+
+class LimitRulesTests(TestCase):
+
+    def make_rule(self, minutes, period_code, user_id=1, l_from=None, l_to=None):
+        return LimitRules.objects.create(
+            user_id=user_id, guid=uuid.uuid4(), platform=9, _modified=0, limit_code=uuid.uuid4(), l_from=l_from,
+            l_to=l_to, l_type=0, l_zone=0, l_minutes=minutes, l_period_code=period_code, record_modified=0,
+        )
+
+    def test_sliding_windows_match_a_sum_per_window(self):
+        rng = random.Random(5)
+        flown = {}
+        for _ in range(400):
+            day = date.fromordinal(date(2024, 1, 1).toordinal() + rng.randrange(366))
+            minutes = rng.randrange(30, 600)
+            flown[day] = flown.get(day, 0) + minutes
+            Flight.objects.create(
+                user_id=1, guid=uuid.uuid4(), platform=9, _modified=0, date=day, total_time=Decimal(minutes),
+            )
+        self.make_rule(6000, 3)
+        self.make_rule(900, 1)
+        self.make_rule(1, 6, l_from=date(2030, 1, 1))  # not yet in force
+        as_of = date(2024, 12, 31)
+
+        with self.assertNumQueries(2):
+            results = evaluate_limits(as_of=as_of)
+        self.assertEqual([result.window_days for result in results], [28, 1])
+        for result in results:
+            def window(end):
+                return sum(minutes for day, minutes in flown.items() if 0 <= (end - day).days < result.window_days)
+            expected = sorted((day, window(day)) for day in flown if window(day) > result.limit)
+            self.assertEqual(result.breaches, expected)
+            self.assertEqual(result.peak, max(window(day) for day in flown))
+            self.assertEqual(result.used, window(as_of))
+            self.assertEqual(result.headroom, result.limit - window(as_of))
+
+    def test_rule_validity_period_bounds_the_windows(self):
+        for day, minutes in ((date(2024, 3, 1), 500), (date(2024, 3, 10), 500), (date(2024, 3, 20), 500)):
+            Flight.objects.create(user_id=2, guid=uuid.uuid4(), platform=9, _modified=0, date=day, total_time=minutes)
+        self.make_rule(800, 3, user_id=2, l_from=date(2024, 3, 5))
+        self.make_rule(800, 3, user_id=3)
+
+        results = evaluate_limits(user_ids=[2, 3], as_of=date(2024, 3, 25))
+        self.assertEqual(
+            [(result.user_id, result.used, result.breaches) for result in results],
+            [(2, 1000, [(date(2024, 3, 20), 1000)]), (3, 0, [])],
+        )
+        out = io.StringIO()
+        call_command('check_limits', user=[2, 3], as_of='2024-03-25', stdout=out)
+        self.assertIn('2 rules evaluated, 1 breached', out.getvalue())
+
+
+class QualificationCurrencyTests(TestCase):
+
+    def make_qualification(self, user_id, **values):
+        return Qualification.objects.create(
+            user_id=user_id, guid=uuid.uuid4(), platform=9, _modified=0, q_code=uuid.uuid4(), record_modified=0,
+            **values,
+        )
+
+    def test_statuses_from_expiry_notice_and_recency(self):
+        as_of = date(2024, 6, 30)
+        for day in (date(2024, 6, 1), date(2024, 5, 1), date(2024, 1, 1)):
+            Flight.objects.create(user_id=1, guid=uuid.uuid4(), platform=9, _modified=0, date=day, total_time=60)
+        expired = self.make_qualification(1, date_valid=date(2024, 6, 29))
+        expiring = self.make_qualification(1, date_issued=date(2023, 7, 15), validity=12, notify_days=30)
+        lapsed = self.make_qualification(1, minimum_qty=3, minimum_period=90)
+        current = self.make_qualification(1, minimum_qty=3, minimum_period=365, date_valid=date(2025, 1, 1))
+        other = self.make_qualification(2, minimum_qty=1, minimum_period=90)
+
+        # Periods, flight counts, qualifications and one upsert, inside a savepoint
+        with self.assertNumQueries(4 + 2):
+            written = scan_qualifications(as_of=as_of)
+        self.assertEqual(sum(written.values()), 5)
+        statuses = {status.qualification_id: status for status in QualificationStatus.objects.all()}
+        self.assertEqual(statuses[expired.pk].status, QualificationStatus.EXPIRED)
+        self.assertEqual(
+            (statuses[expiring.pk].status, statuses[expiring.pk].expires, statuses[expiring.pk].notify_on),
+            (QualificationStatus.EXPIRING, date(2024, 7, 15), date(2024, 6, 15)),
+        )
+        self.assertEqual((statuses[lapsed.pk].status, statuses[lapsed.pk].recent_flights), (QualificationStatus.LAPSED, 2))
+        self.assertEqual((statuses[current.pk].status, statuses[current.pk].recent_flights), (QualificationStatus.CURRENT, 3))
+        self.assertEqual(statuses[other.pk].status, QualificationStatus.LAPSED)
+        self.assertEqual([status.user_id for status in due_notifications()], [1, 1, 1, 2])
+
+        # Rescanning one pilot replaces only that pilot's rows
+        Flight.objects.create(
+            user_id=2, guid=uuid.uuid4(), platform=9, _modified=0, date=date(2024, 6, 20), total_time=60,
+        )
+        call_command('scan_qualifications', user=[2], as_of='2024-06-30', verbosity=0)
+        self.assertEqual(QualificationStatus.objects.count(), 5)
+        self.assertEqual(QualificationStatus.objects.get(qualification=other).status, QualificationStatus.CURRENT)
+
+    def test_add_months_clamps_to_month_end(self):
+        self.assertEqual(add_months(date(2024, 1, 31), 1), date(2024, 2, 29))
+        self.assertEqual(add_months(date(2023, 11, 15), 14), date(2025, 1, 15))
+
+
+class StoredQueryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(User.objects.create(id=1, username='pilot'))
+        self.code = str(uuid.uuid4())
+        Query.objects.create(
+            user_id=1, guid=uuid.uuid4(), platform=9, _modified=0, name='Long EDDF legs', mQCode=self.code,
+            quick_view=True, record_modified=1,
+        )
+        for column, operator, connector, value in (('from_airport', 0, 0, 'EDDF'), ('total_time', 3, 0, '90'), ('to_airport', 0, 1, 'EGLL')):
+            MyQueryBuild.objects.create(
+                user_id=1, guid=uuid.uuid4(), platform=9, _modified=0, build1=column, build2=operator, build3=connector,
+                build4=value, mQCode=self.code, mQBCode=uuid.uuid4(), record_modified=1,
+            )
+        for origin, destination, minutes in (('EDDF', 'EDDM', 60), ('EDDF', 'LIRF', 120), ('EDDM', 'EGLL', 100)):
+            Flight.objects.create(
+                user_id=1, guid=uuid.uuid4(), platform=9, _modified=0, date=date(2024, 1, 1), from_airport=origin,
+                to_airport=destination, total_time=minutes,
+            )
+
+    def test_builds_compile_with_and_binding_tighter_than_or(self):
+        condition = compile_builds([('ArrCode', 0, 0, 'EDDF'), ('total_time', 3, 0, '90'), ('to_airport', 0, 1, 'EGLL')])
+        self.assertEqual(
+            sorted(Flight.objects.filter(condition).values_list('to_airport', flat=True)), ['EGLL', 'LIRF'],
+        )
+        with self.assertRaises(QueryError):
+            compile_builds([('no_such_column', 0, 0, 'x')])
+        with self.assertRaises(QueryError):
+            compile_builds([('date', 2, 0, 'yesterday')])
+
+    def test_results_are_cached_until_the_users_flights_change(self):
+        result = run_query(1, self.code)
+        self.assertEqual((result['totals']['flights'], result['totals']['total_time']), (2, Decimal('220')))
+        # Besides the session and the user, only the version row is read; the result comes from the cache
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(f'/api/users/1/queries/{self.code}/results/').json()['totals']['flights'], 2)
+        self.assertEqual(self.client.get('/api/users/1/queries/nope/results/').status_code, 404)
+
+        records = [make_record('Flight', str(uuid.uuid4()), {'DateUTC': '2024-02-01', 'ArrCode': 'EDDF', 'minTOTAL': 95})]
+        handle, path = tempfile.mkstemp(suffix='.json')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as out:
+            json.dump(records, out)
+        call_command('import_data', file=path, verbosity=0)
+        self.assertEqual(run_query(1, self.code)['totals']['flights'], 3)
+
+    def test_a_bump_from_another_process_reaches_every_cache(self):
+        self.assertEqual(run_query(1, self.code)['totals']['flights'], 2)
+        Flight.objects.filter(user_id=1).delete()
+        # As if the importer ran elsewhere: only the version row changes, not this process' cache
+        QueryCacheVersion.objects.create(user_id=1, flights=1)
+        self.assertEqual(run_query(1, self.code)['totals']['flights'], 0)
+
+
+class BulkExportApiTests(TestCase):
+
+    def setUp(self):
+        for position in range(1200):
+            Flight.objects.create(
+                user_id=1, guid=uuid.uuid4(), platform=9, _modified=position, date=date(2024, 1, 1 + position % 28),
+                from_airport='EDDF', to_airport='EDDM', total_time=Decimal(position % 10), distance=Decimal(0),
+            )
+        self.client.force_login(User.objects.create(id=1, username='pilot'))
+
+    def test_streams_csv_and_ndjson_in_list_order(self):
+        expected = list(Flight.objects.filter(user_id=1).order_by('date', 'id').values_list('id', flat=True))
+
+        response = self.client.get('/api/users/1/flights/export.csv?fields=id,date,total_time')
+        self.assertTrue(response.streaming)
+        chunks = iter(response.streaming_content)
+        # The header goes out before any row has been read
+        with self.assertNumQueries(0):
+            self.assertEqual(next(chunks), b'id,date,total_time\r\n')
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual([int(row[0]) for row in rows], expected)
+
+        response = self.client.get('/api/users/1/flights/export.ndjson?fields=id,from_airport')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], expected)
+        self.assertEqual(json.loads(lines[0]), {'id': expected[0], 'from_airport': 'EDDF'})
+
+    def test_gzip_on_the_fly(self):
+        plain = b''.join(self.client.get('/api/users/1/flights/export.csv').streaming_content)
+        response = self.client.get('/api/users/1/flights/export.csv?gzip=1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('flight-1.csv.gz', response['Content-Disposition'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertEqual(self.client.get('/api/users/1/pilots/export.csv?fields=nope').status_code, 400)
+
+    def test_exports_are_limited_to_the_owner(self):
+        self.assertEqual(self.client.get('/api/users/2/flights/export.csv').status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/users/1/pilots/export.ndjson').status_code, 401)
+
+
+class ExportLogbookTests(TestCase):
+
+    def test_streams_both_sections_in_the_foreflight_layout(self):
+        command = make_command()
+        aircraft_guid = str(uuid.uuid4())
+        command.import_record(make_record('Aircraft', aircraft_guid, {'Make': 'Cessna', 'Model': '172', 'Reference': 'N172'}))
+        command.import_record(make_record('Aircraft', str(uuid.uuid4()), {'Reference': 'D-EFGH'}, user_id=2))
+        command.import_record(make_record('Flight', str(uuid.uuid4()), {
+            'DateUTC': '2024-03-01', 'AircraftCode': aircraft_guid, 'DepCode': 'EDDF', 'DepTimeUTC': 545, 'minTOTAL': 95,
+        }))
+        command.flush_all()
+        link_flight_aircraft()
+
+        out = io.StringIO()
+        with self.assertNumQueries(2):
+            call_command('export_logbook', user=1, stdout=out)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+
+        self.assertEqual({len(row) for row in rows}, {63})
+        self.assertEqual([rows[0][0], rows[2][0], rows[4][0], rows[7][0]], ['ForeFlight Logbook Import', 'Aircraft Table', 'AircraftID', 'Flights Table'])
+        self.assertEqual(rows[5][:6], ['N172', 'aircraft', '', '', 'Cessna', '172'])
+        flight = dict(zip(rows[9], rows[10]))
+        self.assertEqual(
+            (flight['Date'], flight['AircraftID'], flight['To'], flight['TimeOff'], flight['TotalTime'], flight['IPC']),
+            ('2024-03-01', 'N172', 'EDDF', '0905', '1.58', 'FALSE'),
+        )
+        self.assertEqual(len(rows), 11)
+
+
+class ForeFlightImportTests(TestCase):
+
+    CSV = '\n'.join([
+        'ForeFlight Logbook Import,,,,',
+        'Aircraft Table,,,,',
+        'Text,Text,Text,Boolean,',
+        'AircraftID,Make,Model,Complex,',
+        'N172,Cessna,172,TRUE,',
+        ',,,,',
+        'Flights Table,,,#;type;runway;airport;comments,',
+        'Decimal,hhmm,Date,Packed Detail,Text',
+        'TotalTime,TimeOff,Date,Approach1,AircraftID',
+        '1.5,09:05,2024-03-01,1;ILS;25R;EDDF;,N172',
+        '1.5,09:05,2024-03-01,1;ILS;25R;EDDF;,N172',
+        'lots,0905,2024-03-02,,N172',
+        '',
+    ])
+
+    def run_import(self):
+        command = make_command()
+        command.verbosity = 0
+        command.import_foreflight(io.StringIO(self.CSV), 1000, user_id=3, modified=1700000000)
+        link_flight_aircraft()
+        return command
+
+    def test_maps_sections_by_their_type_hint_rows(self):
+        command = self.run_import()
+        aircraft = Aircraft.objects.get()
+        self.assertEqual((aircraft.reference, aircraft.make, aircraft.complex, aircraft.user_id), ('N172', 'Cessna', True, 3))
+        flights = Flight.objects.all()
+        self.assertEqual(len(flights), 2)
+        for flight in flights:
+            self.assertEqual(
+                (flight.date, flight.time_off, flight.total_time, flight.approach, flight.aircraft_id),
+                (date(2024, 3, 1), time(9, 5), Decimal('90'), '1;ILS;25R;EDDF;', aircraft.pk),
+            )
+        self.assertEqual((command.stats.records['flight'], command.stats.failed['flight']), (3, 1))
+
+    def test_reimport_updates_the_same_rows(self):
+        self.run_import()
+        command = self.run_import()
+        self.assertEqual(Flight.objects.count(), 2)
+        self.assertEqual((command.stats.created['flight'], command.stats.updated['flight']), (0, 2))
+
+    def import_rows(self, *rows, replace=False):
+        header = self.CSV.split('\n')[:9]
+        command = make_command()
+        command.verbosity = 0
+        command.import_foreflight(io.StringIO('\n'.join(header + list(rows))), 1000, 3, 1700000000, replace=replace)
+        return command
+
+    def test_partial_logbooks_add_up(self):
+        self.import_rows('1.5,0905,2024-01-03,,N172')
+        first = Flight.objects.get().pk
+        command = self.import_rows('2.0,1400,2024-01-03,,N999', '1.5,0910,2024-01-03,,N172')
+        self.assertEqual(Flight.objects.count(), 2)
+        self.assertEqual(Flight.objects.get(aircraft_code__isnull=False, time_off=time(9, 10)).pk, first)
+        self.assertEqual((command.stats.created['flight'], command.stats.updated['flight']), (1, 1))
+
+    def test_a_value_too_large_for_its_column_fails_only_its_row(self):
+        command = self.import_rows('17.0,0905,2024-03-01,,N172', '1.5,0905,2024-03-02,,N172', '1e9,0905,2024-03-03,,N172')
+        self.assertEqual(Flight.objects.get().date, date(2024, 3, 2))
+        self.assertEqual((command.stats.created['flight'], command.stats.failed['flight']), (1, 2))
+
+    def test_replace_deletes_the_flights_a_resent_logbook_dropped(self):
+        self.import_rows('1.5,0905,2024-03-01,,N172', '2.0,1400,2024-03-01,,N999')
+        kept = Flight.objects.get(time_off=time(9, 5)).pk
+
+        command = self.import_rows('1.75,0910,2024-03-01,,N172', replace=True)
+        flight = Flight.objects.get()
+        self.assertEqual((flight.pk, flight.time_off, flight.total_time), (kept, time(9, 10), Decimal('105')))
+        self.assertEqual((command.stats.created['flight'], command.stats.updated['flight']), (0, 1))
+
+    def test_replace_keeps_flights_from_other_sources(self):
+        Flight.objects.create(
+            user_id=3, guid=logbook_guid(3, 'other'), platform=0, _modified=0, date=date(2024, 3, 1), total_time=60,
+        )
+        self.import_rows('1.5,0905,2024-03-01,,N172', replace=True)
+        self.assertEqual(sorted(Flight.objects.values_list('platform', flat=True)), [FOREFLIGHT_PLATFORM, 0])
+
+
+class SyntheticExportTests(TestCase):
+
+    def test_generated_export_is_reproducible_and_importable(self):
+        first, second = io.StringIO(), io.StringIO()
+        write_export(first, 3000, seed=7)
+        write_export(second, 3000, seed=7)
+        self.assertEqual(first.getvalue(), second.getvalue())
+
+        records = list(iter_json_records(io.StringIO(first.getvalue())))
+        tables = {record['table'] for record in records}
+        self.assertEqual({name.lower() for name in tables}, set(Command.Table_Mapping))
+        self.assertTrue(all(record['guid'].isdigit() for record in records if record['table'] == 'SettingConfig'))
+
+        command = make_command()
+        command.verbosity = 0
+        for record in records:
+            command.import_record(record)
+        command.flush_all()
+        self.assertEqual(sum(command.stats.failed.values()), 0)
+        self.assertEqual(sum(command.stats.records.values()), 3000)
+
+    def test_injects_bad_dates_and_missing_keys(self):
+        records = list(RecordGenerator(seed=1).records(5000))
+        flights = [record['meta'] for record in records if record['table'] == 'Flight']
+        self.assertTrue(any(meta.get('DateUTC') in ('2024-13-45', '31/12/2023', 'not a date', '0000-00-00') for meta in flights))
+        self.assertTrue(any('Route' not in meta for meta in flights))
+
+
+class QueryIndexTests(TestCase):
+
+    def test_hot_queries_use_the_model_indexes(self):
+        page = Flight.objects.filter(user_id=1, date__gte=date(2020, 1, 1)).order_by('date', 'id')[:50]
+        self.assertIn('flight_user_date', page.explain())
+        sync = Flight.objects.filter(user_id=1, _modified__gt=1500000000)
+        self.assertIn('flight_user_modified', sync.explain())
+        totals = Flight.objects.filter(user_id=1, aircraft_id=1).values('aircraft').annotate(total=Sum('total_time')).order_by()
+        self.assertIn('COVERING INDEX flight_user_aircraft_time', totals.explain())
+        self.assertIn('airfield_icao', Airfield.objects.filter(af_icao='EDDF').explain())
+
+
+class ImportProfileTests(TestCase):
+
+    def test_query_recorder_keeps_only_the_slowest_statements(self):
+        recorder = QueryRecorder(keep=2)
+        for delay in (0.003, 0.0, 0.006, 0.001):
+            recorder(lambda *args, delay=delay: sleep(delay), f'SELECT {delay}', (), False, {})
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual([sql for _, sql, _ in recorder.slowest_statements()], ['SELECT 0.006', 'SELECT 0.003'])
+
+    def test_profile_reports_phases_tables_and_statements(self):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as source:
+            write_export(source, 500, seed=3)
+        self.addCleanup(os.remove, path)
+        stats_path = path + '.pstats'
+        self.addCleanup(lambda: os.path.exists(stats_path) and os.remove(stats_path))
+
+        out = io.StringIO()
+        call_command('import_data', file=path, profile_output=stats_path, verbosity=0, stdout=out)
+        report = out.getvalue()
+        for expected in ('stream', 'flush', 'link', 'flight', 'Slowest statements', 'INSERT INTO'):
+            self.assertIn(expected, report)
+        self.assertTrue(os.path.getsize(stats_path))
+
+
+class ImportJobTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # Two halves of one export: separate exports would reuse the same unique codes
+        records = list(RecordGenerator(seed=1).records(400))
+        for name, part in (('a.json', records[:200]), ('b.json', records[200:])):
+            with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as source:
+                json.dump(part, source)
+        with open(os.path.join(self.directory, 'broken.json'), 'w', encoding='utf-8') as source:
+            source.write('[{"table": "Flight", "guid": ')
+        with open(os.path.join(self.directory, 'notes.txt'), 'w', encoding='utf-8') as source:
+            source.write('not an export')
+
+    def test_expands_directories_globs_and_files_once(self):
+        paths = expand_paths([self.directory, os.path.join(self.directory, '*.json')])
+        self.assertEqual([os.path.basename(path) for path in paths], ['a.json', 'b.json', 'broken.json'])
+        with self.assertRaises(ValueError):
+            expand_paths([os.path.join(self.directory, 'missing.json')])
+
+    def test_a_bad_file_fails_alone_and_imported_files_are_skipped(self):
+        with self.assertRaises(CommandError):
+            call_command('import_data', self.directory, verbosity=0, stderr=io.StringIO())
+        jobs = dict(ImportJob.objects.values_list('source', 'status'))
+        self.assertEqual({os.path.basename(source): status for source, status in jobs.items()}, {
+            'a.json': ImportJob.SUCCEEDED, 'b.json': ImportJob.SUCCEEDED, 'broken.json': ImportJob.FAILED,
+        })
+        succeeded = ImportJob.objects.filter(status=ImportJob.SUCCEEDED)
+        self.assertEqual(sum(job.counters['created']['flight'] for job in succeeded), Flight.objects.count())
+        self.assertTrue(ImportJob.objects.get(status=ImportJob.FAILED).error)
+
+        flights = Flight.objects.count()
+        call_command('import_data', os.path.join(self.directory, 'a.json'), os.path.join(self.directory, 'b.json'),
+                     verbosity=0)
+        self.assertEqual(ImportJob.objects.filter(status=ImportJob.SKIPPED).count(), 2)
+        self.assertEqual(Flight.objects.count(), flights)
+
+    def test_a_single_file_is_imported_again_without_being_hashed(self):
+        path = os.path.join(self.directory, 'a.json')
+        call_command('import_data', path, verbosity=0)
+        Flight.objects.all().delete()
+        with mock.patch('pilotlog.jobs.file_digest') as digest:
+            call_command('import_data', path, verbosity=0)
+        digest.assert_not_called()
+        self.assertTrue(Flight.objects.exists())
+        self.assertEqual(set(ImportJob.objects.values_list('status', 'source_hash')), {(ImportJob.SUCCEEDED, '')})
+
+    def test_collected_output_keeps_only_its_tail(self):
+        out = TailBuffer(limit=100)
+        for line in range(100):
+            out.write(f'line {line}\n')
+        self.assertTrue(out.getvalue().startswith('[694 characters of earlier output dropped]\n'))
+        self.assertTrue(out.getvalue().endswith('line 99\n'))
+        self.assertLessEqual(out.size, 100)
+
+    def test_jobs_need_a_server_database(self):
+        with self.assertRaisesRegex(CommandError, 'server database'):
+            call_command('import_data', self.directory, jobs=2, verbosity=0)
+        self.assertFalse(ImportJob.objects.exists())
+
+
+class FileJobProcessTests(TransactionTestCase):
+
+    def test_pool_imports_each_file_in_its_own_process(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        records = list(RecordGenerator(seed=2).records(600))
+        paths = []
+        for index in range(3):
+            paths.append(os.path.join(directory.name, f'p{index}.json'))
+            with open(paths[-1], 'w', encoding='utf-8') as source:
+                json.dump(records[index * 200:(index + 1) * 200], source)
+        options = {
+            'user': None, 'batch_size': 50, 'workers': 1, 'pipeline': False, 'incremental': False, 'resume': False,
+            'checkpoint_every': 0, 'progress_interval': 5.0, 'check_limits': False, 'profile': False,
+            'profile_output': None, 'verbosity': 0,
+        }
+        # Concurrent writers need a server database; on SQLite the pool runs one file at a time
+        jobs = 1 if connection.vendor == 'sqlite' else 3
+        results = list(run_file_imports(paths, options, jobs))
+
+        self.assertEqual({result.status for result in results}, {ImportJob.SUCCEEDED})
+        self.assertEqual(ImportJob.objects.filter(status=ImportJob.SUCCEEDED).count(), 3)
+        created = sum(job.counters['created'].get('flight', 0) for job in ImportJob.objects.all())
+        self.assertEqual(created, Flight.objects.count())
+        self.assertEqual(Flight.objects.count(), len({record['guid'] for record in records if record['table'] == 'Flight'}))
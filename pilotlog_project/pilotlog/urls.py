@@ -0,0 +1,16 @@
+from django.urls import path
+
+from pilotlog import views
+
+urlpatterns = [
+    path('users/<int:user_id>/airfields/nearest/', views.airfield_nearest, name='airfield-nearest'),
+    path('users/<int:user_id>/airfields/<str:code>/', views.airfield_resolve, name='airfield-resolve'),
+    path('users/<int:user_id>/queries/<str:code>/results/', views.query_results, name='query-results'),
+] + [
+    path(f'users/<int:user_id>/{name}/', views.record_list, {'resource': name}, name=f'{name}-list')
+    for name in views.RESOURCES
+] + [
+    path(f'users/<int:user_id>/{name}/export.{fmt}', views.record_export, {'resource': name, 'fmt': fmt},
+         name=f'{name}-export-{fmt}')
+    for name in views.RESOURCES for fmt in views.EXPORT_FORMATS
+]
@@ -1,3 +1,270 @@
-from django.shortcuts import render
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import date
+from functools import wraps
 
-# Create your views here.
+from django.db.models import F, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from pilotlog.airfields import airfield_index
+from pilotlog.models import (
+    Aircraft, Airfield, Flight, ImagePic, LimitRules, MyQueryBuild, Pilot, Qualification, Query, SettingConfig,
+)
+from pilotlog.queries import QueryError, run_query
+from pilotlog.streaming import FETCH_SIZE, csv_chunks, gzip_chunks, ndjson_chunks
+
+# Rows per page unless ?limit= asks for another size
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# A listed model and the unique key its pages are ordered and sought by
+Resource = namedtuple('Resource', ['model', 'ordering'])
+
+RESOURCES = {
+    # (user_id, date, id) is indexed, so every flight page is one index seek
+    'flights': Resource(Flight, ('date', 'id')),
+    'aircraft': Resource(Aircraft, ('id',)),
+    'pilots': Resource(Pilot, ('id',)),
+    'airfields': Resource(Airfield, ('id',)),
+    'imagepics': Resource(ImagePic, ('id',)),
+    'limitrules': Resource(LimitRules, ('id',)),
+    'queries': Resource(Query, ('id',)),
+    'querybuilds': Resource(MyQueryBuild, ('id',)),
+    'qualifications': Resource(Qualification, ('id',)),
+    'settingconfigs': Resource(SettingConfig, ('id',)),
+}
+
+# Airport code columns of a flight and the key their airfield is added under by ?expand=airfields
+AIRPORT_COLUMNS = {'from_airport': 'from_airfield', 'to_airport': 'to_airfield'}
+
+# Bulk export formats: chunk encoder and content type
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_chunks, 'application/x-ndjson'),
+    'csv': (csv_chunks, 'text/csv; charset=utf-8'),
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def logbook_owner_required(view):
+    """Serve a ``/api/users/<user_id>/`` view only to staff, or to the Django user whose id is ``user_id``."""
+    @wraps(view)
+    def check(request, user_id, *args, **kwargs):
+        user = request.user
+        if not user.is_authenticated:
+            return JsonResponse({'error': "Authentication required"}, status=401)
+        if not (user.is_staff or user.pk == user_id):
+            return JsonResponse({'error': f"No access to the logbook of user {user_id}"}, status=403)
+        return view(request, user_id, *args, **kwargs)
+    return check
+
+
+def selectable_fields(model):
+    """Column names a client may ask for with ``?fields=``; foreign keys by their ``_id``."""
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def encode_cursor(values):
+    data = json.dumps([value.isoformat() if isinstance(value, date) else value for value in values])
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """Decode an ``after`` cursor back to the ordering values of the last row of the previous page."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError
+        return [
+            date.fromisoformat(value) if name == 'date' and value is not None else int(value) if name == 'id' else value
+            for name, value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise BadRequest("Invalid cursor")
+
+
+def seek(ordering, values):
+    """Rows strictly after ``values`` in ``ordering``, where the leading column sorts NULLs first.
+
+    Expressed as ranges on the ordering columns instead of an OFFSET, so
+    the database starts reading at the cursor whatever page it is on.
+    """
+    if ordering == ('id',):
+        return Q(id__gt=values[0])
+    column, last = ordering[0], values[0]
+    if last is None:
+        return Q(**{f'{column}__isnull': True, 'id__gt': values[1]}) | Q(**{f'{column}__isnull': False})
+    # The redundant lower bound lets the planner start the index range at the cursor
+    return Q(**{f'{column}__gte': last}) & (Q(**{f'{column}__gt': last}) | Q(id__gt=values[1]))
+
+
+def parse_fields(request, model):
+    allowed = selectable_fields(model)
+    requested = request.GET.get('fields')
+    if not requested:
+        return allowed
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise BadRequest(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def order_by(ordering):
+    # NULLs first on every backend (PostgreSQL defaults to last), matching seek()
+    return [F(ordering[0]).asc(nulls_first=True), *ordering[1:]]
+
+
+def page(resource, user_id, fields, limit, after=None):
+    """One page of a user's rows as dicts of ``fields``, and the cursor of the next page (or None)."""
+    ordering = resource.ordering
+    rows = resource.model.objects.filter(user_id=user_id)
+    if after is not None:
+        rows = rows.filter(seek(ordering, after))
+    # The ordering columns are always read; the cursor is built from them
+    columns = list(dict.fromkeys([*fields, *ordering]))
+    rows = list(rows.order_by(*order_by(ordering)).values(*columns)[:limit + 1])
+
+    cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        cursor = encode_cursor([rows[-1][name] for name in ordering])
+    if len(columns) != len(fields):
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return rows, cursor
+
+
+@require_GET
+@logbook_owner_required
+def record_list(request, user_id, resource):
+    """``GET /api/users/<user_id>/<resource>/?fields=a,b&limit=n&after=<cursor>``"""
+    resource = RESOURCES[resource]
+    try:
+        fields = parse_fields(request, resource.model)
+        limit = parse_limit(request)
+        after = request.GET.get('after')
+        after = decode_cursor(after, resource.ordering) if after else None
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    expand = resource.model is Flight and request.GET.get('expand') == 'airfields'
+    read = list(dict.fromkeys([*fields, *AIRPORT_COLUMNS])) if expand else fields
+    rows, cursor = page(resource, user_id, read, limit, after)
+    if expand:
+        # Resolved from the user's in-memory index, not with a query per flight
+        index = airfield_index(user_id)
+        for row in rows:
+            for column, key in AIRPORT_COLUMNS.items():
+                row[key] = airfield_json(index.resolve(row[column]))
+            for column in read[len(fields):]:
+                del row[column]
+    return JsonResponse({'results': rows, 'next': cursor})
+
+
+def airfield_json(entry, **extra):
+    if entry is None:
+        return None
+    return {
+        'id': entry.id, 'code': entry.code, 'icao': entry.icao, 'iata': entry.iata, 'name': entry.name,
+        'latitude': round(entry.latitude, 4), 'longitude': round(entry.longitude, 4), **extra,
+    }
+
+
+def parse_float(request, name, low, high):
+    value = request.GET.get(name)
+    if value is None:
+        raise BadRequest(f"{name} is required")
+    try:
+        value = float(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be a number")
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be between {low:g} and {high:g}")
+    return value
+
+
+@require_GET
+@logbook_owner_required
+def airfield_resolve(request, user_id, code):
+    """``GET /api/users/<user_id>/airfields/<code>/``: the user's airfield with this code, ICAO or IATA identifier."""
+    entry = airfield_index(user_id).resolve(code)
+    if entry is None:
+        return JsonResponse({'error': f"Unknown airfield: {code}"}, status=404)
+    return JsonResponse(airfield_json(entry))
+
+
+@require_GET
+@logbook_owner_required
+def airfield_nearest(request, user_id):
+    """``GET /api/users/<user_id>/airfields/nearest/?lat=50.03&lon=8.57&limit=5&max_km=100``"""
+    try:
+        latitude = parse_float(request, 'lat', -90, 90)
+        longitude = parse_float(request, 'lon', -180, 180)
+        max_km = parse_float(request, 'max_km', 0, 20100) if 'max_km' in request.GET else None
+        limit = min(parse_limit(request), 100)
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    found = airfield_index(user_id).nearest(latitude, longitude, k=limit, max_km=max_km)
+    return JsonResponse({'results': [airfield_json(entry, distance_km=round(km, 2)) for km, entry in found]})
+
+
+@require_GET
+@logbook_owner_required
+def record_export(request, user_id, resource, fmt):
+    """``GET /api/users/<user_id>/<resource>/export.<ndjson|csv>?fields=a,b&gzip=1``
+
+    Streams every row of the user in the list order. Rows are read with a
+    chunked ``iterator()`` of value tuples and encoded a chunk at a time,
+    so memory stays flat however many rows are exported.
+    """
+    resource = RESOURCES[resource]
+    try:
+        fields = parse_fields(request, resource.model)
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    rows = (
+        resource.model.objects.filter(user_id=user_id)
+        .order_by(*order_by(resource.ordering))
+        .values_list(*fields)
+        .iterator(chunk_size=FETCH_SIZE)
+    )
+    encode, content_type = EXPORT_FORMATS[fmt]
+    chunks = encode(rows, fields)
+    filename = f'{resource.model._meta.model_name}-{user_id}.{fmt}'
+    if request.GET.get('gzip') in ('1', 'true'):
+        chunks = gzip_chunks(chunks)
+        content_type = 'application/gzip'
+        filename += '.gz'
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_GET
+@logbook_owner_required
+def query_results(request, user_id, code):
+    """``GET /api/users/<user_id>/queries/<mQCode>/results/``: flight count and totals of a stored query."""
+    try:
+        result = run_query(user_id, code)
+    except QueryError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if result is None:
+        return JsonResponse({'error': f"Unknown query: {code}"}, status=404)
+    return JsonResponse(result)
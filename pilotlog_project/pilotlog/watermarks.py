@@ -0,0 +1,45 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from pilotlog.models import ImportState
+
+
+def record_mark(record):
+    """Return the ``(user_id, _modified)`` of a raw record as ints, or None."""
+    try:
+        return int(record.get('user_id') or 0), int(record.get('_modified') or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_watermarks(using=DEFAULT_DB_ALIAS):
+    """Map ``(user_id, table)`` to the highest ``_modified`` imported so far."""
+    rows = ImportState.objects.using(using).values_list('user_id', 'table', 'last_modified')
+    return {(user_id, table): last_modified for user_id, table, last_modified in rows}
+
+
+def merge_watermarks(marks, other):
+    """Fold ``other`` into ``marks`` keeping the highest value per key."""
+    for key, modified in other.items():
+        if modified > marks.get(key, modified - 1):
+            marks[key] = modified
+    return marks
+
+
+def save_watermarks(marks, using=DEFAULT_DB_ALIAS):
+    """Upsert the high-water marks of a finished run in one statement."""
+    if not marks:
+        return
+    # Never move a mark backwards, whatever order runs finish in
+    stored = load_watermarks(using)
+    states = [
+        ImportState(user_id=user_id, table=table, last_modified=modified)
+        for (user_id, table), modified in marks.items()
+        if modified > stored.get((user_id, table), -1)
+    ]
+    with transaction.atomic(using=using):
+        ImportState.objects.using(using).bulk_create(
+            states,
+            update_conflicts=True,
+            unique_fields=['user_id', 'table'],
+            update_fields=['last_modified', 'updated_at'],
+        )
@@ -78,6 +78,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # On disk rather than in memory, so the worker processes of the import tests see it
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 